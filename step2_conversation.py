@@ -1,6 +1,12 @@
 import asyncio
+import sys
+from pathlib import Path
+
 from claude_agent_sdk import ClaudeSDKClient, ClaudeAgentOptions, AssistantMessage, ResultMessage
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "web" / "backend"))
+from scheduler import print_rate_limit_notice, receive_resumable
+
 
 SYSTEM_PROMPT = """You are a helpful personal assistant. You can:
 - Search the web for information
@@ -15,22 +21,16 @@ just do it. Format your responses for terminal readability.
 
 
 async def print_response(client):
-    try:
-        async for message in client.receive_response():
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if hasattr(block, "text") and block.text.strip():
-                        print(f"\n🤖 {block.text}")
-                    elif hasattr(block, "name"):
-                        print(f"  🔧 {block.name}")
-            elif isinstance(message, ResultMessage):
-                if message.subtype == "error":
-                    print(f"\n❌ Error: {message.error}")
-    except Exception as e:
-        if "rate_limit_event" in str(e):
-            pass
-        else:
-            raise
+    async for message in receive_resumable(client, print_rate_limit_notice):
+        if isinstance(message, AssistantMessage):
+            for block in message.content:
+                if hasattr(block, "text") and block.text.strip():
+                    print(f"\n🤖 {block.text}")
+                elif hasattr(block, "name"):
+                    print(f"  🔧 {block.name}")
+        elif isinstance(message, ResultMessage):
+            if message.is_error:
+                print(f"\n❌ Error: {message.result or message.subtype}")
 
 
 async def main():
@@ -1,6 +1,5 @@
 import asyncio
-import json
-from datetime import datetime
+import sys
 from pathlib import Path
 
 from claude_agent_sdk import (
@@ -9,67 +8,14 @@ from claude_agent_sdk import (
     AssistantMessage,
     ResultMessage,
     tool,
-    create_sdk_mcp_server,
 )
 from claude_agent_sdk.types import AgentDefinition
 
-# ─── Directory for persistent notes ───
-NOTES_DIR = Path("./assistant_data/notes")
-NOTES_DIR.mkdir(parents=True, exist_ok=True)
-TODOS_FILE = Path("./assistant_data/todos.json")
-TODOS_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-
-# ─── Custom Tools ───
-@tool("save_note", "Save a note with a title and content", {"title": str, "content": str, "tags": str})
-async def save_note(args):
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_title = args["title"].replace(" ", "_").lower()[:50]
-    filepath = NOTES_DIR / f"{timestamp}_{safe_title}.md"
-    filepath.write_text(
-        f"# {args['title']}\n**Date:** {datetime.now():%Y-%m-%d %H:%M}\n"
-        f"**Tags:** {args.get('tags','')}\n\n---\n\n{args['content']}\n"
-    )
-    return {"content": [{"type": "text", "text": f"Note saved: {filepath}"}]}
-
-
-@tool("search_notes", "Search saved notes", {"query": str})
-async def search_notes(args):
-    results = []
-    for f in NOTES_DIR.glob("*.md"):
-        if args["query"].lower() in f.read_text().lower():
-            results.append(f"📄 {f.name}")
-    text = "\n".join(results) if results else "No matching notes found."
-    return {"content": [{"type": "text", "text": text}]}
-
-
-@tool("manage_todos", "Manage to-do list", {"action": str, "item": str})
-async def manage_todos(args):
-    todos = json.loads(TODOS_FILE.read_text()) if TODOS_FILE.exists() else []
-    action = args["action"].lower()
-    if action == "add":
-        todos.append({"task": args["item"], "done": False, "created": datetime.now().isoformat()})
-        TODOS_FILE.write_text(json.dumps(todos, indent=2))
-        return {"content": [{"type": "text", "text": f"Added: {args['item']}"}]}
-    elif action == "complete":
-        try:
-            idx = int(args["item"]) - 1
-            if 0 <= idx < len(todos):
-                todos[idx]["done"] = True
-                TODOS_FILE.write_text(json.dumps(todos, indent=2))
-                return {"content": [{"type": "text", "text": f"Completed: {todos[idx]['task']}"}]}
-        except ValueError:
-            pass
-        return {"content": [{"type": "text", "text": "Invalid item."}]}
-    elif action == "list":
-        if not todos:
-            return {"content": [{"type": "text", "text": "No to-do items."}]}
-        lines = [f"{'✅' if t['done'] else '⬜'} {i}. {t['task']}" for i, t in enumerate(todos, 1)]
-        return {"content": [{"type": "text", "text": "\n".join(lines)}]}
-    return {"content": [{"type": "text", "text": f"Unknown action: {action}"}]}
-
-
-assistant_tools = create_sdk_mcp_server("assistant", "1.0.0", [save_note, search_notes, manage_todos])
+# save_note, search_notes and manage_todos are shared with step3 (web/backend/agent_tools/assistant.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent / "web" / "backend"))
+from agent_tools import mcp_server
+from orchestrator import Orchestrator, format_results, subagent_options
+from scheduler import print_rate_limit_notice, receive_resumable
 
 
 # ─── Subagents ───
@@ -126,6 +72,61 @@ SUBAGENTS = {
 }
 
 
+# ─── Parallel dispatch ───
+# dispatch_subagents runs a plan of subagent tasks as separate clients, independent ones
+# concurrently (orchestrator.py), printing each one's progress as it streams.
+MAX_PARALLEL_SUBAGENTS = 3
+SUBAGENT_TIMEOUT = 300      # seconds before a single subagent task is cancelled
+DISPATCH_DEADLINE = 600     # seconds before everything still running is cancelled
+
+
+ORCHESTRATOR = Orchestrator(
+    SUBAGENTS, max_concurrency=MAX_PARALLEL_SUBAGENTS, task_timeout=SUBAGENT_TIMEOUT, deadline=DISPATCH_DEADLINE,
+    options_for=lambda definition: subagent_options(definition, hooks={"PreToolUse": [safety_hook]}),
+)
+
+
+def print_progress(task_id, kind, text):
+    if kind == "start":
+        print(f"  🧠 [{task_id}] started ({text})")
+    elif kind == "tool":
+        print(f"     [{task_id}] 🔧 {text}")
+    elif kind == "text":
+        print(f"     [{task_id}] ✍️  {' '.join(text.split())[:100]}")
+    elif kind == "ok":
+        print(f"  ✅ [{task_id}] done in {text}")
+    else:
+        print(f"  ⚠️  [{task_id}] {kind}: {text}")
+
+
+@tool("dispatch_subagents", "Run several subagent tasks at once. Independent tasks run in parallel; a task "
+      "with 'after' waits for those task ids and receives their results. Returns every task's result.", {
+    "type": "object",
+    "properties": {
+        "tasks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string", "description": "short unique name, e.g. 'research'"},
+                    "agent": {"type": "string", "enum": list(SUBAGENTS)},
+                    "prompt": {"type": "string", "description": "complete, self-contained instructions"},
+                    "after": {"type": "array", "items": {"type": "string"}, "description": "task ids to wait for"},
+                },
+                "required": ["id", "agent", "prompt"],
+            },
+        },
+    },
+    "required": ["tasks"],
+})
+async def dispatch_subagents(args):
+    try:
+        results = await ORCHESTRATOR.run(args["tasks"], on_progress=print_progress)
+    except ValueError as e:
+        return {"content": [{"type": "text", "text": str(e)}], "is_error": True}
+    return {"content": [{"type": "text", "text": format_results(results)}]}
+
+
 # ─── System Prompt ───
 SYSTEM_PROMPT = """You are a personal assistant with three specialist subagents:
 
@@ -139,6 +140,10 @@ You also have direct access to:
 - File operations, web search, and shell commands
 
 GUIDELINES:
+- When a request has several parts for different specialists (e.g. "research X, then draft Y and
+  analyze Z"), plan them in ONE dispatch_subagents call: independent parts run in parallel, and a
+  part that needs another's output lists it in "after"
+- For a single delegated task, use the Task tool
 - For complex research, delegate to the researcher subagent
 - For polished writing tasks, delegate to the writer subagent
 - For technical/data tasks, delegate to the analyst subagent
@@ -148,27 +153,31 @@ GUIDELINES:
 
 
 async def print_response(client):
-    try:
-        async for message in client.receive_response():
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if hasattr(block, "text") and block.text.strip():
-                        print(f"\n🤖 {block.text}")
-                    elif hasattr(block, "name"):
-                        if block.name == "Task":
-                            agent_type = getattr(block, "input", {}).get("subagent_type", "unknown")
-                            print(f"\n  🧠 Delegating to: {agent_type}")
-                        else:
-                            print(f"  🔧 {block.name}")
-            elif isinstance(message, ResultMessage):
-                if message.subtype == "error":
-                    print(f"\n❌ Error: {message.error}")
-    except Exception as e:
-        if "rate_limit_event" in str(e):
-            pass
-        else:
-            raise
-            
+    delegated = {}      # Task tool_use id -> subagent type, to label the subagent's own messages
+    async for message in receive_resumable(client, print_rate_limit_notice):
+        if isinstance(message, AssistantMessage) and message.parent_tool_use_id:
+            # a Task subagent at work: show its steps as they happen
+            agent_type = delegated.get(message.parent_tool_use_id, "subagent")
+            for block in message.content:
+                if hasattr(block, "name"):
+                    print(f"     [{agent_type}] 🔧 {block.name}")
+                elif hasattr(block, "text") and block.text.strip():
+                    print(f"     [{agent_type}] ✍️  {' '.join(block.text.split())[:100]}")
+        elif isinstance(message, AssistantMessage):
+            for block in message.content:
+                if hasattr(block, "text") and block.text.strip():
+                    print(f"\n🤖 {block.text}")
+                elif hasattr(block, "name"):
+                    if block.name == "Task":
+                        agent_type = getattr(block, "input", {}).get("subagent_type", "unknown")
+                        delegated[block.id] = agent_type
+                        print(f"\n  🧠 Delegating to: {agent_type}")
+                    else:
+                        print(f"  🔧 {block.name}")
+        elif isinstance(message, ResultMessage):
+            if message.is_error:
+                print(f"\n❌ Error: {message.result or message.subtype}")
+
 # ─── Safety Hook ───
 async def safety_hook(tool_name, tool_input, hook_event_name, **kwargs):
     if hook_event_name != "PreToolUse" or tool_name != "Bash":
@@ -201,11 +210,12 @@ async def main():
         system_prompt=SYSTEM_PROMPT,
         model="haiku",
         agents=SUBAGENTS,
-        mcp_servers={"assistant": assistant_tools},
+        mcp_servers={"assistant": mcp_server("assistant", extra=[dispatch_subagents])},
         allowed_tools=[
             "Read", "Write", "Edit", "Bash", "Glob", "Grep",
             "WebSearch", "WebFetch",
             "Task",
+            "mcp__assistant__dispatch_subagents",
             "mcp__assistant__save_note",
             "mcp__assistant__search_notes",
             "mcp__assistant__manage_todos",
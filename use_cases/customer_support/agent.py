@@ -1,6 +1,5 @@
 import asyncio
-import json
-from datetime import datetime
+import sys
 from pathlib import Path
 
 from claude_agent_sdk import (
@@ -8,133 +7,15 @@ from claude_agent_sdk import (
     ClaudeAgentOptions,
     AssistantMessage,
     ResultMessage,
-    tool,
-    create_sdk_mcp_server,
 )
 
-# ─── Directories ───
-KB_DIR = Path(__file__).parent / "knowledge_base"
-TICKETS_DIR = Path(__file__).parent / "support_data" / "tickets"
-TICKETS_DIR.mkdir(parents=True, exist_ok=True)
-LOG_FILE = Path(__file__).parent / "support_data" / "conversation_log.json"
-
-
-# ─── Custom Tool: Search Knowledge Base ───
-@tool("search_knowledge_base", "Search the company knowledge base for answers to customer questions", {
-    "query": str,
-})
-async def search_knowledge_base(args: dict) -> dict:
-    query = args["query"].lower()
-    query_words = query.split()
-    results = []
-
-    for doc in KB_DIR.glob("*.md"):
-        content = doc.read_text()
-        content_lower = content.lower()
-
-        # Match if ANY query word appears in the document
-        if any(word in content_lower for word in query_words):
-            lines = content.split("\n")
-            relevant = []
-
-            # Find the most relevant section
-            for i, line in enumerate(lines):
-                if any(word in line.lower() for word in query_words):
-                    start = max(0, i - 5)
-                    end = min(len(lines), i + 10)
-                    relevant = lines[start:end]
-                    break
-
-            if not relevant:
-                relevant = lines[:20]
-
-            results.append(f"📄 **{doc.stem}**\n" + "\n".join(relevant))
-
-    if not results:
-        return {"content": [{"type": "text", "text": "No relevant information found in knowledge base. This may need to be escalated to a human agent."}]}
-
-    return {"content": [{"type": "text", "text": "\n\n---\n\n".join(results)}]}
-
-
-# ─── Custom Tool: Create Support Ticket ───
-@tool("create_ticket", "Create a support ticket when issue cannot be resolved automatically", {
-    "customer_name": str,
-    "issue_summary": str,
-    "priority": str,
-    "category": str,
-})
-async def create_ticket(args: dict) -> dict:
-    ticket_id = f"TKT-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-    ticket = {
-        "ticket_id": ticket_id,
-        "customer_name": args["customer_name"],
-        "issue_summary": args["issue_summary"],
-        "priority": args.get("priority", "medium"),
-        "category": args.get("category", "general"),
-        "status": "open",
-        "created_at": datetime.now().isoformat(),
-    }
-
-    ticket_file = TICKETS_DIR / f"{ticket_id}.json"
-    ticket_file.write_text(json.dumps(ticket, indent=2))
-
-    return {"content": [{"type": "text", "text": (
-        f"Ticket created successfully!\n"
-        f"  Ticket ID: {ticket_id}\n"
-        f"  Priority: {args.get('priority', 'medium')}\n"
-        f"  Category: {args.get('category', 'general')}\n"
-        f"A human agent will follow up within 24 hours."
-    )}]}
-
-
-# ─── Custom Tool: Check Order Status ───
-@tool("check_order", "Look up an order by order number", {
-    "order_number": str,
-})
-async def check_order(args: dict) -> dict:
-    sample_orders = {
-        "ORD-001": {"status": "Delivered", "date": "2026-02-20", "items": "Blue Jacket (M)", "tracking": "RM12345678GB"},
-        "ORD-002": {"status": "In Transit", "date": "2026-02-22", "items": "Running Shoes (42)", "tracking": "RM87654321GB"},
-        "ORD-003": {"status": "Processing", "date": "2026-02-23", "items": "Wool Scarf, Gloves Set", "tracking": "Not yet assigned"},
-    }
-
-    order = sample_orders.get(args["order_number"].upper())
-    if not order:
-        return {"content": [{"type": "text", "text": f"Order {args['order_number']} not found. Please check the order number and try again."}]}
-
-    return {"content": [{"type": "text", "text": (
-        f"Order: {args['order_number'].upper()}\n"
-        f"  Status: {order['status']}\n"
-        f"  Items: {order['items']}\n"
-        f"  Order Date: {order['date']}\n"
-        f"  Tracking: {order['tracking']}"
-    )}]}
-
-
-# ─── Custom Tool: Log Conversation ───
-@tool("log_conversation", "Log the conversation summary for quality and training purposes", {
-    "summary": str,
-    "resolved": str,
-    "category": str,
-})
-async def log_conversation(args: dict) -> dict:
-    logs = json.loads(LOG_FILE.read_text()) if LOG_FILE.exists() else []
-    logs.append({
-        "timestamp": datetime.now().isoformat(),
-        "summary": args["summary"],
-        "resolved": args.get("resolved", "yes"),
-        "category": args.get("category", "general"),
-    })
-    LOG_FILE.write_text(json.dumps(logs, indent=2))
-    return {"content": [{"type": "text", "text": "Conversation logged."}]}
-
-
-# ─── Bundle tools ───
-support_tools = create_sdk_mcp_server(
-    name="support",
-    version="1.0.0",
-    tools=[search_knowledge_base, create_ticket, check_order, log_conversation],
-)
+# The tools are shared with the web server (web/backend/agent_tools/support.py), which
+# doesn't use log_conversation
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "web" / "backend"))
+from agent_tools import mcp_server, resources
+from agent_tools.support import log_conversation
+from conversation_log import migrate_json_array
+from scheduler import print_rate_limit_notice, receive_resumable
 
 
 # ─── System Prompt ───
@@ -142,7 +23,7 @@ SYSTEM_PROMPT = """You are a friendly, professional customer support agent for a
 
 YOUR TOOLS:
 - search_knowledge_base: ALWAYS search this first before answering ANY question about policies, products, shipping, returns, or accounts. Search with simple keywords like "shipping", "return", "password", "warranty", etc.
-- check_order: Look up order status when a customer asks about their order
+- check_order: Look up order status when a customer asks about their order (several order or tracking numbers in one call)
 - create_ticket: Escalate to a human agent when you cannot resolve the issue
 - log_conversation: Log a summary when the conversation ends
 
@@ -174,22 +55,16 @@ async def safety_hook(tool_name, tool_input, hook_event_name, **kwargs):
 
 
 async def print_response(client):
-    try:
-        async for message in client.receive_response():
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if hasattr(block, "text") and block.text.strip():
-                        print(f"\n💬 {block.text}")
-                    elif hasattr(block, "name"):
-                        print(f"  🔧 {block.name}")
-            elif isinstance(message, ResultMessage):
-                if message.subtype == "error":
-                    print(f"\n❌ Error: {message.error}")
-    except Exception as e:
-        if "rate_limit_event" in str(e):
-            pass
-        else:
-            raise
+    async for message in receive_resumable(client, print_rate_limit_notice):
+        if isinstance(message, AssistantMessage):
+            for block in message.content:
+                if hasattr(block, "text") and block.text.strip():
+                    print(f"\n💬 {block.text}")
+                elif hasattr(block, "name"):
+                    print(f"  🔧 {block.name}")
+        elif isinstance(message, ResultMessage):
+            if message.is_error:
+                print(f"\n❌ Error: {message.result or message.subtype}")
 
 
 async def main():
@@ -204,7 +79,7 @@ async def main():
     options = ClaudeAgentOptions(
         system_prompt=SYSTEM_PROMPT,
         model="haiku",
-        mcp_servers={"support": support_tools},
+        mcp_servers={"support": mcp_server("support", extra=[log_conversation])},
         hooks={
             "PreToolUse": [safety_hook],
         },
@@ -218,6 +93,8 @@ async def main():
         permission_mode="acceptEdits",
     )
 
+    migrate_json_array(resources.LEGACY_LOG_FILE, resources.conversation_log())
+
     async with ClaudeSDKClient(options=options) as client:
         while True:
             user_input = input("\n🧑 Customer: ").strip()
@@ -230,5 +107,7 @@ async def main():
             await client.query(user_input)
             await print_response(client)
 
+    resources.close()
+
 
 asyncio.run(main())
@@ -1,6 +1,5 @@
 import asyncio
-import json
-from datetime import datetime
+import sys
 from pathlib import Path
 
 from claude_agent_sdk import (
@@ -8,51 +7,27 @@ from claude_agent_sdk import (
     ClaudeAgentOptions,
     AssistantMessage,
     ResultMessage,
-    tool,
-    create_sdk_mcp_server,
 )
 
-# ─── Directories ───
-BRIEFINGS_DIR = Path(__file__).parent / "briefings"
-BRIEFINGS_DIR.mkdir(parents=True, exist_ok=True)
-
-
-@tool("save_briefing", "Save a meeting briefing document as a markdown file", {
-    "company_name": str, "content": str, "meeting_date": str,
-})
-async def save_briefing(args: dict) -> dict:
-    safe_name = args["company_name"].replace(" ", "_").lower()[:50]
-    date_str = args.get("meeting_date", datetime.now().strftime("%Y-%m-%d"))
-    filepath = BRIEFINGS_DIR / f"{date_str}_{safe_name}_briefing.md"
-    filepath.write_text(args["content"])
-    return {"content": [{"type": "text", "text": f"Briefing saved: {filepath.name}"}]}
-
-
-@tool("list_briefings", "List saved meeting briefings", {"search": str})
-async def list_briefings(args: dict) -> dict:
-    search = args.get("search", "").lower()
-    results = []
-    for f in sorted(BRIEFINGS_DIR.glob("*.md"), reverse=True):
-        if search and search not in f.name.lower():
-            continue
-        results.append(f.name)
-    if not results:
-        return {"content": [{"type": "text", "text": "No briefings found."}]}
-    return {"content": [{"type": "text", "text": "\n".join(results)}]}
-
-
-prep_tools = create_sdk_mcp_server("prep", "1.0.0", [save_briefing, list_briefings])
+# The tools are shared with the web server (web/backend/agent_tools/prep.py); briefings are
+# saved in ./briefings and indexed in briefings.db
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "web" / "backend"))
+from agent_tools import mcp_server
+from scheduler import print_rate_limit_notice, receive_resumable
 
 
 SYSTEM_PROMPT = """You are a meeting preparation assistant. Research companies and generate briefing documents.
 
 When asked to prepare a briefing:
+0. Call find_briefing first — if a briefing from the last 7 days exists, show it instead of researching again
 1. Search the web for the company (use SHORT search queries like "Spotify company overview 2026")
 2. Search for recent news ("Spotify news 2026")
 3. Search for leadership ("Spotify CEO leadership team")
 4. Generate a structured briefing with: Company Overview, Key People, Recent News, Products, Financials, Competitors, Talking Points, Questions to Ask
 5. Save the briefing using save_briefing
 
+To show past briefings use search_briefings (an empty query lists the most recent).
+
 IMPORTANT:
 - Use SHORT search queries (2-4 words), not long sentences
 - Do only 1 search maximum, then write the briefing combining search results with your existing knowledge
@@ -62,28 +37,16 @@ IMPORTANT:
 
 
 async def print_response(client):
-    collected_text = []
-    try:
-        async for message in client.receive_response():
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if hasattr(block, "text") and block.text.strip():
-                        print(f"\n📋 {block.text}")
-                        collected_text.append(block.text)
-                    elif hasattr(block, "name"):
-                        print(f"  🔧 {block.name}")
-            elif isinstance(message, ResultMessage):
-                if message.subtype == "error":
-                    print(f"\n❌ Error: {message.error}")
-    except Exception as e:
-        if "rate_limit_event" in str(e):
-            if collected_text:
-                print("\n⚠️  Rate limit reached, but response was captured above.")
-            else:
-                print("\n⚠️  Rate limit reached. Wait 60 seconds and try again.")
-                print("    Tip: try a simpler query like 'Tell me about Spotify'")
-        else:
-            raise
+    async for message in receive_resumable(client, print_rate_limit_notice):
+        if isinstance(message, AssistantMessage):
+            for block in message.content:
+                if hasattr(block, "text") and block.text.strip():
+                    print(f"\n📋 {block.text}")
+                elif hasattr(block, "name"):
+                    print(f"  🔧 {block.name}")
+        elif isinstance(message, ResultMessage):
+            if message.is_error:
+                print(f"\n❌ Error: {message.result or message.subtype}")
 
 
 async def main():
@@ -102,12 +65,14 @@ async def main():
     options = ClaudeAgentOptions(
         system_prompt=SYSTEM_PROMPT,
         model="haiku",
-        mcp_servers={"prep": prep_tools},
+        mcp_servers={"prep": mcp_server("prep")},
         allowed_tools=[
             "Read", "Glob", "Grep", "Write",
             "WebSearch", "WebFetch",
             "mcp__prep__save_briefing",
-            "mcp__prep__list_briefings",
+            "mcp__prep__find_briefing",
+            "mcp__prep__search_briefings",
+            "mcp__prep__research_company",
         ],
         permission_mode="acceptEdits",
     )
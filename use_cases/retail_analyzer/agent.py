@@ -1,4 +1,5 @@
 import asyncio
+import sys
 from pathlib import Path
 
 from claude_agent_sdk import (
@@ -8,6 +9,9 @@ from claude_agent_sdk import (
     ResultMessage,
 )
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "web" / "backend"))
+from scheduler import print_rate_limit_notice, receive_resumable
+
 DATA_DIR = Path(__file__).parent / "sample_data"
 
 SYSTEM_PROMPT = f"""You are a retail business data analyst.
@@ -31,22 +35,16 @@ HOW TO ANALYZE:
 
 
 async def print_response(client):
-    try:
-        async for message in client.receive_response():
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if hasattr(block, "text") and block.text.strip():
-                        print(f"\n📊 {block.text}")
-                    elif hasattr(block, "name"):
-                        print(f"  🔧 {block.name}")
-            elif isinstance(message, ResultMessage):
-                if message.subtype == "error":
-                    print(f"\n❌ Error: {message.error}")
-    except Exception as e:
-        if "rate_limit_event" in str(e):
-            pass
-        else:
-            raise
+    async for message in receive_resumable(client, print_rate_limit_notice):
+        if isinstance(message, AssistantMessage):
+            for block in message.content:
+                if hasattr(block, "text") and block.text.strip():
+                    print(f"\n📊 {block.text}")
+                elif hasattr(block, "name"):
+                    print(f"  🔧 {block.name}")
+        elif isinstance(message, ResultMessage):
+            if message.is_error:
+                print(f"\n❌ Error: {message.result or message.subtype}")
 
 
 async def main():
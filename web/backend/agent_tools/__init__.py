@@ -0,0 +1,44 @@
+"""MCP tools shared by the dashboard server and the CLI agents.
+
+Each tool group is one module: ``support`` (customer support), ``prep``
+(meeting prep), ``analytics`` (retail analyzer, in ``retail.py``) and
+``assistant`` (step3/step4 notes and to-dos). A group is imported, and
+its SDK server built, the first time ``mcp_server`` asks for it, and then
+reused by every agent in the process. The stores and indexes behind the
+tools come from ``resources``, also built on first use, so importing this
+package does no I/O.
+"""
+import importlib
+import threading
+
+from claude_agent_sdk import create_sdk_mcp_server
+
+GROUPS = {"support": "support", "prep": "prep", "analytics": "retail", "assistant": "assistant"}
+
+_servers = {}
+_lock = threading.Lock()
+
+
+def tools(group: str) -> list:
+    return importlib.import_module(f".{GROUPS[group]}", __name__).TOOLS
+
+
+def mcp_server(group: str, extra=()):
+    """The SDK MCP server for ``group`` plus any ``extra`` tools, built once per process."""
+    key = (group, tuple(t.name for t in extra))
+    server = _servers.get(key)
+    if server is None:
+        with _lock:
+            server = _servers.get(key)
+            if server is None:
+                server = _servers[key] = create_sdk_mcp_server(group, "1.0.0", [*tools(group), *extra])
+    return server
+
+
+def mcp_servers(groups) -> dict:
+    return {group: mcp_server(group) for group in groups}
+
+
+def handlers(groups) -> dict:
+    """``mcp__<group>__<tool>`` -> tool handler, for every tool in ``groups``."""
+    return {f"mcp__{group}__{t.name}": t.handler for group in groups for t in tools(group)}
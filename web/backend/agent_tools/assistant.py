@@ -0,0 +1,60 @@
+"""Personal assistant tools for step3_tools.py and step4_subagents.py: notes and a to-do list."""
+from claude_agent_sdk import tool
+
+from async_io import run_io
+from metrics import instrument_tool
+from note_store import format_results
+from todo_store import format_todos, parse_list_filter, parse_todo_id
+
+from .resources import notes, todos
+
+
+@tool("save_note", "Save a note with a title and content to local storage", {"title": str, "content": str, "tags": str})
+@instrument_tool("assistant", "save_note")
+async def save_note(args: dict) -> dict:
+    store = notes()
+    note = await run_io(store.save, args["title"], args["content"], args.get("tags", ""))
+    return {"content": [{"type": "text", "text": f"Note saved: {store.directory / note['filename']}"}]}
+
+
+@tool("search_notes", "Search saved notes by keyword or tag (best matches first; 'tag:name' for tags only)", {"query": str})
+@instrument_tool("assistant", "search_notes")
+async def search_notes(args: dict) -> dict:
+    results = await run_io(notes().search, args["query"])
+    if not results:
+        return {"content": [{"type": "text", "text": "No notes found matching your query."}]}
+    return {"content": [{"type": "text", "text": format_results(results)}]}
+
+
+@tool("manage_todos", "Add, complete, or list to-do items. add: item is the task. complete: item is the "
+      "item id (#n). list: item filters, e.g. '' (open), 'done', 'all', 'recent 10', 'page 2'", {
+    "action": str,
+    "item": str,
+})
+@instrument_tool("assistant", "manage_todos")
+async def manage_todos(args: dict) -> dict:
+    action = args["action"].lower()
+
+    if action == "add":
+        todo = await run_io(todos().add, args["item"])
+        return {"content": [{"type": "text", "text": f"Added #{todo['id']}: {todo['task']}"}]}
+
+    elif action == "complete":
+        todo_id = parse_todo_id(args["item"])
+        if todo_id is None:
+            return {"content": [{"type": "text", "text": "Please provide the item id, e.g. 3 or #3."}]}
+        todo = await run_io(todos().complete, todo_id)
+        if todo is None:
+            return {"content": [{"type": "text", "text": f"No to-do item #{todo_id}."}]}
+        if not todo["changed"]:
+            return {"content": [{"type": "text", "text": f"Already completed: #{todo_id} {todo['task']}"}]}
+        return {"content": [{"type": "text", "text": f"Completed: #{todo_id} {todo['task']}"}]}
+
+    elif action == "list":
+        result = await run_io(todos().list, **parse_list_filter(args.get("item", "")))
+        return {"content": [{"type": "text", "text": format_todos(result)}]}
+
+    return {"content": [{"type": "text", "text": f"Unknown action: {action}"}]}
+
+
+TOOLS = [save_note, search_notes, manage_todos]
@@ -0,0 +1,71 @@
+"""Meeting prep tools: saved briefings and parallel company research."""
+import time
+
+from claude_agent_sdk import tool
+
+from async_io import run_io
+from metrics import instrument_tool
+from research import format_dossier
+
+from .resources import BRIEFING_FRESH_DAYS, RESEARCH_CACHE_SECONDS, TOOL_CACHE, briefings, researcher
+
+
+@tool("save_briefing", "Save a meeting briefing document", {"company_name": str, "content": str, "meeting_date": str})
+@instrument_tool("meeting_prep", "save_briefing")
+async def save_briefing(args: dict) -> dict:
+    record = await run_io(briefings().save, args["company_name"], args["content"], args.get("meeting_date") or None)
+    if not record["created"]:
+        return {"content": [{"type": "text", "text": f"Identical briefing already saved: {record['filename']}"}]}
+    text = f"Briefing saved: {record['filename']} ({len(record['sources'])} sources)"
+    if record["changes"]:
+        changes = record["changes"]
+        text += (f"\nChanges since the {changes['previous']['created_at'][:10]} briefing: "
+                 f"+{changes['added_lines']} / -{changes['removed_lines']} lines")
+    return {"content": [{"type": "text", "text": text}]}
+
+
+@tool("find_briefing", "Return the latest briefing for a company if it is recent enough to reuse", {"company_name": str, "max_age_days": int})
+@instrument_tool("meeting_prep", "find_briefing")
+async def find_briefing(args: dict) -> dict:
+    max_age = args.get("max_age_days") or BRIEFING_FRESH_DAYS
+    record = await run_io(briefings().find_fresh, args["company_name"], max_age)
+    if record is None:
+        return {"content": [{"type": "text", "text": f"No briefing for {args['company_name']} in the last {max_age} days."}]}
+    header = (f"Briefing {record['filename']} — created {record['created_at'][:10]} ({record['age_days']} days ago), "
+              f"meeting date {record['meeting_date']}, {len(record['sources'])} sources")
+    return {"content": [{"type": "text", "text": f"{header}\n\n{record['content']}"}]}
+
+
+@tool("search_briefings", "Full-text search over saved briefings; an empty query lists the most recent", {"query": str})
+@instrument_tool("meeting_prep", "search_briefings")
+async def search_briefings(args: dict) -> dict:
+    query = (args.get("query") or "").strip()
+    if not query:
+        recent = await run_io(briefings().recent, limit=50)
+        text = "\n".join(f"{b['filename']} ({b['created_at'][:10]})" for b in recent) or "No briefings saved yet."
+        return {"content": [{"type": "text", "text": text}]}
+    hits = await run_io(briefings().search, query, limit=5)
+    if not hits:
+        return {"content": [{"type": "text", "text": "No matching briefings."}]}
+    results = [f"**{h['company']}** — {h['filename']} ({h['created_at'][:10]})\n{h['snippet']}" for h in hits]
+    return {"content": [{"type": "text", "text": "\n\n".join(results)}]}
+
+
+@tool("research_company", "Research a company: overview, recent news and leadership searched in parallel, with sources", {"company_name": str})
+@instrument_tool("meeting_prep", "research_company")
+@TOOL_CACHE.cached(
+    "research_company",
+    version=lambda: int(time.time() // RESEARCH_CACHE_SECONDS),
+    key=lambda args: " ".join(args["company_name"].casefold().split()),
+)
+async def research_company(args: dict) -> dict:
+    research = researcher()
+    if research is None:
+        return {"content": [{"type": "text", "text": "Research backend not configured. Use one WebSearch instead."}], "is_error": True}
+    dossier = await research.research(args["company_name"].strip())
+    if not dossier["sources"]:
+        return {"content": [{"type": "text", "text": format_dossier(dossier) + "\n\nNo results. Use one WebSearch instead."}], "is_error": True}
+    return {"content": [{"type": "text", "text": format_dossier(dossier)}]}
+
+
+TOOLS = [find_briefing, search_briefings, research_company, save_briefing]
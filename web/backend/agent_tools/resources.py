@@ -0,0 +1,137 @@
+"""Paths, settings and the shared stores behind the tools.
+
+Each accessor builds its object on first call, importing the store module
+only then, and returns that same instance to every later caller in the
+process, whichever agent it serves. Nothing here touches the disk at
+import; the stores themselves create their directories and databases on
+first use.
+"""
+import os
+import threading
+from pathlib import Path
+
+from async_io import run_io
+from response_cache import ToolCache
+
+# ─── Paths ───
+BASE_DIR = Path(__file__).resolve().parents[3]
+BACKEND_DIR = BASE_DIR / "web" / "backend"
+SUPPORT_DIR = BASE_DIR / "use_cases" / "customer_support"
+KB_DIR = SUPPORT_DIR / "knowledge_base"
+SUPPORT_DATA_DIR = SUPPORT_DIR / "support_data"
+TICKETS_DIR = SUPPORT_DATA_DIR / "tickets"   # legacy one-JSON-file-per-ticket store, imported once
+LEGACY_LOG_FILE = SUPPORT_DATA_DIR / "conversation_log.json"
+ORDERS_FILE = Path(os.environ.get("ORDERS_FILE") or SUPPORT_DIR / "sample_data" / "orders.csv")
+BRIEFINGS_DIR = BASE_DIR / "use_cases" / "meeting_prep" / "briefings"
+DATA_DIR = BASE_DIR / "use_cases" / "retail_analyzer" / "sample_data"
+# step3/step4 keep their notes and to-dos under the working directory, as they always have
+ASSISTANT_DATA_DIR = Path(os.environ.get("ASSISTANT_DATA_DIR") or "assistant_data")
+
+# ─── Settings ───
+KB_SEARCH_MODE = "ranked"   # "ranked" (BM25 top-k) or "any" (every file matching any word)
+KB_TOP_K = 3
+KB_SNIPPET_CHARS = 1500     # total snippet budget per search result payload
+
+# Web research for meeting_prep runs against a SearXNG-style JSON search endpoint
+# (fixture_web.py offline); without one the agent falls back to WebSearch.
+RESEARCH_SEARCH_URL = os.environ.get("RESEARCH_SEARCH_URL")
+RESEARCH_CACHE_SECONDS = 3600
+BRIEFING_FRESH_DAYS = 7     # find_briefing default: reuse briefings younger than this
+
+TOOL_CACHE = ToolCache(max_entries=1024)
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def _shared(name: str, build):
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                instance = _instances[name] = build()
+    return instance
+
+
+# ─── Stores ───
+
+def kb_index():
+    from kb_index import KnowledgeBaseIndex
+    return _shared("kb_index", lambda: KnowledgeBaseIndex(KB_DIR, index_path=SUPPORT_DATA_DIR / "kb_index.json"))
+
+
+def tickets():
+    from ticket_store import TicketStore
+    return _shared("tickets", lambda: TicketStore(SUPPORT_DATA_DIR / "tickets.db", legacy_dir=TICKETS_DIR))
+
+
+def orders():
+    from order_store import OrderStore
+    return _shared("orders", lambda: OrderStore(ORDERS_FILE, SUPPORT_DATA_DIR / "orders.db"))
+
+
+def conversation_log():
+    from conversation_log import ConversationLog
+    return _shared("conversation_log", lambda: ConversationLog(SUPPORT_DATA_DIR / "conversation_log.jsonl"))
+
+
+def briefings():
+    from briefing_store import BriefingStore
+    return _shared("briefings", lambda: BriefingStore(BRIEFINGS_DIR))
+
+
+def researcher():
+    """The web research backend, or None when ``RESEARCH_SEARCH_URL`` isn't set."""
+    if RESEARCH_SEARCH_URL is None:
+        return None
+    from research import HttpSearchBackend, Researcher
+    return _shared("researcher", lambda: Researcher(HttpSearchBackend(RESEARCH_SEARCH_URL), concurrency=4, timeout=8.0))
+
+
+def analytics():
+    from analytics import RetailAnalytics
+    return _shared("analytics", lambda: RetailAnalytics(DATA_DIR))
+
+
+def notes():
+    from note_store import NoteStore
+    return _shared("notes", lambda: NoteStore(ASSISTANT_DATA_DIR / "notes"))
+
+
+def todos():
+    from todo_store import TodoStore
+    # todos.json is the pre-SQLite list, imported once
+    return _shared("todos", lambda: TodoStore(ASSISTANT_DATA_DIR / "todos.db", legacy_file=ASSISTANT_DATA_DIR / "todos.json"))
+
+
+def close():
+    """Flush and close the stores that hold a writer, if they were ever used."""
+    for name in ("tickets", "conversation_log"):
+        instance = _instances.get(name)
+        if instance is not None:
+            instance.close()
+
+
+# ─── Data versions (for TOOL_CACHE and the answer cache) ───
+
+async def kb_generation() -> int:
+    index = kb_index()
+    if index.refresh_due():
+        await run_io(index.refresh)
+    return index.generation
+
+
+async def order_generation() -> int:
+    store = orders()
+    if store.refresh_due():
+        await run_io(store.refresh)
+    return store.generation
+
+
+async def loaded_analytics():
+    """The preloaded retail datasets, re-read off the event loop when a CSV changed."""
+    data = analytics()
+    if data.refresh_due():
+        await run_io(data.refresh)
+    return data
@@ -0,0 +1,95 @@
+"""Retail analytics tools over the preloaded sales, inventory and customer datasets."""
+from claude_agent_sdk import tool
+
+from analytics import format_table
+from async_io import run_io
+from metrics import instrument_tool
+
+from .resources import loaded_analytics
+
+
+@tool("sales_summary", "Total revenue, transactions, units sold and average transaction value", {})
+@instrument_tool("retail_analyzer", "sales_summary")
+async def sales_summary(args: dict) -> dict:
+    s = (await loaded_analytics()).sales_summary()
+    text = (
+        f"Total revenue: £{s['revenue']:,.2f}\nTransactions: {s['transactions']}\n"
+        f"Units sold: {s['units']}\nAverage transaction: £{s['avg_transaction']:,.2f}"
+    )
+    return {"content": [{"type": "text", "text": text}]}
+
+
+@tool(
+    "revenue_by",
+    "Revenue, units and share of revenue grouped by product, category, customer_type, payment_method, date or month. "
+    "Optional: grain (all, month, day), start/end dates (YYYY-MM-DD or YYYY-MM, inclusive), "
+    "where filters like 'category=Footwear, payment_method=card'",
+    {"dimension": str, "grain": str, "start": str, "end": str, "where": str},
+)
+@instrument_tool("retail_analyzer", "revenue_by")
+async def revenue_by(args: dict) -> dict:
+    dimension = (args.get("dimension") or "category").strip().lower()
+    where = dict(
+        (part.split("=", 1)[0].strip(), part.split("=", 1)[1].strip())
+        for part in (args.get("where") or "").split(",") if "=" in part
+    )
+    try:
+        rows = await run_io(
+            (await loaded_analytics()).revenue_by, dimension,
+            grain=(args.get("grain") or "all").strip().lower(),
+            start=args.get("start") or None, end=args.get("end") or None, where=where,
+        )
+    except ValueError as e:
+        return {"content": [{"type": "text", "text": str(e)}], "is_error": True}
+    if not rows:
+        return {"content": [{"type": "text", "text": "No sales match."}]}
+    headers = (["period"] if rows[0]["period"] else []) + ([dimension] if rows[0]["value"] != "all" else [])
+    table = format_table(
+        headers + ["revenue £", "units", "share %"],
+        [
+            ([r["period"]] if r["period"] else []) + ([r["value"]] if r["value"] != "all" else []) + [r["revenue"], r["units"], r["share"]]
+            for r in rows
+        ],
+    )
+    return {"content": [{"type": "text", "text": table}]}
+
+
+@tool("top_customers", "Top n customers ranked by total_spent, orders_count or loyalty_points", {"n": int, "by": str})
+@instrument_tool("retail_analyzer", "top_customers")
+async def top_customers(args: dict) -> dict:
+    try:
+        rows = (await loaded_analytics()).top_customers(int(args.get("n") or 3), args.get("by") or "total_spent")
+    except ValueError as e:
+        return {"content": [{"type": "text", "text": str(e)}], "is_error": True}
+    table = format_table(
+        ["customer", "name", "type", "city", "total_spent £", "orders", "loyalty_points"],
+        [(c["customer_id"], c["name"], c["type"], c["city"], c["total_spent"], c["orders_count"], c["loyalty_points"]) for c in rows],
+    )
+    return {"content": [{"type": "text", "text": table}]}
+
+
+@tool("low_stock", "Products whose in_stock is below reorder_level, largest shortfall first", {})
+@instrument_tool("retail_analyzer", "low_stock")
+async def low_stock(args: dict) -> dict:
+    rows = (await loaded_analytics()).low_stock()
+    if not rows:
+        return {"content": [{"type": "text", "text": "No products are below their reorder level."}]}
+    table = format_table(
+        ["product", "category", "in_stock", "reorder_level", "shortfall", "supplier"],
+        [(r["product"], r["category"], r["in_stock"], r["reorder_level"], r["shortfall"], r["supplier"]) for r in rows],
+    )
+    return {"content": [{"type": "text", "text": table}]}
+
+
+@tool("margin_by_product", "Unit margin, margin % and realised gross profit from sales for every product", {})
+@instrument_tool("retail_analyzer", "margin_by_product")
+async def margin_by_product(args: dict) -> dict:
+    rows = (await loaded_analytics()).margin_by_product()
+    table = format_table(
+        ["product", "unit margin £", "margin %", "units sold", "gross profit £"],
+        [(r["product"], r["unit_margin"], r["margin_pct"], r["units_sold"], r["gross_profit"]) for r in rows],
+    )
+    return {"content": [{"type": "text", "text": table}]}
+
+
+TOOLS = [sales_summary, revenue_by, top_customers, low_stock, margin_by_product]
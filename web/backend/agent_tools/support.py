@@ -0,0 +1,71 @@
+"""Customer support tools: knowledge base search, tickets, order lookup, conversation log."""
+from datetime import datetime
+
+from claude_agent_sdk import tool
+
+from async_io import run_io
+from kb_index import tokenize
+from metrics import instrument_tool
+from order_store import format_lookup, split_references
+
+from .resources import (
+    KB_SEARCH_MODE, KB_SNIPPET_CHARS, KB_TOP_K, TOOL_CACHE, conversation_log, kb_generation, kb_index, order_generation,
+    orders, tickets,
+)
+
+
+@tool("search_knowledge_base", "Search the company knowledge base", {"query": str})
+@instrument_tool("customer_support", "search_knowledge_base")
+@TOOL_CACHE.cached(
+    "search_knowledge_base",
+    version=kb_generation,
+    key=lambda args: " ".join(sorted(set(tokenize(args["query"])))),
+)
+async def search_knowledge_base(args: dict) -> dict:
+    if KB_SEARCH_MODE == "ranked":
+        hits = await run_io(kb_index().search_ranked, args["query"], top_k=KB_TOP_K, max_chars=KB_SNIPPET_CHARS)
+        results = [f"**{stem}**\n{text}" for stem, text, _ in hits]
+    else:
+        results = [f"**{stem}**\n" + "\n".join(lines) for stem, lines in await run_io(kb_index().search, args["query"])]
+    if not results:
+        return {"content": [{"type": "text", "text": "No relevant information found. May need escalation."}]}
+    return {"content": [{"type": "text", "text": "\n\n---\n\n".join(results)}]}
+
+
+@tool("create_ticket", "Create a support ticket", {
+    "customer_name": str, "issue_summary": str, "priority": str, "category": str,
+})
+@instrument_tool("customer_support", "create_ticket")
+async def create_ticket(args: dict) -> dict:
+    ticket = await tickets().create(
+        args["customer_name"],
+        args["issue_summary"],
+        priority=args.get("priority", "medium"),
+        category=args.get("category", "general"),
+    )
+    return {"content": [{"type": "text", "text": f"Ticket {ticket['ticket_id']} created. A human agent will follow up within 24 hours."}]}
+
+
+@tool("check_order", "Look up orders by order or tracking number (several at once, comma-separated)", {"order_number": str})
+@instrument_tool("customer_support", "check_order")
+@TOOL_CACHE.cached("check_order", version=order_generation, key=lambda args: " ".join(split_references(args["order_number"])))
+async def check_order(args: dict) -> dict:
+    return {"content": [{"type": "text", "text": format_lookup(await run_io(orders().lookup, args["order_number"]))}]}
+
+
+# Not in TOOLS: only the CLI agent (use_cases/customer_support/agent.py) logs conversations
+@tool("log_conversation", "Log the conversation summary for quality and training purposes", {
+    "summary": str, "resolved": str, "category": str,
+})
+@instrument_tool("customer_support", "log_conversation")
+async def log_conversation(args: dict) -> dict:
+    await run_io(conversation_log().append, {
+        "timestamp": datetime.now().isoformat(),
+        "summary": args["summary"],
+        "resolved": args.get("resolved", "yes"),
+        "category": args.get("category", "general"),
+    })
+    return {"content": [{"type": "text", "text": "Conversation logged."}]}
+
+
+TOOLS = [search_knowledge_base, create_ticket, check_order]
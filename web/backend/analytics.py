@@ -0,0 +1,137 @@
+"""In-process analytics over the retail_analyzer CSV datasets.
+
+Each CSV is opened through its memory-mapped columnar sidecar
+(``columnar_cache.py``): numeric columns are typed buffers and text columns
+are dictionary-encoded (integer codes plus a list of distinct values).
+Frames are re-opened only when the source file's mtime or size changes, so
+answering a question is a loop over mapped arrays instead of a pandas
+subprocess. Sales aggregates come from the incremental rollup cube
+(``rollups.py``) rather than from the raw rows.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+
+from columnar_cache import ColumnarFrame, open_frame
+from rollups import SalesRollups
+
+DATASETS = {
+    "sales": "sales_2026.csv",
+    "inventory": "inventory.csv",
+    "customers": "customers.csv",
+}
+TABLES = ("inventory", "customers")   # opened as frames; sales aggregates come from the rollups
+
+
+def format_table(headers: list, rows: list) -> str:
+    """Markdown table; floats get two decimals."""
+    def cell(v):
+        return f"{v:,.2f}" if isinstance(v, float) else str(v)
+    lines = ["| " + " | ".join(headers) + " |", "|" + "---|" * len(headers)]
+    lines += ["| " + " | ".join(cell(v) for v in row) + " |" for row in rows]
+    return "\n".join(lines)
+
+
+class RetailAnalytics:
+    """Loads the three datasets lazily and answers the analyzer's common questions."""
+
+    SALES_DIMENSIONS = ("product", "category", "customer_type", "payment_method", "date", "month")
+    CUSTOMER_RANKINGS = ("total_spent", "orders_count", "loyalty_points")
+
+    def __init__(self, data_dir, check_interval=1.0):
+        self.data_dir = Path(data_dir)
+        self.check_interval = check_interval
+        self._tables = {}     # name -> (signature, ColumnarFrame)
+        self._lock = threading.Lock()
+        self._last_check = None
+        self.rollups = SalesRollups(self.data_dir / DATASETS["sales"], refresh_interval=check_interval)
+
+    # ─── Loading ───
+
+    def refresh_due(self) -> bool:
+        stale = self._last_check is None or time.monotonic() - self._last_check >= self.check_interval
+        return stale or self.rollups.refresh_due()
+
+    def refresh(self):
+        """Reload any table whose file changed and fold new sales rows into the rollups."""
+        self.rollups.refresh()
+        with self._lock:
+            for name in TABLES:
+                path = self.data_dir / DATASETS[name]
+                st = os.stat(path)
+                signature = (st.st_mtime_ns, st.st_size)
+                cached = self._tables.get(name)
+                if cached is None or cached[0] != signature:
+                    self._tables[name] = (signature, open_frame(path))
+            self._last_check = time.monotonic()
+
+    def table(self, name) -> ColumnarFrame:
+        if self.refresh_due():
+            self.refresh()
+        return self._tables[name][1]
+
+    # ─── Questions ───
+
+    def sales_summary(self) -> dict:
+        rows = self.rollups.query()
+        revenue, units, transactions = rows[0][2:] if rows else (0.0, 0, 0)
+        return {
+            "revenue": revenue,
+            "transactions": transactions,
+            "units": units,
+            "avg_transaction": revenue / transactions if transactions else 0.0,
+        }
+
+    def revenue_by(self, dimension: str, grain="all", start=None, end=None, where=None) -> list:
+        """Revenue, units and share of revenue per dimension value (and per period for grain month/day).
+
+        ``dimension`` is a sales column, or ``date``/``month`` as shorthand for a
+        per-period total. Returns dicts with ``period``, ``value``, ``revenue``,
+        ``units`` and ``share``, ordered by period then revenue.
+        """
+        if dimension not in self.SALES_DIMENSIONS:
+            raise ValueError(f"dimension must be one of: {', '.join(self.SALES_DIMENSIONS)}")
+        if dimension in ("date", "month"):
+            dimension, grain = "all", "day" if dimension == "date" else "month"
+        rows = self.rollups.query(dimension, grain, start, end, where)
+        revenue = sum(r[2] for r in rows) or 1.0
+        out = [
+            {"period": period, "value": value, "revenue": total, "units": quantity, "share": total / revenue * 100}
+            for period, value, total, quantity, _ in rows
+        ]
+        return sorted(out, key=lambda r: (r["period"] or "", -r["revenue"]))
+
+    def top_customers(self, n=3, by="total_spent") -> list:
+        if by not in self.CUSTOMER_RANKINGS:
+            raise ValueError(f"by must be one of: {', '.join(self.CUSTOMER_RANKINGS)}")
+        customers = self.table("customers")
+        ranked = sorted(range(customers.nrows), key=lambda i: -customers[by][i])[:max(1, n)]
+        return [customers.row(i) for i in ranked]
+
+    def low_stock(self) -> list:
+        inventory = self.table("inventory")
+        stock, reorder = inventory["in_stock"], inventory["reorder_level"]
+        rows = [
+            {**inventory.row(i), "shortfall": reorder[i] - stock[i]}
+            for i in range(inventory.nrows) if stock[i] < reorder[i]
+        ]
+        return sorted(rows, key=lambda r: -r["shortfall"])
+
+    def margin_by_product(self) -> list:
+        """Catalogue margin per product plus realised gross profit from sales."""
+        inventory = self.table("inventory")
+        sold = {value: {"quantity": quantity, "total": total} for _, value, total, quantity, _ in self.rollups.query("product")}
+        rows = []
+        for i in range(inventory.nrows):
+            product = inventory["product"][i]
+            cost, retail = inventory["cost_price"][i], inventory["retail_price"][i]
+            s = sold.get(product, {"quantity": 0, "total": 0.0})
+            rows.append({
+                "product": product,
+                "unit_margin": retail - cost,
+                "margin_pct": (retail - cost) / retail * 100 if retail else 0.0,
+                "units_sold": int(s["quantity"]),
+                "gross_profit": s["total"] - cost * s["quantity"],
+            })
+        return sorted(rows, key=lambda r: -r["gross_profit"])
@@ -0,0 +1,40 @@
+"""Shared async file I/O for MCP tools.
+
+Every WebSocket is served from the same event loop, so a tool that reads or
+writes files inline stalls every connected chat for the duration of the
+syscall. Tools route blocking work through ``run_io`` instead, which runs
+it on one bounded, process-wide thread pool.
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="tool-io")
+    return _executor
+
+
+async def run_io(fn, *args, **kwargs):
+    """Run a blocking callable on the shared I/O pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,74 @@
+"""Cold load time and RSS: parsing sales CSV text vs mapping its columnar sidecar.
+
+Each measurement runs in a fresh interpreter so peak RSS is comparable.
+``csv`` parses every row into Python objects (what each pandas snippet
+does in spirit); ``build`` is the one-off sidecar conversion; ``open`` maps
+the sidecar and sums the total column.
+
+    python3 web/backend/benchmarks/bench_columnar.py [--rows 2000000]
+"""
+import argparse
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+PROBE = """
+import csv, json, resource, sys, time
+sys.path.insert(0, {backend!r})
+import columnar_cache
+mode, path = {mode!r}, {path!r}
+start = time.perf_counter()
+if mode == "csv":
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    revenue = sum(float(r["total"]) for r in rows)
+elif mode == "build":
+    columnar_cache.ensure(path)
+    revenue = 0.0
+else:
+    frame = columnar_cache.open_frame(path)
+    revenue = sum(frame["total"])
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, "revenue": revenue}}))
+"""
+
+
+def measure(mode, path):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(backend=str(BACKEND_DIR), mode=mode, path=str(path))],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    products = [("Winter Jacket", "Outerwear", 89.99), ("Wool Scarf", "Accessories", 24.99),
+                ("Running Shoes", "Footwear", 119.99), ("Cotton T-Shirt", "Tops", 19.99)]
+    tmp = Path(tempfile.mkdtemp(prefix="columnar_"))
+    path = tmp / "sales_2026.csv"
+    with open(path, "w") as f:
+        f.write("date,product,category,quantity,unit_price,total,customer_type,payment_method\n")
+        for _ in range(args.rows):
+            product, category, price = rng.choice(products)
+            qty = rng.randint(1, 5)
+            day = date(2026, 1, 1) + timedelta(days=rng.randrange(365))
+            f.write(f"{day},{product},{category},{qty},{price},{qty * price:.2f},new,card\n")
+
+    print(f"{args.rows:,} rows, {path.stat().st_size / 1e6:.0f} MB CSV")
+    print(f"  {'mode':<6} {'ms':>9} {'peak RSS MB':>12}")
+    for mode in ("csv", "build", "open"):
+        r = measure(mode, path)
+        print(f"  {mode:<6} {r['ms']:>9.0f} {r['rss_mb']:>12.0f}")
+    shutil.rmtree(tmp, ignore_errors=True)
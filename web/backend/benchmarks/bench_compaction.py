@@ -0,0 +1,84 @@
+"""Context size of a long support conversation, with and without compaction.
+
+Simulates ``--turns`` customer_support turns, each searching the knowledge
+base (real snippets from use_cases/customer_support/knowledge_base) and
+answering, and estimates the prompt size of every model call (chars / 4,
+system prompt included) when the whole conversation is resent versus when
+a ContextLedger compacts it at ``--budget`` tokens, as websocket_endpoint
+does. No model calls are made.
+
+    python3 web/backend/benchmarks/bench_compaction.py [--turns 60] [--budget 8000]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from claude_agent_sdk import (
+    AssistantMessage, ResultMessage, StreamEvent, TextBlock, ToolResultBlock, ToolUseBlock, UserMessage,
+)
+from compaction import ContextLedger
+from kb_index import KnowledgeBaseIndex
+
+KB_DIR = Path(__file__).resolve().parents[3] / "use_cases" / "customer_support" / "knowledge_base"
+SYSTEM_TOKENS = 1500        # system prompt + tool definitions
+QUESTIONS = [
+    "How do I return a jacket I bought last week?", "What's your refund timeline?",
+    "Do you ship to Ireland?", "My order ORD-10482 hasn't arrived yet", "Can I change my delivery address?",
+    "How do I reset my password?", "Is there a warranty on shoes?", "Can I exchange for a different size?",
+]
+ANSWER = ("Thanks for checking! Based on our policy, {topic}. Let me know if there is anything else "
+          "I can help with — I'm happy to look into your order details too.")
+
+
+def turn_messages(n, question, kb_text, context_tokens) -> list:
+    call = ToolUseBlock(id=f"tool-{n}", name="mcp__support__search_knowledge_base", input={"query": question})
+    answer = ANSWER.format(topic=question.rstrip("?").lower())
+    usage = {"input_tokens": context_tokens}
+    return [
+        StreamEvent(uuid=f"e{n}", session_id="s", event={"type": "message_start", "message": {"usage": usage}}),
+        AssistantMessage(content=[call], model="haiku"),
+        UserMessage(content=[ToolResultBlock(tool_use_id=call.id, content=[{"type": "text", "text": kb_text}])]),
+        AssistantMessage(content=[TextBlock(text=answer)], model="haiku"),
+        ResultMessage(subtype="success", duration_ms=0, duration_api_ms=0, is_error=False, num_turns=2,
+                      session_id="s", usage=usage),
+    ]
+
+
+def simulate(index, turns, budget):
+    """Prompt tokens of the last model call of each turn; budget None never compacts."""
+    ledger = ContextLedger(budget or float("inf"))
+    sizes, conversation_chars, prefix = [], 0, ""
+    for n in range(turns):
+        question = QUESTIONS[n % len(QUESTIONS)]
+        hits = index.search_ranked(question, top_k=3, max_chars=1500)
+        kb_text = "\n\n---\n\n".join(f"**{stem}**\n{text}" for stem, text, _ in hits)
+        # the answering call sees everything so far plus this turn's question and tool result
+        conversation_chars += len(prefix) + len(question) + len(kb_text) + len(ANSWER) + 40
+        tokens = SYSTEM_TOKENS + conversation_chars // 4
+        ledger.record_turn(question, turn_messages(n, question, kb_text, tokens))
+        sizes.append(tokens)
+        prefix = ""
+        if ledger.over_budget():
+            prefix = ledger.compact()
+            conversation_chars = 0
+    return sizes, ledger.compactions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--budget", type=int, default=8000, help="compaction threshold (prompt tokens)")
+    args = parser.parse_args()
+
+    index = KnowledgeBaseIndex(KB_DIR)
+    full, _ = simulate(index, args.turns, None)
+    compacted, compactions = simulate(index, args.turns, args.budget)
+    print(f"{args.turns} turns, budget {args.budget} tokens")
+    print(f"  {'turn':>4}  {'full':>8}  {'compacted':>9}")
+    for n in sorted({0, 9, 19, 29, 39, 49, 99, 199, args.turns - 1}):
+        if n < args.turns:
+            print(f"  {n + 1:>4}  {full[n]:>8}  {compacted[n]:>9}")
+    print(f"  largest prompt       {max(full):>9} full, {max(compacted):>9} compacted")
+    print(f"  total prompt tokens  {sum(full):>9} full, {sum(compacted):>9} compacted "
+          f"({sum(full) / sum(compacted):.1f}x fewer), {compactions} compactions")
@@ -0,0 +1,86 @@
+"""Event-loop lag with many concurrent sessions running file-backed tools.
+
+Each simulated session repeatedly runs a tool that reads a knowledge base
+file and writes a small record, like search_knowledge_base/create_ticket do,
+then "thinks" for a few ms. ``--io-delay`` adds a blocking sleep to every
+tool call to stand in for a slow or contended disk. A probe task measures
+how late the loop wakes it up, once with the I/O done inline in the
+coroutine and once through the shared async_io pool.
+
+    python3 web/backend/benchmarks/bench_event_loop_lag.py [--sessions 200] [--calls 20] [--io-delay 0.002]
+"""
+import argparse
+import asyncio
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import async_io
+
+KB_DIR = Path(__file__).resolve().parents[3] / "use_cases" / "customer_support" / "knowledge_base"
+PROBE_INTERVAL = 0.005
+
+
+def blocking_tool(kb_files, out_dir, session, call, io_delay):
+    text = random.choice(kb_files).read_text()
+    (out_dir / f"{session}_{call}.json").write_text(f'{{"chars": {len(text)}}}')
+    if io_delay:
+        time.sleep(io_delay)
+    return len(text)
+
+
+async def session(mode, kb_files, out_dir, session_id, calls, io_delay):
+    for call in range(calls):
+        if mode == "inline":
+            blocking_tool(kb_files, out_dir, session_id, call, io_delay)
+        else:
+            await async_io.run_io(blocking_tool, kb_files, out_dir, session_id, call, io_delay)
+        await asyncio.sleep(random.uniform(0.005, 0.02))
+
+
+async def probe(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def run(mode, sessions, calls, io_delay):
+    out_dir = Path(tempfile.mkdtemp(prefix="loop_lag_"))
+    kb_files = sorted(KB_DIR.glob("*.md"))
+    lags, stop = [], asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(session(mode, kb_files, out_dir, i, calls, io_delay) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    shutil.rmtree(out_dir, ignore_errors=True)
+    lags.sort()
+    return {
+        "p50": statistics.median(lags) * 1000,
+        "p99": lags[int(len(lags) * 0.99) - 1] * 1000,
+        "max": lags[-1] * 1000,
+        "calls/s": sessions * calls / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=20, help="tool calls per session")
+    parser.add_argument("--io-delay", type=float, default=0.002, help="blocking seconds added per tool call")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions x {args.calls} tool calls, io delay {args.io_delay * 1000:.1f} ms, "
+          f"{async_io.IO_WORKERS} I/O workers")
+    print(f"  {'mode':<9} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11} {'calls/s':>9}")
+    for mode in ("inline", "async_io"):
+        stats = asyncio.run(run(mode, args.sessions, args.calls, args.io_delay))
+        print(f"  {mode:<9} {stats['p50']:>11.2f} {stats['p99']:>11.2f} {stats['max']:>11.2f} {stats['calls/s']:>9.0f}")
+    async_io.shutdown()
@@ -0,0 +1,162 @@
+"""Relevance and latency benchmark for knowledge base search.
+
+Compares the original glob-and-substring scan, the indexed any-word search
+and BM25 top-k ranking, on the real knowledge_base/*.md files and on a
+synthetic corpus.
+
+    python3 web/backend/benchmarks/bench_kb_search.py [--docs 10000]
+"""
+import argparse
+import itertools
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from kb_index import KnowledgeBaseIndex
+
+KB_DIR = Path(__file__).resolve().parents[3] / "use_cases" / "customer_support" / "knowledge_base"
+
+# (query, document that should answer it)
+LABELED_QUERIES = [
+    ("free shipping", "shipping_info"),
+    ("express delivery cost", "shipping_info"),
+    ("damaged package", "shipping_info"),
+    ("tracking", "shipping_info"),
+    ("reset password", "account_help"),
+    ("loyalty points", "account_help"),
+    ("klarna", "account_help"),
+    ("delete account", "account_help"),
+    ("return item", "returns_policy"),
+    ("refund", "returns_policy"),
+    ("exchange size", "returns_policy"),
+    ("warranty", "products_faq"),
+    ("wash wool", "products_faq"),
+    ("size guide", "products_faq"),
+    ("restock", "products_faq"),
+]
+
+
+def legacy_search(kb_dir, query):
+    """The original per-call glob + substring scan."""
+    query_words = query.lower().split()
+    results = []
+    for doc in kb_dir.glob("*.md"):
+        content = doc.read_text()
+        if any(word in content.lower() for word in query_words):
+            lines = content.split("\n")
+            relevant = []
+            for i, line in enumerate(lines):
+                if any(word in line.lower() for word in query_words):
+                    relevant = lines[max(0, i - 5):min(len(lines), i + 10)]
+                    break
+            results.append((doc.stem, "\n".join(relevant or lines[:20])))
+    return results
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return {
+        "p50": statistics.median(samples) * 1000,
+        "p95": samples[int(len(samples) * 0.95) - 1] * 1000,
+        "max": samples[-1] * 1000,
+    }
+
+
+def time_queries(fn, queries, repeat=3):
+    samples = []
+    for _ in range(repeat):
+        for q in queries:
+            start = time.perf_counter()
+            fn(q)
+            samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def relevance(kb_dir):
+    index = KnowledgeBaseIndex(kb_dir)
+    modes = {
+        "legacy": lambda q: [(stem, text) for stem, text in legacy_search(kb_dir, q)],
+        "indexed": lambda q: [(stem, "\n".join(lines)) for stem, lines in index.search(q)],
+        "bm25": lambda q: [(stem, text) for stem, text, _ in index.search_ranked(q, top_k=3, max_chars=1500)],
+    }
+    print(f"\nRelevance on {kb_dir} ({len(LABELED_QUERIES)} labeled queries)")
+    print(f"  {'mode':<8} {'hit@1':>6} {'MRR':>6} {'avg payload chars':>18}")
+    for mode, fn in modes.items():
+        hits, rr, payload = 0, 0.0, 0
+        for query, expected in LABELED_QUERIES:
+            results = fn(query)
+            stems = [stem for stem, _ in results]
+            if stems[:1] == [expected]:
+                hits += 1
+            if expected in stems:
+                rr += 1 / (stems.index(expected) + 1)
+            payload += sum(len(text) for _, text in results)
+        n = len(LABELED_QUERIES)
+        print(f"  {mode:<8} {hits / n:>6.2f} {rr / n:>6.2f} {payload / n:>18.0f}")
+
+
+def make_corpus(root, n_docs, seed=7):
+    """Write ``n_docs`` markdown articles built from a Zipf-ish vocabulary plus the real KB words."""
+    rng = random.Random(seed)
+    real_words = sorted({w for doc in KB_DIR.glob("*.md") for w in doc.read_text().lower().split() if w.isalpha()})
+    vocab = real_words + [f"term{i}" for i in range(20000)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+    for i in range(n_docs):
+        lines = [f"# Article {i}"]
+        for _ in range(rng.randint(2, 4)):
+            lines.append(f"## Section {rng.choice(vocab)}")
+            for _ in range(rng.randint(3, 8)):
+                lines.append("- " + " ".join(rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(6, 14))))
+        (root / f"article_{i:05d}.md").write_text("\n".join(lines) + "\n")
+    return [" ".join(rng.choices(real_words, k=rng.randint(1, 3))) for _ in range(50)]
+
+
+def latency(n_docs):
+    tmp = Path(tempfile.mkdtemp(prefix="kb_bench_"))
+    try:
+        corpus = tmp / "kb"
+        corpus.mkdir()
+        queries = make_corpus(corpus, n_docs)
+        index_path = tmp / "kb_index.json"
+
+        index = KnowledgeBaseIndex(corpus, index_path=index_path)
+        start = time.perf_counter()
+        index.refresh(force=True)
+        build = time.perf_counter() - start
+
+        reloaded = KnowledgeBaseIndex(corpus, index_path=index_path)
+        start = time.perf_counter()
+        reloaded.refresh(force=True)
+        reload = time.perf_counter() - start
+
+        (corpus / "article_00000.md").write_text("# Edited\n- free shipping on everything\n")
+        start = time.perf_counter()
+        index.refresh(force=True)
+        incremental = time.perf_counter() - start
+
+        print(f"\nSynthetic corpus: {n_docs} docs")
+        print(f"  full build {build:.2f}s, reload from disk {reload:.2f}s, one-file refresh {incremental:.2f}s")
+        print(f"  {'mode':<8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+        modes = {
+            "legacy": (lambda q: legacy_search(corpus, q), 1),
+            "indexed": (index.search, 3),
+            "bm25": (lambda q: index.search_ranked(q, top_k=3, max_chars=1500), 3),
+        }
+        for mode, (fn, repeat) in modes.items():
+            stats = time_queries(fn, queries[:10] if mode == "legacy" else queries, repeat)
+            print(f"  {mode:<8} {stats['p50']:>9.2f} {stats['p95']:>9.2f} {stats['max']:>9.2f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=10000, help="synthetic corpus size")
+    args = parser.parse_args()
+    relevance(KB_DIR)
+    latency(args.docs)
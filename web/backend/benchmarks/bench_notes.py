@@ -0,0 +1,89 @@
+"""search_notes at scale: substring scan of every file vs the indexed NoteStore.
+
+Writes ``--notes`` synthetic notes (title, tags header, a few sentences)
+to a temp directory, times the old search (read every ``.md`` file and
+check for the lowercased query), then imports the files into NoteStore
+and times ranked full-text and tag searches. The vocabulary is Zipf
+distributed, so the common-word queries match tens of thousands of notes.
+
+    python3 web/backend/benchmarks/bench_notes.py [--notes 100000] [--scan-queries 3]
+"""
+import argparse
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from note_store import NoteStore, render_note
+
+COMMON = ("meeting budget roadmap garden recipe invoice travel flight hotel design review launch bug "
+          "customer feedback hiring interview onboarding quarterly planning migration database cache "
+          "latency benchmark grocery birthday gift doctor appointment insurance mortgage renovation").split()
+# Zipf-distributed vocabulary: a few common words, a long tail of rare ones, like real notes
+WORDS = COMMON + [f"{a}{b}{c}" for c in ("", "ion", "ive", "er", "able", "ment")
+                  for a in ("pre", "re", "un", "over", "under", "multi", "inter", "sub", "co", "trans")
+                  for b in ("form", "port", "struct", "scribe", "ject", "tract", "duct", "press", "spect", "mit",
+                            "pose", "vert", "cede", "fer", "gress", "rupt", "sist", "tend", "vise", "voke")]
+WEIGHTS = [1 / rank for rank in range(1, len(WORDS) + 1)]
+TAGS = ["work", "personal", "ideas", "finance", "health", "travel", "home", "reading", "q3 plans", "urgent"]
+# common words (in a quarter of all notes, the worst case for ranking) and rarer ones
+QUERIES = ["quarterly roadmap", "hotel flight", "cache latency benchmark", "mortgage", "onboarding interview",
+           "transvoke", "subtractive preformer"]
+
+
+def write_notes(directory, count, rng):
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        when = start + timedelta(minutes=7 * i)
+        title = " ".join(rng.choices(WORDS, WEIGHTS, k=3)).capitalize()
+        body = "\n\n".join(" ".join(rng.choices(WORDS, WEIGHTS, k=12)).capitalize() + "." for _ in range(4))
+        tags = ", ".join(rng.sample(TAGS, rng.randint(0, 3)))
+        path = directory / f"{when:%Y%m%d_%H%M%S}_{title.replace(' ', '_').lower()}_{i}.md"
+        path.write_text(render_note(title, body, tags, when), encoding="utf-8")
+
+
+def scan(directory, query) -> int:
+    query = query.lower()
+    return sum(query in path.read_text(encoding="utf-8").lower() for path in directory.glob("*.md"))
+
+
+def timed(fn, *args, repeat=1):
+    out = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        out.append(time.perf_counter() - start)
+    return statistics.median(out), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--scan-queries", type=int, default=3, help="queries timed with the (slow) file scan")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench_notes_"))
+    notes_dir = root / "notes"
+    notes_dir.mkdir()
+    try:
+        write_notes(notes_dir, args.notes, random.Random(0))
+        print(f"{args.notes} notes, {sum(p.stat().st_size for p in notes_dir.glob('*.md')) / 2**20:.1f} MB")
+
+        scans = [timed(scan, notes_dir, q)[0] for q in QUERIES[:args.scan_queries]]
+        print(f"  file scan            {statistics.median(scans) * 1000:9.1f} ms/search")
+
+        store = NoteStore(notes_dir)
+        seconds, _ = timed(store.import_files)
+        print(f"  first-use import     {seconds:9.1f} s ({Path(store.db_path).stat().st_size / 2**20:.1f} MB index)")
+        for query in QUERIES + ["tag:q3 plans", "#urgent"]:
+            seconds, results = timed(store.search, query, repeat=20)
+            print(f"  search {query!r:26} {seconds * 1000:7.2f} ms  ({len(results)} results)")
+        seconds, _ = timed(store.save, "Benchmark note", "Checking save latency with the index in place.", "work")
+        print(f"  save                 {seconds * 1000:9.2f} ms")
+    finally:
+        shutil.rmtree(root)
@@ -0,0 +1,74 @@
+"""Sequential vs parallel subagent dispatch with stub subagents.
+
+Runs the plan "research X, then draft Y from it; analyze Z" through
+Orchestrator with stub clients that answer after a fixed latency per agent
+(``--researcher``, ``--writer``, ``--analyst`` seconds), once with
+concurrency 1 (one subagent at a time, like delegating through ``Task``
+call by call) and once with ``--concurrency``. A wider plan of
+``--fanout`` independent research tasks shows the concurrency cap, and
+``--straggler`` adds one task that never finishes before ``--timeout``.
+
+    python3 web/backend/benchmarks/bench_orchestrator.py [--concurrency 3] [--fanout 6]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from claude_agent_sdk import ClaudeAgentOptions
+from claude_agent_sdk.types import AgentDefinition
+from fake_sdk import StubClient
+from orchestrator import Orchestrator
+
+
+def stub_agents(latencies: dict) -> dict:
+    return {name: AgentDefinition(description=name, prompt=name, tools=[], model="haiku") for name in latencies}
+
+
+async def run(plan, latencies, concurrency, timeout):
+    orchestrator = Orchestrator(
+        stub_agents(latencies), max_concurrency=concurrency, task_timeout=timeout,
+        client_factory=lambda options: StubClient(options, latency=latencies[options.system_prompt]),
+        options_for=lambda definition: ClaudeAgentOptions(system_prompt=definition.prompt, model="haiku"),
+    )
+    started = time.perf_counter()
+    results = await orchestrator.run(plan)
+    return time.perf_counter() - started, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--researcher", type=float, default=1.2)
+    parser.add_argument("--writer", type=float, default=0.8)
+    parser.add_argument("--analyst", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--straggler", type=float, default=30.0, help="latency of the task that overruns")
+    parser.add_argument("--timeout", type=float, default=2.0, help="per-task timeout for the straggler run")
+    args = parser.parse_args()
+
+    latencies = {"researcher": args.researcher, "writer": args.writer, "analyst": args.analyst}
+    plan = [
+        {"id": "research", "agent": "researcher", "prompt": "Research X"},
+        {"id": "draft", "agent": "writer", "prompt": "Draft Y", "after": ["research"]},
+        {"id": "analyze", "agent": "analyst", "prompt": "Analyze Z"},
+    ]
+    longest = max(args.researcher + args.writer, args.analyst)
+    print(f"research X -> draft Y, analyze Z: sum {sum(latencies.values()):.1f}s, longest chain {longest:.1f}s")
+    for concurrency in (1, args.concurrency):
+        seconds, _ = asyncio.run(run(plan, latencies, concurrency, 60))
+        print(f"  concurrency {concurrency}  {seconds:6.2f}s")
+
+    fan = [{"id": f"r{i}", "agent": "researcher", "prompt": f"Research topic {i}"} for i in range(args.fanout)]
+    print(f"{args.fanout} independent research tasks ({args.researcher:.1f}s each)")
+    for concurrency in (1, args.concurrency, args.fanout):
+        seconds, _ = asyncio.run(run(fan, latencies, concurrency, 60))
+        print(f"  concurrency {concurrency}  {seconds:6.2f}s")
+
+    slow = {**latencies, "straggler": args.straggler}
+    seconds, results = asyncio.run(run(plan + [{"id": "slow", "agent": "straggler", "prompt": "Never ends"}],
+                                       slow, args.concurrency + 1, args.timeout))
+    statuses = ", ".join(f"{r['id']}={r['status']}" for r in results)
+    print(f"with a {args.straggler:.0f}s straggler and a {args.timeout:.1f}s task timeout: {seconds:.2f}s ({statuses})")
@@ -0,0 +1,98 @@
+"""check_order lookups: the old literal dict vs OrderStore over a large orders file.
+
+Writes ``--orders`` synthetic orders to a CSV, times the one-off load into
+SQLite, then times lookups as the old tool did them (build the sample dict
+on every call, exact key only) against OrderStore: a cold single lookup, an
+LRU hit, a batch of ``--batch`` order numbers, a tracking number and a
+customer's orders. The load is then repeated under tracemalloc, whose peak
+shows the file is streamed rather than held in memory.
+
+    python3 web/backend/benchmarks/bench_orders.py [--orders 1000000] [--ops 2000]
+"""
+import argparse
+import csv
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from order_store import OrderStore, format_lookup
+
+STATUSES = ["Delivered", "In Transit", "Processing", "Cancelled", "Returned"]
+PRODUCTS = ["Winter Jacket", "Wool Scarf", "Running Shoes", "Cotton T-Shirt", "Leather Belt", "Denim Jeans"]
+
+
+def old_check_order(order_number):
+    sample_orders = {
+        "ORD-001": {"status": "Delivered", "date": "2026-02-20", "items": "Blue Jacket (M)", "tracking": "RM12345678GB"},
+        "ORD-002": {"status": "In Transit", "date": "2026-02-22", "items": "Running Shoes (42)", "tracking": "RM87654321GB"},
+        "ORD-003": {"status": "Processing", "date": "2026-02-23", "items": "Wool Scarf, Gloves Set", "tracking": "Not yet assigned"},
+    }
+    return sample_orders.get(order_number.upper())
+
+
+def write_orders(path, count, rng):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["order_number", "customer_name", "email", "order_date", "status", "items", "tracking", "total"])
+        for i in range(1, count + 1):
+            customer = rng.randrange(count // 5 + 1)
+            writer.writerow([f"ORD-{i:03d}", f"Customer {customer}", f"customer{customer}@example.com",
+                             f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}", rng.choice(STATUSES), rng.choice(PRODUCTS),
+                             f"RM{10_000_000 + i}GB", f"{rng.uniform(10, 200):.2f}"])
+
+
+def median_us(fn, args_list) -> float:
+    out = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        out.append(time.perf_counter() - start)
+    return statistics.median(out) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--ops", type=int, default=2000, help="lookups timed per kind")
+    parser.add_argument("--batch", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    directory = Path(tempfile.mkdtemp(prefix="bench_orders_"))
+    try:
+        source = directory / "orders.csv"
+        write_orders(source, args.orders, rng)
+        store = OrderStore(source, directory / "orders.db", max_cached=4096)
+        started = time.perf_counter()
+        store.refresh(force=True)
+        load_seconds = time.perf_counter() - started
+        os.utime(source)       # a changed file: the next refresh reloads it
+        tracemalloc.start()
+        store.refresh(force=True)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{args.orders:,} orders ({source.stat().st_size / 1e6:.0f} MB CSV): load {load_seconds:.1f}s, "
+              f"peak Python memory {peak / 1e6:.1f} MB")
+
+        numbers = [f"ORD-{rng.randint(1, args.orders):03d}" for _ in range(args.ops)]
+        batches = [[f"ORD-{rng.randint(1, args.orders):03d}" for _ in range(args.batch)] for _ in range(args.ops // 10)]
+        hot = numbers[:100]
+        store.get_many(hot)
+        print(f"  old dict lookup         {median_us(old_check_order, [('ORD-002',)] * args.ops):8.1f} µs  (3 orders only)")
+        print(f"  store cold lookup       {median_us(store.get, [(n,) for n in numbers]):8.1f} µs")
+        print(f"  store LRU hit           {median_us(store.get, [(n,) for n in hot * 20]):8.1f} µs")
+        cold_batch = median_us(store.get_many, [(b,) for b in batches])
+        print(f"  store batch of {args.batch:<3}      {cold_batch:8.1f} µs  ({cold_batch / args.batch:.1f} µs per order)")
+        print(f"  tracking number         {median_us(store.by_tracking, [(f'RM{10_000_000 + rng.randint(1, args.orders)}GB',) for _ in range(args.ops)]):8.1f} µs")
+        print(f"  customer's orders       {median_us(store.by_customer, [(f'customer{rng.randrange(args.orders // 5)}@example.com',) for _ in range(args.ops)]):8.1f} µs")
+        text = ", ".join(batches[0])
+        print(f"  check_order, {args.batch} refs    {median_us(lambda: format_lookup(store.lookup(text)), [()] * 200):8.1f} µs")
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,54 @@
+"""Serial vs concurrent company research against the offline fixture web.
+
+Starts fixture_web.py in-process with ``--latency`` per response and runs
+``Researcher.research`` for ``--companies`` companies with concurrency 1
+(one request at a time, like issuing the searches one by one) and with each
+``--concurrency`` value, reporting wall time per briefing and how many
+duplicate URLs were dropped.
+
+    python3 web/backend/benchmarks/bench_research.py [--latency 0.4] [--concurrency 2 4 8]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import fixture_web
+from research import HttpSearchBackend, Researcher
+
+COMPANIES = ["Stripe", "Shopify", "Anthropic", "Spotify", "Monzo", "Canva", "Figma", "Notion"]
+
+
+async def run(url, concurrency, companies, timeout):
+    researcher = Researcher(HttpSearchBackend(url, timeout=timeout), concurrency=concurrency, timeout=timeout)
+    seconds = []
+    for company in companies:
+        dossier = await researcher.research(company)
+        seconds.append(dossier["seconds"])
+    return seconds, researcher.stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.4, help="fixture response delay (s)")
+    parser.add_argument("--companies", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--timeout", type=float, default=8.0)
+    args = parser.parse_args()
+
+    server = fixture_web.start(latency=args.latency)
+    url = f"http://127.0.0.1:{server.server_address[1]}/search"
+    companies = COMPANIES[:args.companies]
+
+    print(f"{len(companies)} companies, fixture latency {args.latency * 1000:.0f} ms per request")
+    baseline = None
+    for concurrency in [1] + args.concurrency:
+        seconds, stats = asyncio.run(run(url, concurrency, companies, args.timeout))
+        mean = statistics.mean(seconds)
+        baseline = baseline or mean
+        print(f"  concurrency {concurrency:<3} {mean * 1000:8.0f} ms/briefing  ({baseline / mean:4.1f}x)  "
+              f"{stats['searches']} searches, {stats['fetches']} fetches, {stats['duplicates']} duplicate URLs dropped, "
+              f"{stats['timeouts']} timeouts")
+    server.shutdown()
@@ -0,0 +1,79 @@
+"""Rollup cube vs full scan over a synthetic sales_2026.csv.
+
+Generates ``--rows`` sales rows, builds the cube once, then appends
+``--append`` rows and times the incremental refresh against rebuilding from
+scratch. Aggregate queries are timed from the cube and from a full scan.
+
+    python3 web/backend/benchmarks/bench_rollups.py [--rows 1000000] [--append 1000]
+"""
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from rollups import SalesRollups
+
+PRODUCTS = [
+    ("Winter Jacket", "Outerwear", 89.99), ("Rain Coat", "Outerwear", 74.99),
+    ("Wool Scarf", "Accessories", 24.99), ("Leather Belt", "Accessories", 34.99),
+    ("Running Shoes", "Footwear", 119.99), ("Hiking Boots", "Footwear", 139.99),
+    ("Cotton T-Shirt", "Tops", 19.99), ("Denim Jeans", "Bottoms", 59.99),
+]
+
+
+def write_rows(f, rng, n, first_day):
+    for _ in range(n):
+        product, category, price = rng.choice(PRODUCTS)
+        qty = rng.randint(1, 5)
+        day = first_day + timedelta(days=rng.randrange(365))
+        f.write(f"{day.isoformat()},{product},{category},{qty},{price},{qty * price:.2f},"
+                f"{rng.choice(('new', 'returning'))},{rng.choice(('card', 'paypal', 'cash'))}\n")
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--append", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    tmp = Path(tempfile.mkdtemp(prefix="rollups_"))
+    csv_path = tmp / "sales_2026.csv"
+    with open(csv_path, "w") as f:
+        f.write("date,product,category,quantity,unit_price,total,customer_type,payment_method\n")
+        write_rows(f, rng, args.rows, date(2026, 1, 1))
+
+    cube = SalesRollups(csv_path)
+    build_ms, _ = timed(cube.refresh)
+    with open(csv_path, "a") as f:
+        write_rows(f, rng, args.append, date(2026, 1, 1))
+    tail_ms, added = timed(cube.refresh)
+    rebuild_ms, _ = timed(SalesRollups(csv_path, state_path=tmp / "fresh.json").refresh)
+    reload_ms, _ = timed(SalesRollups(csv_path).refresh)
+
+    print(f"{args.rows:,} rows + {args.append:,} appended")
+    print(f"  initial build        {build_ms:>10.1f} ms")
+    print(f"  append ({added:,} rows)  {tail_ms:>10.1f} ms   (full rebuild {rebuild_ms:.1f} ms)")
+    print(f"  restart from sidecar {reload_ms:>10.1f} ms")
+    print(f"  {'query':<34} {'cube ms':>9} {'scan ms':>9}")
+    for label, q in (
+        ("revenue by category", ("category", "all")),
+        ("revenue by payment_method, month", ("payment_method", "month")),
+        ("revenue by product, Feb 2026", ("product", "all", "2026-02", "2026-02")),
+    ):
+        cube_ms, _ = timed(lambda: cube.query(*q), repeat=20)
+        scan_ms, _ = timed(lambda: cube.scan(*q))
+        print(f"  {label:<34} {cube_ms:>9.3f} {scan_ms:>9.0f}")
+    shutil.rmtree(tmp, ignore_errors=True)
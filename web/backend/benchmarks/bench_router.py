@@ -0,0 +1,73 @@
+"""Router decisions for a mix of support messages, and what each costs.
+
+Routes a sample of customer support messages (small talk, order status,
+FAQ questions, complaints, personal problems) through the customer support
+Router with the real knowledge base index and a local order table, prints
+each decision, then times ``--rounds`` passes over the sample. A fast path
+replaces a model turn (seconds, plus tokens); the decision itself takes
+microseconds.
+
+    python3 web/backend/benchmarks/bench_router.py [--rounds 200]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from kb_index import KnowledgeBaseIndex
+from router import Router
+
+KB_DIR = Path(__file__).resolve().parents[3] / "use_cases" / "customer_support" / "knowledge_base"
+ORDERS = {"ORD-002": "Order: ORD-002\nStatus: In Transit\nItems: Running Shoes (42)\nTracking: RM87654321GB"}
+MESSAGES = [
+    "hi there", "thanks!", "Thank you so much", "ok", "sure", "bye",
+    "ORD-002 status?", "where is ord 2", "ORD-9 please",
+    "can I pay with paypal", "how do I reset my password", "what is your return policy",
+    "do you ship internationally",
+    "My ORD-002 arrived damaged, I want a refund", "Hello, my order hasn't arrived",
+    "This is unacceptable, I want to speak to a manager",
+    "How do refunds work? And how long does shipping take?",
+]
+
+
+async def main(rounds):
+    index = KnowledgeBaseIndex(KB_DIR)
+
+    async def lookup(order):
+        return ORDERS.get(order, f"Order {order} not found.")
+
+    async def kb_search(query):
+        return index.search_ranked(query, top_k=3, max_chars=1500)
+
+    router = Router("haiku", "sonnet", lookup, kb_search, smalltalk=True)
+    await router.route("warm up the index")
+    routes = Counter()
+    for message in MESSAGES:
+        decision = await router.route(message)
+        routes[decision["route"]] += 1
+        print(f"  {decision['route']:<9} {decision['model'] or '-':<6}  {message}")
+    decision = await router.route("thanks!", last_reply="Shall I open a ticket for you?")
+    print(f"  {decision['route']:<9} {decision['model'] or '-':<6}  thanks! (after \"Shall I open a ticket for you?\")")
+
+    timings = {}
+    for _ in range(rounds):
+        for message in MESSAGES:
+            started = time.perf_counter()
+            decision = await router.route(message)
+            timings.setdefault(decision["route"], []).append(time.perf_counter() - started)
+    print(f"{len(MESSAGES)} messages: " + ", ".join(f"{n} {route}" for route, n in routes.items()))
+    for route, samples in timings.items():
+        samples.sort()
+        print(f"  {route:<9} median {statistics.median(samples) * 1e6:7.1f} µs   "
+              f"p99 {samples[int(len(samples) * 0.99) - 1] * 1e6:7.1f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds))
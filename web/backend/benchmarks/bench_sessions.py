@@ -0,0 +1,76 @@
+"""Memory and reopen cost of server-side session history.
+
+Writes ``--sessions`` conversations of ``--turns`` turns through
+SessionStore (one append per turn, as websocket_endpoint does), then
+reports the traced memory held with the LRU capped at ``--max-loaded``,
+on-disk size, and the time to reopen a session that was evicted (read back
+from disk) versus one still in memory.
+
+    python3 web/backend/benchmarks/bench_sessions.py [--sessions 10000] [--turns 6] [--max-loaded 1000]
+"""
+import argparse
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from session_store import SessionStore
+
+ANSWER = ("Thanks for reaching out! You can return unworn items within 30 days of delivery for a full refund. "
+          "Refunds are processed within 5-7 working days of us receiving the item. ") * 3
+
+
+def timed_opens(store, ids) -> list:
+    out = []
+    for session_id in ids:
+        start = time.perf_counter()
+        store.open("customer_support", session_id)
+        out.append(time.perf_counter() - start)
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--max-loaded", type=int, default=1000, help="sessions kept in memory (LRU)")
+    parser.add_argument("--max-chars", type=int, default=64000, help="history text kept per loaded session")
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp(prefix="bench_sessions_"))
+    try:
+        tracemalloc.start()
+        store = SessionStore(directory, max_sessions=args.max_loaded, max_chars=args.max_chars)
+        ids = [f"bench-{i:08d}" for i in range(args.sessions)]
+        start = time.perf_counter()
+        for session_id in ids:
+            session = store.open("customer_support", session_id)
+            for turn in range(args.turns):
+                store.append(session, [
+                    {"type": "user", "text": f"question {turn} about returns"},
+                    {"type": "tool", "text": "Using: mcp__support__search_knowledge_base"},
+                    {"type": "assistant", "text": ANSWER},
+                ], sdk_session_id=f"sdk-{session_id}")
+        written = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        disk = sum(p.stat().st_size for p in directory.rglob("*.jsonl"))
+        rng = random.Random(0)
+        hot = timed_opens(store, ids[-min(500, args.max_loaded):])
+        cold = timed_opens(store, rng.sample(ids[:-args.max_loaded], min(500, max(0, args.sessions - args.max_loaded))))
+
+        print(f"{args.sessions} sessions x {args.turns} turns, {args.max_loaded} kept in memory")
+        print(f"  append          {written / (args.sessions * args.turns) * 1e6:8.1f} us/turn")
+        print(f"  memory held     {current / 2**20:8.1f} MB (peak {peak / 2**20:.1f} MB), {store.snapshot()['in_memory']} sessions loaded")
+        print(f"  on disk         {disk / 2**20:8.1f} MB")
+        if cold:
+            print(f"  reopen evicted  {statistics.median(cold) * 1e6:8.1f} us median")
+        print(f"  reopen loaded   {statistics.median(hot) * 1e6:8.1f} us median")
+    finally:
+        shutil.rmtree(directory)
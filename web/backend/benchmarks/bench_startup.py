@@ -0,0 +1,72 @@
+"""Backend startup: how long importing server.py takes and what it touches.
+
+Imports ``--module`` in ``--runs`` fresh interpreters and reports the median
+import time and the number of modules loaded. The repository tree is
+snapshotted before the first import and after the last, so any file or
+directory the import creates is listed. One more run under
+``-X importtime`` shows which of the module's direct imports are slowest.
+Run it on two commits to compare.
+
+    python3 web/backend/benchmarks/bench_startup.py [--module server] [--runs 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+BASE_DIR = BACKEND_DIR.parents[1]
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv"}
+PROBE = "import sys, time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t, len(sys.modules))"
+
+
+def snapshot(root: Path) -> set:
+    paths = set()
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        paths.update(os.path.join(directory, name) for name in dirs + files)
+    return paths
+
+
+def import_once(module: str):
+    out = subprocess.run([sys.executable, "-c", PROBE.format(module=module)], cwd=BACKEND_DIR,
+                         capture_output=True, text=True, check=True).stdout.split()
+    return float(out[0]), int(out[1])
+
+
+def slowest_imports(module: str, top: int) -> list:
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:      # imported directly by ``module``
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="server")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    before = snapshot(BASE_DIR)
+    samples = [import_once(args.module) for _ in range(args.runs)]
+    created = sorted(snapshot(BASE_DIR) - before)
+
+    seconds = [s for s, _ in samples]
+    print(f"import {args.module}: median {statistics.median(seconds) * 1000:.1f} ms, "
+          f"min {min(seconds) * 1000:.1f} ms, {samples[0][1]} modules loaded")
+    print(f"created by the import: {len(created)} path(s)")
+    for path in created:
+        print(f"  {os.path.relpath(path, BASE_DIR)}")
+    print(f"slowest imports by {args.module} (cumulative):")
+    for micros, name in slowest_imports(args.module, args.top):
+        print(f"  {micros / 1000:8.1f} ms  {name}")
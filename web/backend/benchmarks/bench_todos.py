@@ -0,0 +1,82 @@
+"""manage_todos at scale: whole-file todos.json rewrites vs the SQLite TodoStore.
+
+Fills a list with ``--items`` to-dos (a tenth of them open), then times
+add, complete and list as the old tool did them (load the JSON, mutate,
+rewrite it with ``indent=2``; list renders every item) and through
+TodoStore (one insert / update; list reads one page of open items).
+
+    python3 web/backend/benchmarks/bench_todos.py [--items 10000 100000] [--ops 200]
+"""
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from todo_store import TodoStore, format_todos, parse_list_filter
+
+
+def json_add(path, task):
+    todos = json.loads(path.read_text())
+    todos.append({"task": task, "done": False, "created": datetime.now().isoformat()})
+    path.write_text(json.dumps(todos, indent=2))
+
+
+def json_complete(path, number):
+    todos = json.loads(path.read_text())
+    todos[number - 1]["done"] = True
+    path.write_text(json.dumps(todos, indent=2))
+
+
+def json_list(path):
+    todos = json.loads(path.read_text())
+    return "\n".join(f"  {'✅' if t['done'] else '⬜'} {i}. {t['task']}" for i, t in enumerate(todos, 1))
+
+
+def median_ms(fn, args_list) -> float:
+    out = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        out.append(time.perf_counter() - start)
+    return statistics.median(out) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--ops", type=int, default=200, help="operations timed per kind")
+    args = parser.parse_args()
+
+    for count in args.items:
+        directory = Path(tempfile.mkdtemp(prefix="bench_todos_"))
+        try:
+            legacy = directory / "todos.json"
+            todos = [{"task": f"task {i}", "done": i % 10 != 0, "created": "2026-01-01T00:00:00"} for i in range(count)]
+            legacy.write_text(json.dumps(todos, indent=2))
+            ops = min(args.ops, count // 10)
+            numbers = [i + 1 for i in range(0, count, 10)][:ops]
+
+            json_ms = {"add": median_ms(json_add, [(legacy, f"new {i}") for i in range(ops)]),
+                       "complete": median_ms(json_complete, [(legacy, n) for n in numbers]),
+                       "list": median_ms(json_list, [(legacy,)] * min(ops, 20))}
+
+            legacy.write_text(json.dumps(todos, indent=2))
+            store = TodoStore(directory / "todos.db", legacy_file=legacy)
+            store.list()       # first use: schema + one-time import
+            filters = parse_list_filter("")
+            store_ms = {"add": median_ms(store.add, [(f"new {i}",) for i in range(ops)]),
+                        "complete": median_ms(store.complete, [(n,) for n in numbers]),
+                        "list": median_ms(lambda: format_todos(store.list(**filters)), [()] * ops)}
+
+            print(f"{count} items")
+            for kind in ("add", "complete", "list"):
+                print(f"  {kind:<9} json {json_ms[kind]:9.2f} ms   store {store_ms[kind]:7.3f} ms   "
+                      f"({json_ms[kind] / store_ms[kind]:,.0f}x)")
+        finally:
+            shutil.rmtree(directory)
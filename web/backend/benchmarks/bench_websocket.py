@@ -0,0 +1,174 @@
+"""Backend overhead of websocket_endpoint under thousands of concurrent sockets.
+
+Runs the real FastAPI app with ``AGENT_CLIENT=replay`` (fake_sdk.ReplayClient
+playing benchmarks/replays.json, calling the real MCP tools) under uvicorn
+in this process, with a probe measuring event-loop lag. Load comes from
+``--procs`` client processes so client work doesn't share the server's GIL.
+Each client opens a socket, waits for ``Connected`` and sends
+``--messages`` messages, timing every frame against the moment its message
+was sent.
+
+    python3 web/backend/benchmarks/bench_websocket.py [--clients 2000] [--messages 3] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+PROBE_INTERVAL = 0.01
+
+
+def raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def percentiles(values) -> str:
+    if not values:
+        return "n/a"
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(len(values) * q))] * 1000
+    return f"p50 {pick(0.50):7.1f}  p95 {pick(0.95):7.1f}  p99 {pick(0.99):7.1f}  max {values[-1] * 1000:7.1f} ms"
+
+
+# ─── Client processes ───
+
+async def conversation(port, agent, index, messages, stats):
+    import websockets
+
+    start = time.perf_counter()
+    async with websockets.connect(f"ws://127.0.0.1:{port}/ws/{agent}?session=bench-{os.getpid()}-{index}",
+                                  max_size=None, open_timeout=120) as ws:
+        while json.loads(await ws.recv()).get("text") != "Connected":
+            pass
+        stats["connect"].append(time.perf_counter() - start)
+        stats["connected_at"].append(time.time())
+        for i in range(messages):
+            sent = time.perf_counter()
+            await ws.send(json.dumps({"text": f"bench {os.getpid()}-{index} question {i} about returns"}))
+            first = True
+            while True:
+                frame = json.loads(await ws.recv())
+                now = time.perf_counter() - sent
+                stats["frames"] += 1
+                stats["frame"].append(now)
+                if first:
+                    stats["first_frame"].append(now)
+                    first = False
+                if frame["type"] == "done":
+                    stats["turn"].append(now)
+                    break
+
+
+def client_process(port, agent, clients, offset, messages, results):
+    raise_fd_limit()
+    stats = {"connect": [], "connected_at": [], "first_frame": [], "frame": [], "turn": [], "frames": 0}
+
+    async def main():
+        started = time.time()
+        outcomes = await asyncio.gather(
+            *(conversation(port, agent, offset + i, messages, stats) for i in range(clients)), return_exceptions=True
+        )
+        stats["errors"] = [repr(o) for o in outcomes if isinstance(o, Exception)][:5]
+        stats["error_count"] = sum(isinstance(o, Exception) for o in outcomes)
+        stats["started"], stats["finished"] = started, time.time()
+
+    asyncio.run(main())
+    results.put(stats)
+
+
+# ─── Server ───
+
+async def probe(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def run(args):
+    import uvicorn
+    import server
+
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=args.port, log_level="warning", backlog=8192)
+    uv = uvicorn.Server(config)
+    serving = asyncio.create_task(uv.serve())
+    while not uv.started:
+        await asyncio.sleep(0.05)
+
+    lags, stop = [], asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    per_proc = -(-args.clients // args.procs)
+    procs = []
+    for p in range(args.procs):
+        n = min(per_proc, args.clients - p * per_proc)
+        if n > 0:
+            procs.append(ctx.Process(target=client_process, args=(args.port, args.agent, n, p * per_proc, args.messages, results)))
+    for proc in procs:
+        proc.start()
+    loop = asyncio.get_running_loop()
+    collected = [await loop.run_in_executor(None, results.get) for _ in procs]
+    for proc in procs:
+        proc.join()
+    stop.set()
+    await probe_task
+    uv.should_exit = True
+    await serving
+    return collected, lags
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=2000, help="concurrent WebSockets")
+    parser.add_argument("--messages", type=int, default=3, help="messages per WebSocket")
+    parser.add_argument("--procs", type=int, default=max(1, min(8, (os.cpu_count() or 2) - 1)), help="client processes")
+    parser.add_argument("--agent", default="customer_support")
+    parser.add_argument("--latency", type=float, default=0.2, help="replayed model latency before each turn (s)")
+    parser.add_argument("--chunk-interval", type=float, default=0.02, help="delay between streamed text chunks (s)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    os.environ.update({
+        "AGENT_CLIENT": "replay",
+        "REPLAY_LATENCY": str(args.latency),
+        "REPLAY_CHUNK_INTERVAL": str(args.chunk_interval),
+        "POOL_MAX_SIZE": str(args.clients),
+        "SESSIONS_DIR": tempfile.mkdtemp(prefix="bench_sessions_"),
+    })
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    collected, lags = asyncio.run(run(args))
+
+    merged = {key: [v for s in collected for v in s[key]] for key in ("connect", "connected_at", "first_frame", "frame", "turn")}
+    started = min(s["started"] for s in collected)
+    finished = max(s["finished"] for s in collected)
+    connected = len(merged["connect"])
+    errors = sum(s["error_count"] for s in collected)
+    frames = sum(s["frames"] for s in collected)
+    connect_span = (max(merged["connected_at"]) - started) if merged["connected_at"] else 0.0
+
+    print(f"{args.clients} WebSockets x {args.messages} messages to {args.agent} from {len(collected)} client processes "
+          f"(replay latency {args.latency * 1000:.0f} ms)")
+    print(f"  connected       {connected} ({errors} errors)")
+    print(f"  connections/s   {connected / connect_span if connect_span else 0:,.0f}")
+    print(f"  messages/s      {len(merged['turn']) / (finished - started):,.0f}")
+    print(f"  frames/s        {frames / (finished - started):,.0f}")
+    print(f"  connect         {percentiles(merged['connect'])}")
+    print(f"  first frame     {percentiles(merged['first_frame'])}")
+    print(f"  any frame       {percentiles(merged['frame'])}")
+    print(f"  full turn       {percentiles(merged['turn'])}")
+    print(f"  event-loop lag  {percentiles(lags)}")
+    for s in collected:
+        for e in s["errors"]:
+            print(f"  error: {e}")
@@ -0,0 +1,110 @@
+"""Throughput of the WebSocket backend vs worker count, with the stub SDK client.
+
+For each worker count the server is started as
+``AGENT_CLIENT=stub server.py --workers N`` and ``--clients`` concurrent
+WebSocket conversations each send ``--messages`` messages, waiting for
+``done`` after each. ``--cpu-ms`` makes every stub reply burn CPU on the
+worker's event loop (standing in for in-process tool work), which is what
+extra workers parallelise.
+
+    python3 web/backend/benchmarks/bench_workers.py [--workers 1 2 4] [--clients 64] [--messages 20] [--cpu-ms 2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import websockets
+
+SERVER = Path(__file__).resolve().parents[1] / "server.py"
+
+
+async def wait_port(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"server on port {port} did not start")
+            await asyncio.sleep(0.2)
+
+
+async def conversation(port, agent, messages, latencies):
+    session = uuid.uuid4().hex
+    async with websockets.connect(f"ws://127.0.0.1:{port}/ws/{agent}?session={session}", max_size=None) as ws:
+        while json.loads(await ws.recv()).get("text") != "Connected":
+            pass
+        for i in range(messages):
+            start = time.perf_counter()
+            await ws.send(json.dumps({"text": f"load test {session} message {i}"}))
+            while json.loads(await ws.recv())["type"] != "done":
+                pass
+            latencies.append(time.perf_counter() - start)
+
+
+async def drive(port, agent, clients, messages):
+    await wait_port(port)
+    latencies = []
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(conversation(port, agent, messages, latencies) for _ in range(clients)), return_exceptions=True
+    )
+    elapsed = time.perf_counter() - start
+    errors = sum(isinstance(r, Exception) for r in results)
+    latencies.sort()
+    return {
+        "msg/s": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99": latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000 if latencies else 0.0,
+        "errors": errors,
+    }
+
+
+def run(workers, args):
+    env = {
+        **os.environ,
+        "AGENT_CLIENT": "stub",
+        "STUB_LATENCY": str(args.latency),
+        "STUB_CPU_MS": str(args.cpu_ms),
+        "POOL_MAX_SIZE": str(args.clients),
+        "SESSIONS_DIR": tempfile.mkdtemp(prefix="bench_sessions_"),
+    }
+    proc = subprocess.Popen(
+        [sys.executable, str(SERVER), "--host", "127.0.0.1", "--port", str(args.port), "--workers", str(workers)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    try:
+        return asyncio.run(drive(args.port, args.agent, args.clients, args.messages))
+    finally:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--messages", type=int, default=20, help="messages per conversation")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub model latency in seconds")
+    parser.add_argument("--cpu-ms", type=float, default=2.0, help="stub CPU work per reply in ms")
+    parser.add_argument("--agent", default="retail_analyzer")
+    parser.add_argument("--port", type=int, default=8700)
+    args = parser.parse_args()
+
+    print(f"{args.clients} conversations x {args.messages} messages, stub latency {args.latency * 1000:.0f} ms, "
+          f"{args.cpu_ms} ms CPU per reply")
+    print(f"  {'workers':>7} {'msg/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers in args.workers:
+        r = run(workers, args)
+        print(f"  {workers:>7} {r['msg/s']:>8.0f} {r['p50']:>8.1f} {r['p99']:>8.1f} {r['errors']:>7}")
@@ -0,0 +1,243 @@
+"""Indexed store for meeting_prep briefings.
+
+Briefings are still written as ``{date}_{company}_briefing.md`` files, and
+each one is also recorded in SQLite (WAL) with its normalized company
+name, meeting date, the source URLs cited in it, a content hash and the
+token usage / cost of the turn that produced it. An FTS5 table over
+company and content backs full-text search with ranked snippets.
+
+Saving the same content for the same company again returns the existing
+briefing instead of writing a duplicate. ``find_fresh`` returns the newest
+briefing for a company within a maximum age, so the agent can reuse or
+update it rather than researching from scratch. Existing ``.md`` files in
+the directory are indexed on first use.
+"""
+import difflib
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS briefings (
+    id            INTEGER PRIMARY KEY,
+    company_key   TEXT NOT NULL,
+    company       TEXT NOT NULL,
+    meeting_date  TEXT NOT NULL,
+    created_at    TEXT NOT NULL,
+    filename      TEXT NOT NULL UNIQUE,
+    content_hash  TEXT NOT NULL,
+    content       TEXT NOT NULL,
+    sources       TEXT NOT NULL DEFAULT '[]',
+    input_tokens  INTEGER,
+    output_tokens INTEGER,
+    cost_usd      REAL,
+    UNIQUE (company_key, content_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_briefings_company ON briefings (company_key, created_at);
+CREATE INDEX IF NOT EXISTS idx_briefings_created ON briefings (created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS briefings_fts USING fts5(
+    company, content, content='briefings', content_rowid='id', tokenize='porter unicode61'
+);
+"""
+COLUMNS = ("id", "company", "meeting_date", "created_at", "filename", "sources", "input_tokens", "output_tokens", "cost_usd")
+
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "ltd", "limited", "llc", "plc", "corp", "corporation", "co", "company",
+    "gmbh", "ag", "sa", "bv", "nv", "group", "holdings",
+}
+URL_RE = re.compile(r"https?://[^\s)\]>\"']+")
+FILENAME_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})_(.+?)(?:_v\d+)?_briefing\.md$")
+FTS_TERM_RE = re.compile(r"\w+")
+
+
+def normalize_company(name: str) -> str:
+    """``"Stripe, Inc."``, ``"the stripe"`` and ``"STRIPE"`` all map to ``"stripe"``."""
+    words = re.sub(r"[^\w\s&]", " ", name.casefold().replace("_", " ")).split()
+    if words and words[0] == "the":
+        words = words[1:]
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(" ".join(content.split()).encode()).hexdigest()
+
+
+def extract_sources(content: str) -> list:
+    return list(dict.fromkeys(url.rstrip(".,;") for url in URL_RE.findall(content)))
+
+
+def fts_query(text: str) -> str:
+    """Quote each word so user input can't break FTS5 syntax; any word may match, bm25 ranks."""
+    return " OR ".join(f'"{term}"' for term in FTS_TERM_RE.findall(text))
+
+
+def connect(db_path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class BriefingStore:
+    """Blocking API; call through ``run_io`` from the event loop."""
+
+    def __init__(self, directory, db_path=None):
+        self.directory = Path(directory)
+        self.db_path = Path(db_path) if db_path else self.directory / "briefings.db"
+        self._local = threading.local()
+        self._ready = False
+        self._write_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            conn = self._local.conn = connect(self.db_path)
+            if not self._ready:
+                with self._write_lock:
+                    if not self._ready:
+                        conn.executescript(SCHEMA)
+                        self._import_files(conn)
+                        self._ready = True
+        return conn
+
+    def _insert(self, conn, company, meeting_date, created_at, filename, content) -> int:
+        cursor = conn.execute(
+            "INSERT INTO briefings (company_key, company, meeting_date, created_at, filename, content_hash, content, sources) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (normalize_company(company), company, meeting_date, created_at, filename,
+             content_hash(content), content, json.dumps(extract_sources(content))),
+        )
+        conn.execute("INSERT INTO briefings_fts (rowid, company, content) VALUES (?, ?, ?)", (cursor.lastrowid, company, content))
+        return cursor.lastrowid
+
+    def _import_files(self, conn):
+        """Index ``*_briefing.md`` files not in the database yet (written before the store, or by hand)."""
+        known = {row[0] for row in conn.execute("SELECT filename FROM briefings")}
+        with conn:
+            for path in sorted(self.directory.glob("*_briefing.md")):
+                match = FILENAME_RE.match(path.name)
+                if path.name in known or not match:
+                    continue
+                content = path.read_text(encoding="utf-8")
+                created_at = datetime.fromtimestamp(path.stat().st_mtime).isoformat(timespec="seconds")
+                company = match.group(2).replace("_", " ")
+                try:
+                    self._insert(conn, company, match.group(1), created_at, path.name, content)
+                except sqlite3.IntegrityError:
+                    pass        # same content already indexed under another file name
+
+    # ─── Writes ───
+
+    def save(self, company: str, content: str, meeting_date=None) -> dict:
+        """Write and index a briefing. Returns the record plus ``created`` (False for a duplicate)
+        and ``changes`` (line diff against the previous briefing for the company, if any)."""
+        conn = self._conn()
+        key = normalize_company(company)
+        meeting_date = meeting_date or datetime.now().strftime("%Y-%m-%d")
+        with self._write_lock:
+            existing = conn.execute(
+                "SELECT * FROM briefings WHERE company_key = ? AND content_hash = ?", (key, content_hash(content))
+            ).fetchone()
+            if existing:
+                return {**self._record(existing), "created": False, "changes": None}
+            previous = conn.execute(
+                "SELECT * FROM briefings WHERE company_key = ? ORDER BY created_at DESC, id DESC LIMIT 1", (key,)
+            ).fetchone()
+
+            stem = f"{meeting_date}_{key.replace(' ', '_')[:50]}"
+            filename, n = f"{stem}_briefing.md", 1
+            while (self.directory / filename).exists():
+                n += 1
+                filename = f"{stem}_v{n}_briefing.md"
+            path = self.directory / filename
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(content, encoding="utf-8")
+            os.replace(tmp, path)
+            with conn:
+                briefing_id = self._insert(conn, company, meeting_date, datetime.now().isoformat(timespec="seconds"), filename, content)
+        record = self.get(briefing_id)
+        record["created"] = True
+        record["changes"] = diff_stats(previous["content"], content) | {"previous": self._record(previous)} if previous else None
+        return record
+
+    def record_usage(self, company: str, content: str, input_tokens=None, output_tokens=None, cost_usd=None) -> bool:
+        """Attach the producing turn's usage to the briefing saved with this exact content."""
+        conn = self._conn()
+        with self._write_lock, conn:
+            cursor = conn.execute(
+                "UPDATE briefings SET input_tokens = ?, output_tokens = ?, cost_usd = ? "
+                "WHERE company_key = ? AND content_hash = ? AND cost_usd IS NULL",
+                (input_tokens, output_tokens, cost_usd, normalize_company(company), content_hash(content)),
+            )
+        return cursor.rowcount > 0
+
+    # ─── Reads ───
+
+    def _record(self, row) -> dict:
+        record = {c: row[c] for c in COLUMNS}
+        record["sources"] = json.loads(record["sources"])
+        return record
+
+    def get(self, briefing_id: int, with_content=False):
+        row = self._conn().execute("SELECT * FROM briefings WHERE id = ?", (briefing_id,)).fetchone()
+        if row is None:
+            return None
+        record = self._record(row)
+        if with_content:
+            record["content"] = row["content"]
+        return record
+
+    def find_fresh(self, company: str, max_age_days=7):
+        """Newest briefing for the company created within ``max_age_days``, with content, or None."""
+        since = (datetime.now() - timedelta(days=max_age_days)).isoformat(timespec="seconds")
+        row = self._conn().execute(
+            "SELECT * FROM briefings WHERE company_key = ? AND created_at >= ? ORDER BY created_at DESC, id DESC LIMIT 1",
+            (normalize_company(company), since),
+        ).fetchone()
+        if row is None:
+            return None
+        record = self._record(row)
+        record["content"] = row["content"]
+        record["age_days"] = (datetime.now() - datetime.fromisoformat(row["created_at"])).days
+        return record
+
+    def recent(self, company=None, limit=20) -> list:
+        sql, params = "SELECT * FROM briefings", []
+        if company:
+            sql += " WHERE company_key LIKE ?"
+            params.append(f"%{normalize_company(company)}%")
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return [self._record(row) for row in self._conn().execute(sql, params)]
+
+    def search(self, query: str, limit=5) -> list:
+        """Best-matching briefings (bm25, company weighted above content) with a highlighted snippet."""
+        match = fts_query(query)
+        if not match:
+            return []
+        rows = self._conn().execute(
+            "SELECT b.*, snippet(briefings_fts, 1, '**', '**', ' … ', 24) AS snippet "
+            "FROM briefings_fts JOIN briefings b ON b.id = briefings_fts.rowid "
+            "WHERE briefings_fts MATCH ? ORDER BY bm25(briefings_fts, 5.0, 1.0) LIMIT ?",
+            (match, limit),
+        ).fetchall()
+        return [{**self._record(row), "snippet": row["snippet"]} for row in rows]
+
+
+def diff_stats(old: str, new: str) -> dict:
+    added = removed = 0
+    for line in difflib.unified_diff(old.splitlines(), new.splitlines(), lineterm="", n=0):
+        if line.startswith("+") and not line.startswith("+++"):
+            added += 1
+        elif line.startswith("-") and not line.startswith("---"):
+            removed += 1
+    return {"added_lines": added, "removed_lines": removed}
@@ -0,0 +1,273 @@
+"""Memory-mappable columnar sidecars for the retail CSVs.
+
+``<name>.csv.colcache/`` holds one raw binary file per column (native
+int64/float64, or int32 codes for dictionary-encoded text) plus a JSON
+dictionary per text column and a ``manifest.json`` describing the source
+file (size, mtime, sha256) and schema. Opening a frame maps the column
+files read-only and exposes them as ``memoryview``s, so nothing is parsed
+or copied and untouched columns never enter RSS.
+
+The sidecar is rebuilt only when the source changed: a size/mtime match is
+trusted, and on an mtime-only change the sha256 is compared before paying
+for a rebuild. New column files are written under a fresh generation prefix
+and the manifest is swapped atomically, so frames already open keep
+reading the previous files.
+
+    python3 web/backend/columnar_cache.py use_cases/retail_analyzer/sample_data/*.csv
+"""
+import csv
+import fcntl
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+from pathlib import Path
+
+CACHE_VERSION = 1
+SAMPLE_ROWS = 1000          # rows used to guess each column's type
+CHUNK_ROWS = 65536          # rows buffered per column before writing
+TYPES = {"int64": "q", "float64": "d", "dict": "i"}
+DEMOTE = {"int64": "float64", "float64": "dict"}
+
+
+class _Demote(Exception):
+    def __init__(self, column):
+        self.column = column
+
+
+class MappedDictColumn:
+    """Dictionary-encoded text column: ``codes[i]`` indexes into ``values``."""
+
+    def __init__(self, codes, values: list):
+        self.codes = codes
+        self.values = values
+        self._lookup = None
+
+    @property
+    def lookup(self) -> dict:
+        if self._lookup is None:
+            self._lookup = {v: i for i, v in enumerate(self.values)}
+        return self._lookup
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+
+class ColumnarFrame:
+    def __init__(self, columns: dict, nrows: int, manifest: dict):
+        self.columns = columns
+        self.nrows = nrows
+        self.manifest = manifest
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def row(self, i) -> dict:
+        return {name: col[i] for name, col in self.columns.items()}
+
+
+def cache_dir_for(csv_path) -> Path:
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + ".colcache")
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _guess_type(values) -> str:
+    for kind, cast in (("int64", int), ("float64", float)):
+        try:
+            for v in values:
+                cast(v)
+            return kind
+        except ValueError:
+            continue
+    return "dict"
+
+
+def _read_manifest(cache_dir: Path):
+    try:
+        manifest = json.loads((cache_dir / "manifest.json").read_text())
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != CACHE_VERSION or manifest.get("byteorder") != sys.byteorder:
+        return None
+    return manifest
+
+
+def _write_json(path: Path, data):
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, separators=(",", ":")))
+    os.replace(tmp, path)
+
+
+def _build(csv_path: Path, cache_dir: Path, source: dict) -> dict:
+    generation = f"{time.time_ns():x}"
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        sample = list(itertools.islice(reader, SAMPLE_ROWS))
+    types = [_guess_type(r[i] for r in sample if len(r) == len(header)) for i in range(len(header))]
+    while True:
+        try:
+            return _write_columns(csv_path, cache_dir, source, header, types, generation)
+        except _Demote as d:
+            types[d.column] = DEMOTE[types[d.column]]
+
+
+def _write_columns(csv_path, cache_dir, source, header, types, generation) -> dict:
+    casts = [int if t == "int64" else float if t == "float64" else None for t in types]
+    buffers = [array(TYPES[t]) for t in types]
+    lookups = [{} if t == "dict" else None for t in types]
+    paths = [cache_dir / f"{generation}.{i}.bin" for i in range(len(header))]
+    outputs = [open(p, "wb") for p in paths]
+    rows = skipped = 0
+    try:
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) != len(header):
+                    skipped += bool(row)
+                    continue
+                for i, value in enumerate(row):
+                    if casts[i] is not None:
+                        try:
+                            buffers[i].append(casts[i](value))
+                        except (ValueError, OverflowError):
+                            raise _Demote(i)
+                    else:
+                        code = lookups[i].get(value)
+                        if code is None:
+                            code = lookups[i][value] = len(lookups[i])
+                        buffers[i].append(code)
+                rows += 1
+                if rows % CHUNK_ROWS == 0:
+                    for buf, out in zip(buffers, outputs):
+                        buf.tofile(out)
+                        del buf[:]
+        for buf, out in zip(buffers, outputs):
+            buf.tofile(out)
+    except BaseException:
+        for out, path in zip(outputs, paths):
+            out.close()
+            path.unlink(missing_ok=True)
+        raise
+    for out in outputs:
+        out.close()
+    columns = []
+    for i, (name, kind) in enumerate(zip(header, types)):
+        column = {"name": name, "type": kind, "file": paths[i].name}
+        if kind == "dict":
+            column["dictionary"] = f"{generation}.{i}.dict.json"
+            _write_json(cache_dir / column["dictionary"], list(lookups[i]))
+        columns.append(column)
+    return {
+        "version": CACHE_VERSION,
+        "byteorder": sys.byteorder,
+        "generation": generation,
+        "source": source,
+        "rows": rows,
+        "skipped": skipped,
+        "columns": columns,
+    }
+
+
+def ensure(csv_path) -> dict:
+    """Return a manifest that matches ``csv_path``, rebuilding the sidecar if the source changed."""
+    csv_path = Path(csv_path)
+    cache_dir = cache_dir_for(csv_path)
+    st = os.stat(csv_path)
+    manifest = _read_manifest(cache_dir)
+    if manifest and (manifest["source"]["size"], manifest["source"]["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+        return manifest
+    cache_dir.mkdir(exist_ok=True)
+    with open(cache_dir / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)            # one builder per sidecar, across processes
+        manifest = _read_manifest(cache_dir)        # another process may have just rebuilt it
+        st = os.stat(csv_path)
+        source = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        if manifest and (manifest["source"]["size"], manifest["source"]["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            return manifest
+        source["sha256"] = file_sha256(csv_path)
+        if manifest and manifest["source"].get("sha256") == source["sha256"]:
+            manifest["source"] = source             # touched but unchanged
+        else:
+            manifest = _build(csv_path, cache_dir, source)
+        _write_json(cache_dir / "manifest.json", manifest)
+        keep = {"manifest.json", ".lock"} | {c["file"] for c in manifest["columns"]}
+        keep |= {c["dictionary"] for c in manifest["columns"] if "dictionary" in c}
+        for stale in cache_dir.iterdir():
+            if stale.name not in keep and not stale.name.endswith(".tmp"):
+                stale.unlink(missing_ok=True)       # open frames keep their mappings
+    return manifest
+
+
+def _map(path: Path, fmt: str):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(array(fmt))
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast(fmt)
+
+
+def open_frame(csv_path, columns=None) -> ColumnarFrame:
+    """Zero-copy view of a CSV through its sidecar; ``columns`` limits which are mapped."""
+    cache_dir = cache_dir_for(csv_path)
+    manifest = ensure(csv_path)
+    mapped = {}
+    for column in manifest["columns"]:
+        if columns and column["name"] not in columns:
+            continue
+        data = _map(cache_dir / column["file"], TYPES[column["type"]])
+        if column["type"] == "dict":
+            data = MappedDictColumn(data, json.loads((cache_dir / column["dictionary"]).read_text()))
+        mapped[column["name"]] = data
+    return ColumnarFrame(mapped, manifest["rows"], manifest)
+
+
+def read_pandas(csv_path, columns=None, copy=True):
+    """pandas DataFrame over the sidecar, typed like ``pd.read_csv`` would give.
+
+    By default the columns are copied out of the mapping (text as object
+    columns), so the frame can be modified in place. ``copy=False`` wraps the
+    mapped buffers via ``np.frombuffer`` instead, with text as Categoricals:
+    no copy, but the frame is read-only.
+    """
+    import numpy as np
+    import pandas as pd
+
+    frame = open_frame(csv_path, columns)
+    data = {}
+    for column in frame.manifest["columns"]:
+        name = column["name"]
+        if name not in frame.columns:
+            continue
+        col = frame[name]
+        if column["type"] == "dict":
+            codes = np.frombuffer(col.codes, dtype=np.int32)
+            values = pd.Categorical.from_codes(codes, categories=col.values)
+            data[name] = np.asarray(values, dtype=object) if copy else values
+        else:
+            values = np.frombuffer(col, dtype=np.int64 if column["type"] == "int64" else np.float64)
+            data[name] = values.copy() if copy else values
+    return pd.DataFrame(data, copy=False)
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:]:
+        start = time.perf_counter()
+        m = ensure(arg)
+        schema = ", ".join(f"{c['name']}:{c['type']}" for c in m["columns"])
+        print(f"{arg}: {m['rows']} rows in {(time.perf_counter() - start) * 1000:.1f} ms -> {cache_dir_for(arg)}\n  {schema}")
@@ -0,0 +1,145 @@
+"""Rolling context compaction for long conversations.
+
+The SDK resends the whole conversation on every ``client.query``, so a
+long chat gets slower and dearer each turn, and most of that context is
+tool output the model has already used: knowledge base snippets from
+``search_knowledge_base`` are the bulk of a support conversation.
+
+A ``ContextLedger`` follows one client's conversation: each turn's user
+text, answer and tool calls, with tool results reduced to references
+(which articles a search returned, which order was looked up). It tracks
+the context size of the last model call, from the ``message_start`` usage
+in the stream or, without partial messages, the turn's average from the
+``ResultMessage``. Once that passes ``budget_tokens``, ``compact()``
+returns a prompt prefix carrying an extractive summary of the older turns
+(merged into the previous summary) plus the last ``keep_turns`` turns
+verbatim. The caller resets the client (``/clear``) and prepends the
+prefix to the next query, so the new context starts at a few hundred
+tokens instead of the whole history.
+"""
+import re
+
+from claude_agent_sdk import AssistantMessage, ResultMessage, StreamEvent, UserMessage
+
+REFERENCE_RE = re.compile(r"\b(?:ORD-\d+|TKT-[0-9A-Z]{26}|[A-Z]{2}\d{8}GB)\b")
+KB_STEM_RE = re.compile(r"^\*\*([\w-]+)\*\*", re.MULTILINE)
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def usage_tokens(usage) -> int:
+    """Prompt-side tokens of one API call: fresh input plus cache reads and writes."""
+    usage = usage or {}
+    return sum(usage.get(k) or 0 for k in ("input_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"))
+
+
+def first_sentences(text: str, max_chars: int) -> str:
+    text = " ".join(text.split())
+    out = ""
+    for sentence in SENTENCE_RE.split(text):
+        if out and len(out) + len(sentence) + 1 > max_chars:
+            break
+        out = f"{out} {sentence}".strip()
+    return out if len(out) <= max_chars else out[:max_chars - 1] + "…"
+
+
+def tool_reference(name: str, args: dict, result_text: str) -> str:
+    """What a tool call contributed, without its output."""
+    short = name.split("__")[-1]
+    if short == "search_knowledge_base":
+        stems = KB_STEM_RE.findall(result_text)
+        found = f"articles {', '.join(stems)}" if stems else "nothing relevant"
+        return f"searched the knowledge base for \"{args.get('query', '')}\": {found} (search again to quote them)"
+    shown = ", ".join(f"{k}={v}" for k, v in args.items() if isinstance(v, (str, int, float)) and len(str(v)) <= 60)
+    refs = sorted(set(REFERENCE_RE.findall(result_text)))
+    return f"called {short}({shown})" + (f" → {', '.join(refs)}" if refs else "")
+
+
+class ContextLedger:
+    def __init__(self, budget_tokens=24_000, keep_turns=2, summary_chars=2_400, answer_chars=240):
+        self.budget_tokens = budget_tokens
+        self.keep_turns = keep_turns
+        self.summary_chars = summary_chars
+        self.answer_chars = answer_chars
+        self.turns = []                 # {"user", "answer", "tools": [reference, ...]}
+        self.summary = []               # summary lines of compacted turns, oldest first
+        self.references = set()         # order / ticket / tracking numbers seen anywhere
+        self.context_tokens = 0         # prompt size of the latest model call
+        self.compactions = 0
+
+    def seed(self, history):
+        """Start from stored session frames, for a client resumed or re-seeded with a recap."""
+        for frame in history:
+            text = frame.get("text", "")
+            if frame["type"] == "user":
+                self.turns.append({"user": text, "answer": "", "tools": []})
+            elif self.turns and frame["type"] == "assistant":
+                turn = self.turns[-1]
+                turn["answer"] = f"{turn['answer']}\n\n{text}".strip()
+            elif self.turns and frame["type"] == "tool":
+                self.turns[-1]["tools"].append(f"called {text.removeprefix('Using: ').split('__')[-1]}")
+            self.references.update(REFERENCE_RE.findall(text))
+
+    def record_turn(self, user_text: str, messages: list):
+        """Add a finished turn from the SDK messages process_response collected."""
+        answer, calls, tools = [], {}, []
+        last_start = result = None
+        for msg in messages:
+            if isinstance(msg, AssistantMessage):
+                for block in msg.content:
+                    if getattr(block, "text", "").strip():
+                        answer.append(block.text)
+                    elif hasattr(block, "name") and hasattr(block, "id"):
+                        calls[block.id] = (block.name, getattr(block, "input", {}) or {})
+            elif isinstance(msg, UserMessage) and isinstance(msg.content, list):
+                for block in msg.content:
+                    call = calls.pop(getattr(block, "tool_use_id", None), None)
+                    if call:
+                        text = block.content if isinstance(block.content, str) else " ".join(
+                            c.get("text", "") for c in block.content or () if isinstance(c, dict))
+                        tools.append(tool_reference(*call, text))
+                        self.references.update(REFERENCE_RE.findall(text))
+            elif isinstance(msg, StreamEvent) and msg.event.get("type") == "message_start":
+                last_start = msg.event.get("message", {}).get("usage")
+            elif isinstance(msg, ResultMessage):
+                result = msg
+        tools.extend(f"called {name.split('__')[-1]}" for name, _ in calls.values())
+        answer_text = "\n\n".join(answer)
+        self.references.update(REFERENCE_RE.findall(user_text + " " + answer_text))
+        self.turns.append({"user": user_text, "answer": answer_text, "tools": tools})
+
+        if last_start:
+            self.context_tokens = usage_tokens(last_start)
+        elif result is not None and result.usage:
+            self.context_tokens = usage_tokens(result.usage) // max(1, result.num_turns or 1)
+        else:
+            self.context_tokens += (len(user_text) + len(answer_text)) // 4
+
+    def over_budget(self) -> bool:
+        return self.context_tokens > self.budget_tokens and len(self.turns) > 2 * self.keep_turns
+
+    def compact(self) -> str:
+        """Fold all but the last ``keep_turns`` turns into the summary; returns the prompt prefix
+        for the first query after the client is reset."""
+        older, recent = self.turns[:-self.keep_turns or None], self.turns[-self.keep_turns:] if self.keep_turns else []
+        for turn in older:
+            line = f"- User: {first_sentences(turn['user'], 160)} → {first_sentences(turn['answer'], self.answer_chars) or '(no answer)'}"
+            if turn["tools"]:
+                line += f" [{'; '.join(turn['tools'])}]"
+            self.summary.append(line)
+        while sum(len(line) for line in self.summary) > self.summary_chars and len(self.summary) > 1:
+            self.summary.pop(0)
+
+        parts = ["[Conversation so far — older turns were summarized to keep the context small.]"]
+        if self.summary:
+            parts.append("Summary of earlier turns:\n" + "\n".join(self.summary))
+        if self.references:
+            parts.append("Reference numbers mentioned: " + ", ".join(sorted(self.references)))
+        for turn in recent:
+            tools = f"\n(Tools: {'; '.join(turn['tools'])})" if turn["tools"] else ""
+            parts.append(f"User: {turn['user']}{tools}\nYou: {turn['answer']}")
+        prefix = "\n\n".join(parts) + "\n\n[New message]\n"
+
+        self.turns = list(recent)       # quoted in full this time, summarized at the next compaction
+        self.context_tokens = len(prefix) // 4
+        self.compactions += 1
+        return prefix
@@ -0,0 +1,191 @@
+"""Append-only JSON Lines conversation log.
+
+Each entry is one line appended with O_APPEND, so writes are O(1) and
+concurrent writers (sessions, processes) never overwrite each other. fsync
+is batched, and once the live file passes ``max_bytes`` it is rotated to a
+timestamped archive, optionally gzip-compressed in the background.
+``iter_entries`` streams the archives and the live file in order, filtering
+by date and category without loading the history into memory.
+
+    python3 web/backend/conversation_log.py LOG [--since DATE] [--until DATE] [--category C]
+"""
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+
+def _iso(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Expected a date, datetime or ISO string, got {value!r}")
+
+
+class ConversationLog:
+    def __init__(self, path, fsync_every=20, fsync_interval=1.0, max_bytes=10 * 1024 * 1024, compress=True):
+        self.path = Path(path)
+        self.fsync_every = fsync_every          # fsync after this many unsynced entries...
+        self.fsync_interval = fsync_interval    # ...or once the oldest unsynced entry is this old
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._fd = None
+        self._inode = None
+        self._size = 0
+        self._unsynced = 0
+        self._first_unsynced = 0.0
+
+    # ─── Writing ───
+
+    def append(self, entry: dict):
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._ensure_open()
+            os.write(self._fd, line)
+            self._size += len(line)
+            if not self._unsynced:
+                self._first_unsynced = time.monotonic()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._first_unsynced >= self.fsync_interval:
+                self._sync()
+            if self._size >= self.max_bytes:
+                self._rotate()
+
+    def flush(self):
+        with self._lock:
+            if self._fd is not None:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                self._sync()
+                os.close(self._fd)
+                self._fd = None
+
+    def _ensure_open(self):
+        # Another process may have rotated the file out from under us
+        if self._fd is not None:
+            try:
+                if os.stat(self.path).st_ino == self._inode:
+                    return
+            except FileNotFoundError:
+                pass
+            self._sync()
+            os.close(self._fd)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        st = os.fstat(self._fd)
+        self._inode = st.st_ino
+        self._size = st.st_size
+
+    def _sync(self):
+        if self._unsynced:
+            os.fsync(self._fd)
+            self._unsynced = 0
+
+    def _rotate(self):
+        self._sync()
+        os.close(self._fd)
+        self._fd = None
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        archive = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        os.replace(self.path, archive)
+        if self.compress:
+            threading.Thread(target=_compress, args=(archive,), daemon=True).start()
+
+    # ─── Reading ───
+
+    def archives(self) -> list:
+        """Rotated files, oldest first. Names sort chronologically by their rotation stamp."""
+        prefix = f"{self.path.stem}."
+        files = [
+            p for p in self.path.parent.glob(f"{prefix}*")
+            if p != self.path and (p.name.endswith(self.path.suffix) or p.name.endswith(self.path.suffix + ".gz"))
+        ]
+        by_name = {}
+        for p in sorted(files, key=lambda p: p.name):
+            # while compressing, both copies exist briefly; the .gz is complete once it appears
+            by_name[p.name.removesuffix(".gz")] = p
+        return [by_name[name] for name in sorted(by_name)]
+
+    def iter_entries(self, since=None, until=None, category=None):
+        """Yield entries with ``since <= timestamp < until`` (ISO strings, dates or datetimes) and matching category."""
+        since, until = _iso(since), _iso(until)
+        for path in self.archives() + [self.path]:
+            if since and path != self.path and _rotated_at(path) < since:
+                continue   # every entry in this archive was written before it rotated
+            for entry in _read_lines(path):
+                ts = entry.get("timestamp", "")
+                if since and ts < since:
+                    continue
+                if until and ts >= until:
+                    continue
+                if category and entry.get("category") != category:
+                    continue
+                yield entry
+
+
+def _rotated_at(path) -> str:
+    stamp = path.name.removesuffix(".gz").rsplit(".", 2)[-2]
+    try:
+        return datetime.strptime(stamp, "%Y%m%dT%H%M%S%f").isoformat()
+    except ValueError:
+        return ""
+
+
+def _read_lines(path):
+    opener = gzip.open if path.suffix == ".gz" else open
+    try:
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue   # torn final line from a crash mid-write
+    except FileNotFoundError:
+        return   # compressed away or rotated between listing and opening
+
+
+def _compress(path):
+    tmp = path.with_name(path.name + ".gz.tmp")
+    with open(path, "rb") as src, gzip.open(tmp, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp, path.with_name(path.name + ".gz"))
+    path.unlink()
+
+
+def migrate_json_array(legacy_path, log: ConversationLog) -> int:
+    """Move entries from the old single-JSON-array log into ``log``. Returns the number migrated."""
+    legacy_path = Path(legacy_path)
+    if not legacy_path.exists():
+        return 0
+    entries = json.loads(legacy_path.read_text() or "[]")
+    for entry in entries:
+        log.append(entry)
+    log.flush()
+    legacy_path.rename(legacy_path.with_name(legacy_path.name + ".migrated"))
+    return len(entries)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print conversation log entries as JSON lines")
+    parser.add_argument("log", help="path to the live .jsonl log")
+    parser.add_argument("--since", help="ISO date/time, inclusive")
+    parser.add_argument("--until", help="ISO date/time, exclusive")
+    parser.add_argument("--category")
+    args = parser.parse_args()
+    for entry in ConversationLog(args.log).iter_entries(args.since, args.until, args.category):
+        print(json.dumps(entry, ensure_ascii=False))
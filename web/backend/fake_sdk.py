@@ -0,0 +1,213 @@
+"""Stand-ins for ClaudeSDKClient, for load tests and local runs without the Claude CLI.
+
+Selected in server.py with ``AGENT_CLIENT=stub`` or ``AGENT_CLIENT=replay``.
+Both implement the parts of the client interface the server and
+``ClientPool`` use (connect/disconnect/query/receive_response/set_model and
+``_transport.is_ready()``) and answer with real SDK message objects.
+
+``StubClient`` echoes each prompt after a configurable delay.
+``STUB_RATE_LIMITS=N`` makes the first N responses of every client end in a
+rate-limit error result instead (``is_error``, as the CLI reports a 429),
+to exercise the server's retry and backoff path.
+
+``ReplayClient`` plays recorded turns from a JSON file (``REPLAY_FILE``,
+default ``benchmarks/replays.json``): ``{agent_id: [turn, ...]}`` where a
+turn is ``{"match": [keywords], "steps": [...]}`` and each step is either
+``{"text": "..."}`` or ``{"tool": "mcp__server__name", "input": {...}}``.
+Tool steps call the real MCP tool handler and yield the ``ToolUseBlock`` /
+``ToolResultBlock`` pair the CLI would. ``{prompt}`` in text or string
+inputs is replaced by the user's message. Text is streamed as
+``StreamEvent`` deltas when the options ask for partial messages.
+
+    AGENT_CLIENT=stub STUB_LATENCY=0.05 STUB_CPU_MS=2 python3 web/backend/server.py --workers 4
+    AGENT_CLIENT=replay REPLAY_LATENCY=0.2 REPLAY_CHUNK_INTERVAL=0.02 python3 web/backend/server.py
+    AGENT_CLIENT=stub STUB_RATE_LIMITS=2 python3 web/backend/server.py
+"""
+import asyncio
+import itertools
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+from claude_agent_sdk import (
+    AssistantMessage,
+    ResultMessage,
+    StreamEvent,
+    TextBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+
+DEFAULT_REPLAY_FILE = Path(__file__).resolve().parent / "benchmarks" / "replays.json"
+
+
+class _Transport:
+    def __init__(self):
+        self.ready = False
+
+    def is_ready(self) -> bool:
+        return self.ready
+
+
+class StubClient:
+    """Echoes each prompt back. ``latency`` is awaited (model time); ``cpu_ms`` is
+    spent busy on the event loop (in-process tool work) before the reply."""
+
+    def __init__(self, options=None, latency=None, cpu_ms=None, rate_limits=None):
+        self.options = options
+        self.latency = float(os.environ.get("STUB_LATENCY", 0.05)) if latency is None else latency
+        self.cpu_ms = float(os.environ.get("STUB_CPU_MS", 0)) if cpu_ms is None else cpu_ms
+        self.rate_limits = int(os.environ.get("STUB_RATE_LIMITS", 0)) if rate_limits is None else rate_limits
+        self.model = getattr(options, "model", None) or "stub"
+        self.session_id = str(uuid.uuid4())
+        self._transport = _Transport()
+        self._pending = asyncio.Queue()
+
+    async def connect(self, prompt=None):
+        self._transport.ready = True
+
+    async def disconnect(self):
+        self._transport.ready = False
+
+    async def set_model(self, model=None):
+        self.model = model or "stub"
+
+    async def query(self, prompt, session_id="default"):
+        if not self._transport.ready:
+            raise RuntimeError("Not connected. Call connect() first.")
+        await self._pending.put(prompt)
+
+    async def receive_response(self):
+        prompt = await self._pending.get()
+        started = time.perf_counter()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.cpu_ms:
+            deadline = time.perf_counter() + self.cpu_ms / 1000
+            while time.perf_counter() < deadline:
+                pass
+        if self.rate_limits:
+            self.rate_limits -= 1
+            yield self._rate_limited(started)
+            return
+        yield AssistantMessage(content=[TextBlock(text=f"(stub) {prompt}")], model=self.model)
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        yield ResultMessage(
+            subtype="success",
+            duration_ms=elapsed_ms,
+            duration_api_ms=elapsed_ms,
+            is_error=False,
+            num_turns=1,
+            session_id=self.session_id,
+            total_cost_usd=0.0,
+            usage={"input_tokens": len(prompt.split()), "output_tokens": len(prompt.split()) + 1},
+            result=f"(stub) {prompt}",
+        )
+
+    def _rate_limited(self, started) -> ResultMessage:
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        return ResultMessage(
+            subtype="error_during_execution",
+            duration_ms=elapsed_ms,
+            duration_api_ms=elapsed_ms,
+            is_error=True,
+            num_turns=1,
+            session_id=self.session_id,
+            total_cost_usd=0.0,
+            usage={"input_tokens": 0, "output_tokens": 0},
+            result='API Error: 429 {"type":"error","error":{"type":"rate_limit_error","message":"Rate limited (stub)"}}',
+        )
+
+
+def load_replays(path=None) -> dict:
+    return json.loads(Path(path or os.environ.get("REPLAY_FILE") or DEFAULT_REPLAY_FILE).read_text())
+
+
+class ReplayClient(StubClient):
+    """Plays recorded turns for one agent, invoking its MCP tools for real.
+
+    ``latency`` is awaited before the first message of a turn and
+    ``chunk_interval`` between streamed text chunks of ``chunk_chars``.
+    """
+
+    def __init__(self, options=None, agent_id=None, tools=None, replays=None,
+                 latency=None, chunk_interval=None, chunk_chars=24):
+        super().__init__(options, latency=latency if latency is not None else float(os.environ.get("REPLAY_LATENCY", 0.2)), cpu_ms=0)
+        self.chunk_interval = float(os.environ.get("REPLAY_CHUNK_INTERVAL", 0.02)) if chunk_interval is None else chunk_interval
+        self.chunk_chars = chunk_chars
+        self.tools = tools or {}                    # "mcp__server__name" -> async handler(args)
+        self.turns = (replays if replays is not None else load_replays()).get(agent_id) or [{"steps": [{"text": "(replay) {prompt}"}]}]
+        self._fallback = itertools.cycle([t for t in self.turns if not t.get("match")] or self.turns)
+        self.partial = bool(getattr(options, "include_partial_messages", False))
+
+    def _pick(self, prompt: str) -> dict:
+        lowered = prompt.lower()
+        for turn in self.turns:
+            if any(k.lower() in lowered for k in turn.get("match", ())):
+                return turn
+        return next(self._fallback)
+
+    def _event(self, event: dict) -> StreamEvent:
+        return StreamEvent(uuid=str(uuid.uuid4()), session_id=self.session_id, event=event, parent_tool_use_id=None)
+
+    async def receive_response(self):
+        prompt = await self._pending.get()
+        started = time.perf_counter()
+        if prompt.strip() == "/clear":
+            yield self._result(prompt, "", started, turns=0)
+            return
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.rate_limits:
+            self.rate_limits -= 1
+            yield self._rate_limited(started)
+            return
+        output = []
+        for step in self._pick(prompt)["steps"]:
+            if "tool" in step:
+                async for message in self._run_tool(step, prompt):
+                    yield message
+                continue
+            text = step["text"].replace("{prompt}", prompt)
+            output.append(text)
+            if self.partial:
+                yield self._event({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+                for i in range(0, len(text), self.chunk_chars):
+                    if self.chunk_interval:
+                        await asyncio.sleep(self.chunk_interval)
+                    yield self._event({"type": "content_block_delta", "index": 0,
+                                       "delta": {"type": "text_delta", "text": text[i:i + self.chunk_chars]}})
+                yield self._event({"type": "content_block_stop", "index": 0})
+            yield AssistantMessage(content=[TextBlock(text=text)], model=self.model)
+        yield self._result(prompt, "\n".join(output), started)
+
+    async def _run_tool(self, step, prompt):
+        tool_id = f"toolu_{uuid.uuid4().hex[:24]}"
+        args = {k: v.replace("{prompt}", prompt) if isinstance(v, str) else v for k, v in step.get("input", {}).items()}
+        yield AssistantMessage(content=[ToolUseBlock(id=tool_id, name=step["tool"], input=args)], model=self.model)
+        handler = self.tools.get(step["tool"])
+        if handler is None:
+            result = {"content": [{"type": "text", "text": f"No such tool: {step['tool']}"}], "is_error": True}
+        else:
+            try:
+                result = await handler(args)
+            except Exception as e:
+                result = {"content": [{"type": "text", "text": str(e)}], "is_error": True}
+        yield UserMessage(content=[ToolResultBlock(tool_use_id=tool_id, content=result["content"], is_error=result.get("is_error"))])
+
+    def _result(self, prompt, text, started, turns=1) -> ResultMessage:
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        return ResultMessage(
+            subtype="success",
+            duration_ms=elapsed_ms,
+            duration_api_ms=elapsed_ms,
+            is_error=False,
+            num_turns=turns,
+            session_id=self.session_id,
+            total_cost_usd=0.0,
+            usage={"input_tokens": len(prompt.split()), "output_tokens": len(text.split())},
+            result=text,
+        )
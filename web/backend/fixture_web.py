@@ -0,0 +1,130 @@
+"""Local stand-in for web search and page fetches, for offline research runs.
+
+Serves a SearXNG-style ``GET /search?q=...&format=json`` and the HTML pages
+its results link to, generated deterministically from the query so any
+company works. Overview and leadership results share the company's "about"
+page, and news results repeat across queries, to exercise URL dedupe.
+``--latency`` delays every response, like a slow search API would.
+
+    python3 web/backend/fixture_web.py --port 8088 --latency 0.5
+    RESEARCH_SEARCH_URL=http://127.0.0.1:8088/search python3 web/backend/server.py
+"""
+import argparse
+import html
+import json
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOPICS = {
+    "leadership": ("ceo", "leadership", "founder", "executive"),
+    "news": ("news", "announces", "latest"),
+    "overview": (),
+}
+
+PAGES = {
+    "about": ("About {name}", "{name} builds products used by businesses worldwide. Founded over a decade ago, "
+                              "{name} is led by its CEO and co-founder, with offices in North America and Europe."),
+    "leadership": ("{name} leadership team", "The {name} executive team: Alex Morgan (CEO), Priya Shah (CTO), "
+                                             "Sam Lee (CFO). The board includes two independent directors."),
+    "products": ("{name} products", "{name} offers a core platform, an analytics add-on and an enterprise tier "
+                                    "with dedicated support."),
+    "competitors": ("{name} vs competitors", "Analysts compare {name} with two larger incumbents and several "
+                                             "venture-backed challengers."),
+    "news-funding": ("{name} raises new funding", "{name} announced a new funding round this year to expand "
+                                                  "internationally."),
+    "news-launch": ("{name} launches new product line", "{name} launched a new product line aimed at mid-market "
+                                                        "customers last quarter."),
+    "news-partnership": ("{name} announces partnership", "{name} and a major cloud provider announced a strategic "
+                                                         "partnership."),
+}
+
+RESULTS = {
+    "overview": ("about", "products", "competitors", "news-funding"),
+    "news": ("news-funding", "news-launch", "news-partnership"),
+    "leadership": ("leadership", "about", "news-launch"),
+}
+
+
+def topic_of(query: str) -> str:
+    words = set(re.findall(r"\w+", query.lower()))
+    return next((t for t, keys in TOPICS.items() if words & set(keys)), "overview")
+
+
+def company_of(query: str) -> str:
+    stop = {w for keys in TOPICS.values() for w in keys} | {"company", "overview", "team"}
+    words = [w for w in query.split() if w.lower() not in stop and not w.isdigit()]
+    return " ".join(words) or "Example"
+
+
+def slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, content_type, body: str):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        host = f"http://{self.headers.get('Host', 'localhost')}"
+
+        if url.path == "/search":
+            query = params.get("q", "")
+            company = company_of(query)
+            slug = slugify(company)
+            results = []
+            for i, page in enumerate(RESULTS[topic_of(query)]):
+                title, text = PAGES[page]
+                # The same page under a tracking parameter must still dedupe
+                suffix = "?utm_source=search" if i % 2 else ""
+                results.append({"title": title.format(name=company), "url": f"{host}/page/{slug}/{page}{suffix}",
+                                "content": text.format(name=company)[:160]})
+            return self._send(200, "application/json", json.dumps({"query": query, "results": results}))
+
+        match = re.fullmatch(r"/page/([\w-]+)/([\w-]+)/?", url.path)
+        if match and match.group(2) in PAGES:
+            company = match.group(1).replace("-", " ").title()
+            title, text = (s.format(name=html.escape(company)) for s in PAGES[match.group(2)])
+            return self._send(200, "text/html", f"<html><head><title>{title}</title><style>p{{}}</style></head>"
+                                                f"<body><nav>Home | About</nav><h1>{title}</h1><p>{text}</p></body></html>")
+        self._send(404, "text/plain", "not found")
+
+
+def start(host="127.0.0.1", port=0, latency=0.0) -> ThreadingHTTPServer:
+    """Start the fixture server on a background thread; ``server.server_address`` has the bound port."""
+    handler = type("Handler", (FixtureHandler,), {"latency": latency})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    server = start(args.host, args.port, args.latency)
+    print(f"Fixture web on http://{args.host}:{server.server_address[1]}/search")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,254 @@
+"""Persistent inverted index over the knowledge base markdown files.
+
+Postings map each term to the lines it appears on, and every file keeps the
+byte offset of each line, so a snippet window can be read straight from disk
+without rescanning the document. The index is saved as JSON next to the
+support data and only files whose mtime or size changed are re-tokenized.
+
+Files are also split into chunks (one per markdown section, capped at
+``CHUNK_LINES`` lines) that ``search_ranked`` scores with BM25.
+"""
+import bisect
+import json
+import math
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+INDEX_VERSION = 2
+TOKEN_RE = re.compile(r"\w+")
+CHUNK_LINES = 15
+MIN_PREFIX_LEN = 3    # shorter query words only match whole terms when ranking
+PREFIX_WEIGHT = 0.5   # score weight of a term matched by prefix rather than exactly
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_RE.findall(text.lower())
+
+
+class KnowledgeBaseIndex:
+    """Inverted index of ``*.md`` files in ``kb_dir``.
+
+    Nothing is read from disk until the first search. After that the
+    directory is re-stat'ed at most once per ``refresh_interval`` seconds,
+    so query cost depends on the number of matching postings rather than
+    on the size of the knowledge base.
+    """
+
+    def __init__(self, kb_dir, index_path=None, refresh_interval=2.0, lines_before=5, lines_after=10):
+        self.kb_dir = Path(kb_dir)
+        self.index_path = Path(index_path) if index_path else None
+        self.refresh_interval = refresh_interval
+        self.lines_before = lines_before
+        self.lines_after = lines_after
+        self.generation = 0
+        self._files = {}      # file name -> {"sig", "offsets", "terms", "chunks"}
+        self._postings = {}   # term -> {file name: [line numbers]}
+        self._vocab = []      # sorted terms, for prefix expansion
+        self._chunk_starts = {}   # file name -> first line of each chunk
+        self._chunk_count = 0
+        self._chunk_tokens = 0
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._last_refresh = None
+
+    # ─── Maintenance ───
+
+    def refresh_due(self) -> bool:
+        """True if the next search would re-scan the directory (and so touch the disk)."""
+        return self._last_refresh is None or time.monotonic() - self._last_refresh >= self.refresh_interval
+
+    def refresh(self, force=False) -> bool:
+        """Re-index new or changed files and drop deleted ones. Returns True if anything changed."""
+        now = time.monotonic()
+        if not force and not self.refresh_due():
+            return False
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+            current = self._scan()
+            removed = [name for name in self._files if name not in current]
+            changed = [name for name, sig in current.items() if self._files.get(name, {}).get("sig") != sig]
+            for name in removed:
+                self._remove(name)
+            for name in changed:
+                self._remove(name)
+                entry = self._index_file(name, current[name])
+                if entry is not None:
+                    self._add(name, entry)
+            self._last_refresh = now
+            if removed or changed:
+                self._vocab = sorted(self._postings)
+                self.generation += 1
+                self._save()
+            return bool(removed or changed)
+
+    def _scan(self) -> dict:
+        sigs = {}
+        try:
+            with os.scandir(self.kb_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".md") and entry.is_file():
+                        st = entry.stat()
+                        sigs[entry.name] = [st.st_mtime_ns, st.st_size]
+        except FileNotFoundError:
+            pass
+        return sigs
+
+    def _index_file(self, name, sig):
+        try:
+            data = (self.kb_dir / name).read_bytes()
+        except FileNotFoundError:
+            return None
+        offsets = [0]
+        terms = {}
+        chunks = []   # [start line, token count]
+        for lineno, raw in enumerate(data.split(b"\n")):
+            offsets.append(offsets[-1] + len(raw) + 1)
+            line = raw.decode("utf-8", "replace")
+            if not chunks or line.startswith("#") or lineno - chunks[-1][0] >= CHUNK_LINES:
+                chunks.append([lineno, 0])
+            tokens = tokenize(line)
+            chunks[-1][1] += len(tokens)
+            for term in set(tokens):
+                terms.setdefault(term, []).append(lineno)
+        return {"sig": sig, "offsets": offsets, "terms": terms, "chunks": chunks}
+
+    def _add(self, name, entry):
+        self._files[name] = entry
+        self._chunk_starts[name] = [start for start, _ in entry["chunks"]]
+        self._chunk_count += len(entry["chunks"])
+        self._chunk_tokens += sum(length for _, length in entry["chunks"])
+        for term, lines in entry["terms"].items():
+            self._postings.setdefault(term, {})[name] = lines
+
+    def _remove(self, name):
+        entry = self._files.pop(name, None)
+        if entry is None:
+            return
+        del self._chunk_starts[name]
+        self._chunk_count -= len(entry["chunks"])
+        self._chunk_tokens -= sum(length for _, length in entry["chunks"])
+        for term in entry["terms"]:
+            docs = self._postings.get(term)
+            if docs is not None:
+                docs.pop(name, None)
+                if not docs:
+                    del self._postings[term]
+
+    def _load(self):
+        if not self.index_path or not self.index_path.exists():
+            return
+        try:
+            saved = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            return
+        if saved.get("version") != INDEX_VERSION:
+            return
+        for name, entry in saved["files"].items():
+            self._add(name, entry)
+        self._vocab = sorted(self._postings)
+
+    def _save(self):
+        if not self.index_path:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, "files": self._files}))
+        os.replace(tmp, self.index_path)
+
+    # ─── Queries ───
+
+    def expand(self, word: str) -> list:
+        """All indexed terms that start with ``word``."""
+        i = bisect.bisect_left(self._vocab, word)
+        terms = []
+        while i < len(self._vocab) and self._vocab[i].startswith(word):
+            terms.append(self._vocab[i])
+            i += 1
+        return terms
+
+    def read_lines(self, name: str, start: int, end: int) -> list:
+        """Read lines ``[start, end)`` of an indexed file using its stored offsets."""
+        offsets = self._files[name]["offsets"]
+        start = max(0, start)
+        end = min(len(offsets) - 1, end)
+        if start >= end:
+            return []
+        with open(self.kb_dir / name, "rb") as f:
+            f.seek(offsets[start])
+            data = f.read(offsets[end] - offsets[start] - 1)
+        return data.decode("utf-8", "replace").split("\n")
+
+    def search(self, query: str) -> list:
+        """Return ``(doc_stem, lines)`` for every document containing any query word.
+
+        A query word matches any indexed term it is a prefix of, and the
+        snippet is cut around the first matching line of each document.
+        """
+        self.refresh()
+        with self._lock:
+            first_hit = {}
+            for word in set(tokenize(query)):
+                for term in self.expand(word):
+                    for name, lines in self._postings[term].items():
+                        if name not in first_hit or lines[0] < first_hit[name]:
+                            first_hit[name] = lines[0]
+            results = []
+            for name in sorted(first_hit):
+                line = first_hit[name]
+                snippet = self.read_lines(name, line - self.lines_before, line + self.lines_after)
+                results.append((Path(name).stem, snippet))
+            return results
+
+    def search_ranked(self, query: str, top_k=3, max_chars=1500, k1=1.2, b=0.75) -> list:
+        """Return the ``top_k`` best chunks as ``(doc_stem, text, score)``, best first.
+
+        Chunks are scored with BM25, counting matching lines as term
+        frequency. Each snippet is cut to ``max_chars // top_k`` characters,
+        so the total payload is bounded regardless of knowledge base size.
+        """
+        self.refresh()
+        with self._lock:
+            if not self._chunk_count:
+                return []
+            avg_len = self._chunk_tokens / self._chunk_count or 1
+            scores = {}
+            for word in set(tokenize(query)):
+                terms = self.expand(word) if len(word) >= MIN_PREFIX_LEN else [word] if word in self._postings else []
+                for term in terms:
+                    weight = 1.0 if term == word else PREFIX_WEIGHT
+                    tf = self._chunk_frequencies(term)
+                    idf = math.log(1 + (self._chunk_count - len(tf) + 0.5) / (len(tf) + 0.5))
+                    for key, freq in tf.items():
+                        length = self._files[key[0]]["chunks"][key[1]][1]
+                        norm = freq * (k1 + 1) / (freq + k1 * (1 - b + b * length / avg_len))
+                        scores[key] = scores.get(key, 0.0) + weight * idf * norm
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+            budget = max(1, max_chars // top_k)
+            results = []
+            for (name, chunk), score in ranked:
+                chunks = self._files[name]["chunks"]
+                start = chunks[chunk][0]
+                end = chunks[chunk + 1][0] if chunk + 1 < len(chunks) else len(self._files[name]["offsets"]) - 1
+                text = "\n".join(self.read_lines(name, start, end)).strip()
+                if len(text) > budget:
+                    text = text[:budget - 1].rstrip() + "…"
+                results.append((Path(name).stem, text, round(score, 4)))
+            return results
+
+    def _chunk_frequencies(self, term) -> dict:
+        """Map ``(file name, chunk number)`` to the number of lines in that chunk containing ``term``."""
+        tf = {}
+        for name, lines in self._postings.get(term, {}).items():
+            starts = self._chunk_starts[name]
+            if len(starts) == 1:
+                tf[(name, 0)] = len(lines)
+                continue
+            for line in lines:
+                key = (name, bisect.bisect_right(starts, line) - 1)
+                tf[key] = tf.get(key, 0) + 1
+        return tf
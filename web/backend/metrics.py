@@ -0,0 +1,221 @@
+"""Low-overhead counters and histograms with Prometheus text exposition.
+
+Metrics are registered once at import time; ``labels(...)`` returns a
+cached child, so an observation on the hot path is one dict lookup, a
+bisect over the bucket bounds and a few additions. Everything is updated
+from the event loop thread, so there is no locking.
+
+``REGISTRY.render()`` produces the text format served at ``/api/metrics``.
+In multi-worker mode each worker adds a ``worker`` label (``WORKER_ID``).
+"""
+import json
+import os
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+TOKEN_BUCKETS = (1000, 2000, 4000, 8000, 12000, 16000, 24000, 32000, 48000, 64000, 100000, 150000, 200000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra="") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount=1.0):
+        self.value += amount
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name: str, help_text: str, labels=(), const_labels=None):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(const_labels or ()) + tuple(labels)
+        self._const = tuple((const_labels or {}).values())
+        self._children = {}
+
+    def labels(self, *values):
+        key = self._const + values
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def render(self) -> list:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {child.value:g}" for key, child in self._children.items()]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS, const_labels=None):
+        super().__init__(name, help_text, labels, const_labels)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def render(self) -> list:
+        lines = []
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), child.counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {child.sum:.6g}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {child.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self, const_labels=None):
+        self.const_labels = const_labels or {}
+        self._metrics = []
+
+    def counter(self, name, help_text, labels=()) -> Counter:
+        metric = Counter(name, help_text, labels, self.const_labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labels, buckets, self.const_labels)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class span:
+    """``with span(HISTOGRAM.labels(...)):`` observes the block's wall time in seconds."""
+
+    __slots__ = ("child", "start")
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+
+REGISTRY = Registry({"worker": os.environ["WORKER_ID"]} if os.environ.get("WORKER_ID") else None)
+
+QUERY_SECONDS = REGISTRY.histogram("agent_query_seconds", "Time to hand a prompt to the SDK client (client.query)", ("agent",))
+RESPONSE_WAIT_SECONDS = REGISTRY.histogram(
+    "agent_response_wait_seconds", "Time waiting for the next SDK message in process_response", ("agent", "message"))
+RESPONSE_HANDLE_SECONDS = REGISTRY.histogram(
+    "agent_response_handle_seconds", "Time handling one SDK message in process_response, sends included", ("agent", "message"))
+TURN_SECONDS = REGISTRY.histogram("agent_turn_seconds", "User message to done frame", ("agent", "source"))
+RETRY_SECONDS = REGISTRY.histogram(
+    "agent_retry_seconds", "First rate limit of a turn to the end of its retries, backoff included", ("agent",))
+SCHEDULER_WAIT_SECONDS = REGISTRY.histogram("scheduler_wait_seconds", "Time queued for admission by the request scheduler", ("agent",))
+RATE_LIMITS = REGISTRY.counter(
+    "rate_limits_total", "Rate-limit signals: SDK rate_limit_event notices and rate-limited results", ("agent", "kind"))
+CONTEXT_TOKENS = REGISTRY.histogram(
+    "agent_context_tokens", "Prompt tokens of the last model call of a turn (input + cache read/write)", ("agent",), TOKEN_BUCKETS)
+COMPACTIONS = REGISTRY.counter("context_compactions_total", "Conversations reset and re-seeded with a summary", ("agent",))
+ROUTES = REGISTRY.counter(
+    "agent_routes_total", "Routing decisions per message: fast path taken, or the model chosen", ("agent", "route", "model"))
+ROUTE_SECONDS = REGISTRY.histogram("agent_route_seconds", "Time to classify a message (and answer it, on a fast path)", ("agent", "route"))
+TOOL_SECONDS = REGISTRY.histogram("tool_call_seconds", "MCP tool handler duration", ("agent", "tool"))
+TOOL_ARGS_BYTES = REGISTRY.histogram("tool_args_bytes", "JSON size of MCP tool arguments", ("agent", "tool"), SIZE_BUCKETS)
+TOOL_RESULT_BYTES = REGISTRY.histogram("tool_result_bytes", "Text size of MCP tool results", ("agent", "tool"), SIZE_BUCKETS)
+TOOL_ERRORS = REGISTRY.counter("tool_errors_total", "MCP tool calls that returned is_error or raised", ("agent", "tool"))
+WS_SEND_SECONDS = REGISTRY.histogram("ws_send_seconds", "websocket.send_json duration", ("agent", "frame"))
+
+
+def instrument_tool(agent: str, name: str):
+    """Decorator for a tool handler (under ``@tool``) recording duration, argument and result sizes."""
+    def decorate(handler):
+        seconds = TOOL_SECONDS.labels(agent, name)
+        args_bytes = TOOL_ARGS_BYTES.labels(agent, name)
+        result_bytes = TOOL_RESULT_BYTES.labels(agent, name)
+        errors = TOOL_ERRORS.labels(agent, name)
+
+        async def wrapper(args: dict) -> dict:
+            start = time.perf_counter()
+            try:
+                result = await handler(args)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                seconds.observe(time.perf_counter() - start)
+            args_bytes.observe(len(json.dumps(args, default=str)))
+            result_bytes.observe(sum(len(c.get("text", "")) for c in result.get("content", ())))
+            if result.get("is_error"):
+                errors.inc()
+            return result
+        wrapper.__name__ = handler.__name__
+        wrapper.__doc__ = handler.__doc__
+        return wrapper
+    return decorate
+
+
+class TimedWebSocket:
+    """Wraps a WebSocket so every ``send_json`` is timed per agent and frame type."""
+
+    def __init__(self, websocket, agent: str):
+        self._websocket = websocket
+        self._agent = agent
+
+    def __getattr__(self, name):
+        return getattr(self._websocket, name)
+
+    async def send_json(self, data, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await self._websocket.send_json(data, *args, **kwargs)
+        finally:
+            WS_SEND_SECONDS.labels(self._agent, data.get("type", "")).observe(time.perf_counter() - start)
@@ -0,0 +1,208 @@
+"""Multi-worker mode: N server processes behind a sticky local load balancer.
+
+``python3 web/backend/server.py --workers N --port 8000`` starts N copies of
+the server on ``127.0.0.1:8001..800N`` and a TCP balancer on port 8000.
+The balancer reads only the HTTP request head of each new connection,
+picks a worker and then splices bytes both ways, so WebSocket upgrades and
+frames pass through untouched.
+
+Routing is sticky: ``/ws/...`` connections are keyed by the ``session``
+query parameter and mapped to a worker by rendezvous hashing, so a
+conversation's reconnects land on the worker holding its ClaudeSDKClient,
+and losing one worker only moves the keys it owned. A WebSocket upgrade
+without a session is given a fresh one in its request line, which the
+worker adopts and reports back, so anonymous clients behind one address
+still spread across workers. Other requests without a session are spread
+round-robin. Workers that exit are restarted.
+
+Only the first request head on a connection is read: the worker chosen for
+it serves everything else sent on that connection. A WebSocket is one
+request per connection, but HTTP keep-alive clients send all their API
+calls to one worker.
+
+State shared between workers goes through the filesystem and is safe for
+concurrent processes: tickets are SQLite in WAL mode, the KB index, rollup
+and columnar sidecars are written to per-process temp files and swapped in
+with ``os.replace``. Tool/answer caches and client pools are per worker.
+"""
+import asyncio
+import hashlib
+import itertools
+import os
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from urllib.parse import parse_qs, urlsplit
+
+HEAD_LIMIT = 64 * 1024      # largest request head the balancer will buffer
+CONNECT_TIMEOUT = 5
+RESTART_BACKOFF = 1.0       # seconds before restarting a worker that exited
+
+
+def rendezvous(key: str, backends: list) -> list:
+    """Backends ordered by preference for ``key`` (highest random weight first)."""
+    def weight(backend):
+        return hashlib.blake2b(f"{key}|{backend[0]}:{backend[1]}".encode(), digest_size=8).digest()
+    return sorted(backends, key=weight, reverse=True)
+
+
+def _target(head: bytes):
+    parts = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ")
+    return urlsplit(parts[1] if len(parts) > 1 else "/")
+
+
+def routing_key(head: bytes) -> str:
+    """The ``session`` query parameter, or None."""
+    session = parse_qs(_target(head).query).get("session")
+    return session[0] if session else None
+
+
+def with_session(head: bytes) -> bytes:
+    """``head``, with a new ``session`` query parameter if it is a WebSocket upgrade without one."""
+    target = _target(head)
+    if not target.path.startswith("/ws/") or routing_key(head) is not None:
+        return head
+    method, path, rest = head.split(b" ", 2)
+    separator = b"&" if target.query else b"?"
+    return b" ".join((method, path + separator + b"session=" + uuid.uuid4().hex.encode(), rest))
+
+
+class Balancer:
+    def __init__(self, backends: list):
+        self.backends = backends
+        self._round_robin = itertools.cycle(range(len(backends)))
+        self.stats = {"connections": 0, "failovers": 0, "rejected": 0}
+
+    def candidates(self, key) -> list:
+        if key is None:
+            start = next(self._round_robin)
+            return self.backends[start:] + self.backends[:start]
+        return rendezvous(key, self.backends)
+
+    async def handle(self, reader, writer):
+        self.stats["connections"] += 1
+        peer = writer.get_extra_info("peername")
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        head = with_session(head)
+        upstream = None
+        for host, port in self.candidates(routing_key(head)):
+            try:
+                upstream = await asyncio.wait_for(asyncio.open_connection(host, port), CONNECT_TIMEOUT)
+                break
+            except (OSError, asyncio.TimeoutError):
+                self.stats["failovers"] += 1
+        if upstream is None:
+            self.stats["rejected"] += 1
+            writer.write(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            writer.close()
+            return
+        up_reader, up_writer = upstream
+        if peer:
+            line_end = head.index(b"\r\n") + 2
+            head = head[:line_end] + f"X-Forwarded-For: {peer[0]}\r\n".encode() + head[line_end:]
+        up_writer.write(head)
+        await asyncio.gather(_pipe(reader, up_writer), _pipe(up_reader, writer))
+
+
+async def _pipe(reader, writer):
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+class Supervisor:
+    """Starts one server process per port and restarts any that exit."""
+
+    def __init__(self, server_path, ports: list, host="127.0.0.1"):
+        self.server_path = str(server_path)
+        self.ports = ports
+        self.host = host
+        self.procs = {}
+        self.stopping = False
+
+    def spawn(self, index: int):
+        env = {**os.environ, "WORKER_ID": str(index)}
+        port = self.ports[index]
+        self.procs[index] = subprocess.Popen(
+            [sys.executable, self.server_path, "--host", self.host, "--port", str(port), "--workers", "1"],
+            env=env,
+        )
+
+    def start(self):
+        for index in range(len(self.ports)):
+            self.spawn(index)
+
+    async def watch(self):
+        while not self.stopping:
+            await asyncio.sleep(RESTART_BACKOFF)
+            for index, proc in list(self.procs.items()):
+                if proc.poll() is not None and not self.stopping:
+                    print(f"worker {index} exited with {proc.returncode}, restarting", file=sys.stderr)
+                    self.spawn(index)
+
+    def stop(self, timeout=10):
+        self.stopping = True
+        for proc in self.procs.values():
+            if proc.poll() is None:
+                proc.terminate()
+        deadline = time.monotonic() + timeout
+        for proc in self.procs.values():
+            try:
+                proc.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+async def wait_ready(host, ports, timeout=60):
+    """Wait until every worker accepts connections."""
+    deadline = time.monotonic() + timeout
+    for port in ports:
+        while True:
+            try:
+                _, writer = await asyncio.open_connection(host, port)
+                writer.close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"worker on port {port} did not start")
+                await asyncio.sleep(0.2)
+
+
+async def _serve(server_path, workers, host, port, base_port):
+    ports = [base_port + i for i in range(workers)]
+    supervisor = Supervisor(server_path, ports)
+    supervisor.start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await wait_ready("127.0.0.1", ports)
+        balancer = Balancer([("127.0.0.1", p) for p in ports])
+        server = await asyncio.start_server(balancer.handle, host, port, limit=HEAD_LIMIT)
+        print(f"balancing {host}:{port} across {workers} workers on ports {ports[0]}-{ports[-1]}")
+        watcher = asyncio.create_task(supervisor.watch())
+        async with server:
+            await stop.wait()
+        watcher.cancel()
+    finally:
+        supervisor.stop()
+
+
+def serve(server_path, workers: int, host="0.0.0.0", port=8000, base_port=None):
+    asyncio.run(_serve(server_path, workers, host, port, base_port or port + 1))
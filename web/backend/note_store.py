@@ -0,0 +1,213 @@
+"""Indexed store for the personal assistant's notes (step3_tools.py, step4_subagents.py).
+
+Notes are still written as ``{timestamp}_{title}.md`` files with the
+``# title`` / ``**Date:**`` / ``**Tags:**`` header, and each one is also
+recorded in SQLite (WAL): title, date, content, and one ``note_tags`` row
+per tag for exact tag lookups. An FTS5 table over title, tags and content
+backs ranked search (bm25, title and tags weighted above the body) with
+highlighted snippets, so a search costs milliseconds instead of reading
+every note. Existing ``.md`` files in the directory are indexed on first
+use.
+"""
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id         INTEGER PRIMARY KEY,
+    filename   TEXT NOT NULL UNIQUE,
+    title      TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    tags       TEXT NOT NULL DEFAULT '',
+    content    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notes_created ON notes (created_at);
+CREATE TABLE IF NOT EXISTS note_tags (
+    tag     TEXT NOT NULL,
+    note_id INTEGER NOT NULL REFERENCES notes (id),
+    PRIMARY KEY (tag, note_id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title, tags, content, content='notes', content_rowid='id', tokenize='porter unicode61'
+);
+"""
+COLUMNS = ("id", "filename", "title", "created_at", "tags")
+
+TITLE_RE = re.compile(r"^# (.+)$", re.MULTILINE)
+DATE_RE = re.compile(r"^\*\*Date:\*\* *(.+)$", re.MULTILINE)
+TAGS_RE = re.compile(r"^\*\*Tags:\*\* *(.*)$", re.MULTILINE)
+FTS_TERM_RE = re.compile(r"\w+")
+
+
+def parse_tags(value: str) -> list:
+    """``"Work, #ideas, Q3 plans"`` -> ``["work", "ideas", "q3 plans"]``; ``"none"`` is no tags."""
+    tags = []
+    for tag in (value or "").split(","):
+        tag = " ".join(tag.strip().lstrip("#").casefold().split())
+        if tag and tag != "none" and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def render_note(title: str, content: str, tags: str, now: datetime) -> str:
+    return f"""# {title}
+**Date:** {now:%Y-%m-%d %H:%M}
+**Tags:** {tags or 'none'}
+
+---
+
+{content}
+"""
+
+
+def parse_note(text: str) -> dict:
+    """Header fields of a note file; the body is everything after the ``---`` rule."""
+    title, date, tags = TITLE_RE.search(text), DATE_RE.search(text), TAGS_RE.search(text)
+    _, rule, body = text.partition("\n---\n")
+    return {
+        "title": title.group(1).strip() if title else "",
+        "date": date.group(1).strip() if date else None,
+        "tags": parse_tags(tags.group(1)) if tags else [],
+        "content": body.strip() if rule else text,
+    }
+
+
+def fts_query(text: str, any_term=True) -> str:
+    """Quote each word so user input can't break FTS5 syntax; any (or every) word must match."""
+    return (" OR " if any_term else " ").join(f'"{term}"' for term in FTS_TERM_RE.findall(text))
+
+
+def connect(db_path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class NoteStore:
+    """Blocking API; call through ``run_io`` from the event loop."""
+
+    def __init__(self, directory, db_path=None):
+        self.directory = Path(directory)
+        self.db_path = Path(db_path) if db_path else self.directory.parent / "notes.db"
+        self._local = threading.local()
+        self._ready = False
+        self._write_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            conn = self._local.conn = connect(self.db_path)
+            if not self._ready:
+                with self._write_lock:
+                    if not self._ready:
+                        conn.executescript(SCHEMA)
+                        with conn:      # title and tags weigh more than the body in bm25 ``rank``
+                            conn.execute("INSERT INTO notes_fts (notes_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')")
+                        self.import_files(conn)
+                        self._ready = True
+        return conn
+
+    def _insert(self, conn, filename, title, created_at, tags, content) -> int:
+        cursor = conn.execute(
+            "INSERT INTO notes (filename, title, created_at, tags, content) VALUES (?, ?, ?, ?, ?)",
+            (filename, title, created_at, ", ".join(tags), content),
+        )
+        note_id = cursor.lastrowid
+        conn.executemany("INSERT OR IGNORE INTO note_tags (tag, note_id) VALUES (?, ?)", [(t, note_id) for t in tags])
+        conn.execute("INSERT INTO notes_fts (rowid, title, tags, content) VALUES (?, ?, ?, ?)",
+                     (note_id, title, " ".join(tags), content))
+        return note_id
+
+    def import_files(self, conn=None) -> int:
+        """Index ``*.md`` notes not in the database yet (written before the store, or by hand)."""
+        conn = conn or self._conn()
+        known = {row[0] for row in conn.execute("SELECT filename FROM notes")}
+        imported = 0
+        with conn:
+            for path in sorted(self.directory.glob("*.md")):
+                if path.name in known:
+                    continue
+                note = parse_note(path.read_text(encoding="utf-8"))
+                created_at = note["date"] or datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y-%m-%d %H:%M")
+                self._insert(conn, path.name, note["title"] or path.stem, created_at, note["tags"], note["content"])
+                imported += 1
+        return imported
+
+    # ─── Writes ───
+
+    def save(self, title: str, content: str, tags="") -> dict:
+        """Write the note file and index it; returns the record."""
+        conn = self._conn()
+        now = datetime.now()
+        stem = f"{now:%Y%m%d_%H%M%S}_{title.replace(' ', '_').replace('/', '_').lower()[:50]}"
+        with self._write_lock:
+            filename, n = f"{stem}.md", 1
+            while (self.directory / filename).exists():
+                n += 1
+                filename = f"{stem}_{n}.md"
+            path = self.directory / filename
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(render_note(title, content, tags, now), encoding="utf-8")
+            os.replace(tmp, path)
+            with conn:
+                note_id = self._insert(conn, filename, title, f"{now:%Y-%m-%d %H:%M}", parse_tags(tags), content)
+        return self.get(note_id)
+
+    # ─── Reads ───
+
+    def get(self, note_id: int, with_content=False):
+        row = self._conn().execute("SELECT * FROM notes WHERE id = ?", (note_id,)).fetchone()
+        if row is None:
+            return None
+        record = {c: row[c] for c in COLUMNS}
+        if with_content:
+            record["content"] = row["content"]
+        return record
+
+    def search(self, query: str, limit=10) -> list:
+        """Notes tagged exactly ``query`` (``tag:x`` or ``#x`` for tags only), then the best
+        full-text matches, each with a preview."""
+        query = query.strip()
+        tag_only = query.startswith(("tag:", "#"))
+        tag = parse_tags(query.removeprefix("tag:"))
+        conn = self._conn()
+        results = []
+        if tag:     # newest first; ids follow creation order, so this walks the (tag, note_id) key backwards
+            results = conn.execute(
+                "SELECT n.*, substr(n.content, 1, 160) AS preview FROM note_tags t JOIN notes n ON n.id = t.note_id "
+                "WHERE t.tag = ? ORDER BY t.note_id DESC LIMIT ?", (tag[0], limit),
+            ).fetchall()
+        # Notes with every word first, then any word. The ranked lookup runs on the FTS table
+        # alone so snippets are only built for the rows returned.
+        for any_term in (False, True):
+            match = fts_query(query, any_term) if not tag_only else ""
+            if not match or len(results) >= limit:
+                break
+            seen = {row["id"] for row in results}
+            rows = conn.execute(
+                "SELECT n.*, f.preview FROM (SELECT rowid, snippet(notes_fts, 2, '**', '**', ' … ', 24) AS preview, rank "
+                "FROM notes_fts WHERE notes_fts MATCH ? ORDER BY rank LIMIT ?) f JOIN notes n ON n.id = f.rowid ORDER BY f.rank",
+                (match, limit),
+            ).fetchall()
+            results += [row for row in rows if row["id"] not in seen]
+        return [{**{c: row[c] for c in COLUMNS}, "preview": " ".join(row["preview"].split())} for row in results[:limit]]
+
+    def tags(self, limit=50) -> list:
+        """``(tag, count)`` pairs, most used first."""
+        return [tuple(row) for row in self._conn().execute(
+            "SELECT tag, COUNT(*) AS n FROM note_tags GROUP BY tag ORDER BY n DESC, tag LIMIT ?", (limit,))]
+
+
+def format_results(results: list) -> str:
+    lines = []
+    for note in results:
+        tags = f"  [{note['tags']}]" if note["tags"] else ""
+        lines.append(f"📄 {note['title']} — {note['created_at']}{tags}\n   {note['filename']}\n   {note['preview']}")
+    return "\n\n".join(lines)
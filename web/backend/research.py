@@ -0,0 +1,185 @@
+"""Concurrent web research for meeting briefings.
+
+``Researcher.research(company)`` runs the overview, news and leadership
+searches at once, fetches the top pages of each, drops URLs already seen
+under another topic and merges everything into one markdown dossier with
+numbered sources. At most ``concurrency`` requests are in flight, each
+bounded by ``timeout``; a topic that times out or fails is reported in the
+dossier instead of failing the whole call.
+
+The search/fetch side is a backend object with two blocking methods:
+``search(query, max_results)`` returning ``[{"title", "url", "snippet"}]``
+and ``fetch(url)`` returning page text. They run on the shared I/O pool.
+``HttpSearchBackend`` talks to any SearXNG-style JSON search endpoint
+(``GET <url>?q=...&format=json``), so pointing ``RESEARCH_SEARCH_URL`` at
+``fixture_web.py`` makes the whole pipeline run offline.
+"""
+import asyncio
+import json
+import re
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from html.parser import HTMLParser
+
+from async_io import run_io
+
+USER_AGENT = "ai-agent-dashboard-research/1.0"
+MAX_PAGE_BYTES = 512 * 1024
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|ref|ref_src)$")
+
+
+def topic_queries(company: str) -> dict:
+    year = datetime.now().year
+    return {
+        "overview": f"{company} company overview",
+        "news": f"{company} news {year}",
+        "leadership": f"{company} CEO leadership team",
+    }
+
+
+def canonical_url(url: str) -> str:
+    """Key for URL dedupe: lower-case host, no fragment, tracking params or trailing slash."""
+    parts = urllib.parse.urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    query = urllib.parse.urlencode(
+        sorted((k, v) for k, v in urllib.parse.parse_qsl(parts.query) if not TRACKING_PARAMS.match(k))
+    )
+    return urllib.parse.urlunsplit((parts.scheme.lower(), host, parts.path.rstrip("/") or "/", query, ""))
+
+
+class _TextExtractor(HTMLParser):
+    SKIP = {"head", "script", "style", "noscript", "nav", "footer", "header", "svg"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping and data.strip():
+            self.parts.append(data.strip())
+
+
+def html_to_text(html: str) -> str:
+    parser = _TextExtractor()
+    parser.feed(html)
+    return " ".join(" ".join(parser.parts).split())
+
+
+class HttpSearchBackend:
+    """Search via a SearXNG-compatible JSON endpoint; fetch pages with urllib."""
+
+    def __init__(self, search_url: str, timeout=8.0):
+        self.search_url = search_url
+        self.timeout = timeout
+
+    def _get(self, url: str) -> tuple:
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            charset = response.headers.get_content_charset() or "utf-8"
+            return response.headers.get_content_type(), response.read(MAX_PAGE_BYTES).decode(charset, "replace")
+
+    def search(self, query: str, max_results=5) -> list:
+        separator = "&" if "?" in self.search_url else "?"
+        _, body = self._get(f"{self.search_url}{separator}{urllib.parse.urlencode({'q': query, 'format': 'json'})}")
+        return [
+            {"title": r.get("title", ""), "url": r["url"], "snippet": r.get("content") or r.get("snippet", "")}
+            for r in json.loads(body).get("results", [])[:max_results]
+            if r.get("url")
+        ]
+
+    def fetch(self, url: str) -> str:
+        content_type, body = self._get(url)
+        return html_to_text(body) if "html" in content_type else body
+
+
+class Researcher:
+    def __init__(self, backend, concurrency=4, timeout=8.0, max_results=5, fetch_per_topic=2, page_chars=1200):
+        self.backend = backend
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_results = max_results
+        self.fetch_per_topic = fetch_per_topic
+        self.page_chars = page_chars
+        self.stats = {"runs": 0, "searches": 0, "fetches": 0, "duplicates": 0, "timeouts": 0, "failures": 0}
+
+    async def _call(self, limit, fn, *args):
+        async with limit:
+            try:
+                return await asyncio.wait_for(run_io(fn, *args), self.timeout)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                raise TimeoutError(f"timed out after {self.timeout:g}s")
+            except Exception:
+                self.stats["failures"] += 1
+                raise
+
+    async def research(self, company: str) -> dict:
+        """Returns ``{"company", "topics": {topic: {"query", "results", "error"}}, "sources", "seconds"}``."""
+        started = time.perf_counter()
+        self.stats["runs"] += 1
+        limit = asyncio.Semaphore(self.concurrency)
+        queries = topic_queries(company)
+
+        searches = await asyncio.gather(
+            *(self._call(limit, self.backend.search, q, self.max_results) for q in queries.values()),
+            return_exceptions=True,
+        )
+        self.stats["searches"] += len(queries)
+
+        # First topic to find a URL keeps it; later hits are dropped.
+        seen = set()
+        topics = {}
+        for (topic, query), found in zip(queries.items(), searches):
+            entry = topics[topic] = {"query": query, "results": [], "error": None}
+            if isinstance(found, BaseException):
+                entry["error"] = str(found) or type(found).__name__
+                continue
+            for result in found:
+                key = canonical_url(result["url"])
+                if key in seen:
+                    self.stats["duplicates"] += 1
+                    continue
+                seen.add(key)
+                entry["results"].append({**result, "text": None})
+
+        to_fetch = [r for entry in topics.values() for r in entry["results"][:self.fetch_per_topic]]
+        pages = await asyncio.gather(
+            *(self._call(limit, self.backend.fetch, r["url"]) for r in to_fetch), return_exceptions=True,
+        )
+        self.stats["fetches"] += len(to_fetch)
+        for result, page in zip(to_fetch, pages):
+            if not isinstance(page, BaseException):
+                result["text"] = page[:self.page_chars]
+
+        sources = [r["url"] for entry in topics.values() for r in entry["results"]]
+        return {"company": company, "topics": topics, "sources": sources, "seconds": time.perf_counter() - started}
+
+
+def format_dossier(dossier: dict) -> str:
+    """Markdown notes for the model: per-topic findings citing numbered sources."""
+    number = {url: i for i, url in enumerate(dossier["sources"], 1)}
+    lines = [f"# Research notes: {dossier['company']}"]
+    for topic, entry in dossier["topics"].items():
+        lines.append(f"\n## {topic.title()} (search: \"{entry['query']}\")")
+        if entry["error"]:
+            lines.append(f"_Search failed: {entry['error']}_")
+        elif not entry["results"]:
+            lines.append("_No new results._")
+        for r in entry["results"]:
+            lines.append(f"- [{number[r['url']]}] **{r['title']}** — {r['snippet']}")
+            if r["text"]:
+                lines.append(f"  > {r['text']}")
+    lines.append("\n## Sources")
+    lines.extend(f"[{i}] {url}" for url, i in number.items())
+    return "\n".join(lines)
@@ -0,0 +1,115 @@
+"""Caches for deterministic tool results and repeated first-turn questions.
+
+``ToolCache`` memoizes MCP tool handlers keyed by tool name and normalized
+arguments. Each entry remembers the data version it was computed against
+(e.g. the knowledge base index generation) and is recomputed once that
+version moves on.
+
+``AnswerCache`` stores the frames sent for an agent's answer to a
+conversation's first message, keyed by agent and normalized prompt, with
+TTL and LRU eviction.
+"""
+import inspect
+import json
+import re
+import time
+from collections import OrderedDict
+
+_PUNCT_RE = re.compile(r"[^\w\s£$%-]")
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def normalize_prompt(text: str) -> str:
+    """Case, whitespace and punctuation insensitive form of a user message."""
+    return " ".join(_PUNCT_RE.sub(" ", text.casefold()).split())
+
+
+def normalize_args(args: dict) -> str:
+    return json.dumps(
+        {k: normalize_text(v) if isinstance(v, str) else v for k, v in args.items()},
+        sort_keys=True,
+    )
+
+
+class ToolCache:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # (tool, key) -> (version, result)
+        self.stats = {}                 # tool -> {"hits", "misses", "invalidations"}
+
+    def cached(self, name, version=None, key=normalize_args):
+        """Decorator for a tool handler.
+
+        ``version`` is a callable (sync or async) returning the current data version.
+        """
+        def decorate(handler):
+            async def wrapper(args: dict) -> dict:
+                stats = self.stats.setdefault(name, {"hits": 0, "misses": 0, "invalidations": 0})
+                current = version() if version else None
+                if inspect.isawaitable(current):
+                    current = await current
+                cache_key = (name, key(args))
+                entry = self._entries.get(cache_key)
+                if entry is not None:
+                    if entry[0] == current:
+                        self._entries.move_to_end(cache_key)
+                        stats["hits"] += 1
+                        return entry[1]
+                    stats["invalidations"] += 1
+                stats["misses"] += 1
+                result = await handler(args)
+                if not result.get("is_error"):
+                    self._entries[cache_key] = (current, result)
+                    self._entries.move_to_end(cache_key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                return result
+            wrapper.__name__ = handler.__name__
+            wrapper.__doc__ = handler.__doc__
+            return wrapper
+        return decorate
+
+    def clear(self):
+        self._entries.clear()
+
+    def snapshot(self) -> dict:
+        return {"size": len(self._entries), "tools": self.stats}
+
+
+class AnswerCache:
+    def __init__(self, max_entries=256, ttl=3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # (agent_id, prompt) -> (expires_at, version, frames)
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+    def get(self, agent_id: str, prompt: str, version=None):
+        key = (agent_id, normalize_prompt(prompt))
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, entry_version, frames = entry
+            if expires_at > time.monotonic() and entry_version == version:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return frames
+            del self._entries[key]
+            self.stats["expired"] += 1
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, agent_id: str, prompt: str, frames: list, version=None):
+        key = (agent_id, normalize_prompt(prompt))
+        self._entries[key] = (time.monotonic() + self.ttl, version, list(frames))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def snapshot(self) -> dict:
+        return {"size": len(self._entries), **self.stats}
@@ -0,0 +1,226 @@
+"""Incremental daily/monthly rollups over sales_2026.csv.
+
+The cube keeps ``[total, quantity, rows]`` per day (and per month) for every
+value of each sales dimension, plus an ``all`` pseudo-dimension for grand
+totals. ``refresh`` tails the CSV from the byte offset it last consumed, so
+appended rows cost only their own parse; the file is rebuilt from scratch
+only if it shrank or its first bytes changed (rewritten, not appended).
+The cube and offset are persisted to a JSON sidecar so a restart doesn't
+rescan either.
+
+Queries with only a dimension, grain and date range are answered from the
+cube. Filters on other columns (``where``) fall back to a scan of the
+memory-mapped columnar sidecar.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from columnar_cache import MappedDictColumn, open_frame
+
+ROLLUP_VERSION = 1
+DIMENSIONS = ("category", "product", "customer_type", "payment_method")
+GRAINS = ("all", "month", "day")
+HEAD_BYTES = 4096          # fingerprinted to tell an append from a rewrite
+REQUIRED = ("date", "quantity", "total") + DIMENSIONS
+
+
+def _add(cell: list, total: float, quantity: int, rows=1):
+    cell[0] += total
+    cell[1] += quantity
+    cell[2] += rows
+
+
+class SalesRollups:
+    def __init__(self, csv_path, state_path=None, refresh_interval=1.0):
+        self.csv_path = Path(csv_path)
+        self.state_path = Path(state_path) if state_path else self.csv_path.with_suffix(".rollup.json")
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._last_refresh = None
+        self.generation = 0        # bumped whenever the cube changes
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0            # bytes of the CSV consumed so far (always at a line boundary)
+        self.mtime_ns = None
+        self.head_hash = None
+        self.header = None
+        self.daily = {}            # "YYYY-MM-DD" -> dim -> value -> [total, quantity, rows]
+        self.monthly = {}          # "YYYY-MM"    -> dim -> value -> [total, quantity, rows]
+        self.skipped = 0           # malformed rows ignored
+
+    # ─── Maintenance ───
+
+    def refresh_due(self) -> bool:
+        return self._last_refresh is None or time.monotonic() - self._last_refresh >= self.refresh_interval
+
+    def refresh(self) -> int:
+        """Fold rows appended since the last refresh into the cube. Returns rows added."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+            self._last_refresh = time.monotonic()
+            st = os.stat(self.csv_path)
+            if (st.st_size, st.st_mtime_ns) == (self.offset, self.mtime_ns):
+                return 0
+            with open(self.csv_path, "rb") as f:
+                if st.st_size < self.offset or not self._same_head(f):
+                    self._reset()
+                f.seek(self.offset)
+                chunk = f.read(st.st_size - self.offset)
+            end = chunk.rfind(b"\n") + 1          # leave a partially written last line for next time
+            if self.offset == 0:
+                head = chunk[:min(end, HEAD_BYTES)]
+                self.head_hash = [len(head), hashlib.sha1(head).hexdigest()]
+            added = self._ingest(chunk[:end].decode("utf-8")) if end else 0
+            self.offset += end
+            self.mtime_ns = st.st_mtime_ns
+            self.generation += 1
+            self._save()
+            return added
+
+    def _same_head(self, f) -> bool:
+        if self.head_hash is None:
+            return True
+        length, digest = self.head_hash
+        f.seek(0)
+        return hashlib.sha1(f.read(length)).hexdigest() == digest
+
+    def _ingest(self, text: str) -> int:
+        reader = csv.reader(io.StringIO(text))
+        if self.header is None:
+            self.header = next(reader, None)
+            if self.header is None:
+                return 0
+            missing = [c for c in REQUIRED if c not in self.header]
+            if missing:
+                raise ValueError(f"{self.csv_path.name} is missing columns: {', '.join(missing)}")
+        index = {c: self.header.index(c) for c in REQUIRED}
+        added = 0
+        for row in reader:
+            if not row:
+                continue
+            try:
+                day = row[index["date"]]
+                total = float(row[index["total"]])
+                quantity = int(row[index["quantity"]])
+                values = [row[index[d]] for d in DIMENSIONS]
+            except (IndexError, ValueError):
+                self.skipped += 1
+                continue
+            for cube, period in ((self.daily, day), (self.monthly, day[:7])):
+                cells = cube.setdefault(period, {})
+                _add(cells.setdefault("all", {}).setdefault("all", [0.0, 0, 0]), total, quantity)
+                for dim, value in zip(DIMENSIONS, values):
+                    _add(cells.setdefault(dim, {}).setdefault(value, [0.0, 0, 0]), total, quantity)
+            added += 1
+        return added
+
+    def _load(self):
+        try:
+            state = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return
+        if state.get("version") != ROLLUP_VERSION:
+            return
+        self.offset = state["offset"]
+        self.mtime_ns = state.get("mtime_ns")
+        self.head_hash = state["head_hash"]
+        self.header = state["header"]
+        self.skipped = state.get("skipped", 0)
+        self.daily = state["daily"]
+        for day, cells in self.daily.items():
+            month = self.monthly.setdefault(day[:7], {})
+            for dim, values in cells.items():
+                for value, cell in values.items():
+                    _add(month.setdefault(dim, {}).setdefault(value, [0.0, 0, 0]), *cell)
+
+    def _save(self):
+        state = {
+            "version": ROLLUP_VERSION,
+            "offset": self.offset,
+            "mtime_ns": self.mtime_ns,
+            "head_hash": self.head_hash,
+            "header": self.header,
+            "skipped": self.skipped,
+            "daily": self.daily,
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state, separators=(",", ":")))
+        os.replace(tmp, self.state_path)
+
+    # ─── Queries ───
+
+    def query(self, dimension="all", grain="all", start=None, end=None, where=None) -> list:
+        """``[(period, value, total, quantity, rows)]``, period is None for grain ``all``.
+
+        ``start``/``end`` are inclusive ISO dates (or prefixes, e.g. ``2026-02``).
+        ``where`` maps column -> value and forces a scan of the CSV.
+        """
+        if dimension != "all" and dimension not in DIMENSIONS:
+            raise ValueError(f"dimension must be one of: all, {', '.join(DIMENSIONS)}")
+        if grain not in GRAINS:
+            raise ValueError(f"grain must be one of: {', '.join(GRAINS)}")
+        if where:
+            return self.scan(dimension, grain, start, end, where)
+        if self.refresh_due():
+            self.refresh()
+        with self._lock:
+            ranged = start or end
+            cube = self.daily if ranged or grain == "day" else self.monthly
+            out = {}
+            for period, cells in cube.items():
+                if start and period[:len(start)] < start or end and period[:len(end)] > end:
+                    continue
+                bucket = None if grain == "all" else period[:7] if grain == "month" else period
+                for value, cell in cells.get(dimension, {}).items():
+                    _add(out.setdefault((bucket, value), [0.0, 0, 0]), *cell)
+        return _rows(out)
+
+    def scan(self, dimension="all", grain="all", start=None, end=None, where=None) -> list:
+        """Same result shape as ``query``, computed row by row over the columnar sidecar."""
+        frame = open_frame(self.csv_path)
+        unknown = [c for c in list(where or ()) + ["date", "total", "quantity"] if c not in frame.columns]
+        if unknown:
+            raise ValueError(f"Unknown column: {', '.join(unknown)}")
+        dates = frame["date"]
+        day_ok = [
+            not (start and day[:len(start)] < start or end and day[:len(end)] > end)
+            for day in dates.values
+        ]
+        buckets = [None if grain == "all" else day[:7] if grain == "month" else day for day in dates.values]
+        conditions = []
+        for column, value in (where or {}).items():
+            col = frame[column]
+            if isinstance(col, MappedDictColumn):
+                if value not in col.lookup:
+                    return []
+                conditions.append((col.codes, col.lookup[value]))
+            else:
+                try:
+                    conditions.append((col, float(value)))
+                except ValueError:
+                    raise ValueError(f"{column} is numeric, got {value!r}")
+        keys = frame[dimension] if dimension != "all" else None
+        totals, quantities, date_codes = frame["total"], frame["quantity"], dates.codes
+        out = {}
+        for i in range(frame.nrows):
+            d = date_codes[i]
+            if not day_ok[d] or any(col[i] != target for col, target in conditions):
+                continue
+            value = "all" if keys is None else keys[i]
+            _add(out.setdefault((buckets[d], value), [0.0, 0, 0]), totals[i], quantities[i])
+        return _rows(out)
+
+
+def _rows(cells: dict) -> list:
+    return [(period, value, cell[0], cell[1], cell[2]) for (period, value), cell in cells.items()]
@@ -0,0 +1,129 @@
+"""Per-message routing in front of ``client.query``.
+
+Every message used to start a full agentic turn on the agent's one model,
+including "thanks" and "ORD-002 status?". ``Router.route`` classifies a
+message locally (regexes, plus one BM25 knowledge base lookup) and either
+answers it on a fast path, without the model, or picks the model for the
+turn:
+
+- ``smalltalk``: for routers built with ``smalltalk=True``, a message that
+  is only a greeting or thanks gets a canned reply, unless the agent's last
+  reply ended in a question ("Shall I open a ticket?" -> "thanks, yes").
+  Acknowledgements ("ok", "sure", "sounds good") always go to the model:
+  they usually answer something the agent asked.
+- ``order``: a short message naming order numbers and nothing else to act
+  on ("ORD-002 status?", "where is ord-3") calls the order lookup directly.
+- ``kb``: a short general question (not a personal problem) whose best
+  knowledge base section clearly beats every other document
+  (``kb_min_score``, ``kb_margin``) is answered with that section.
+- ``model``: everything else goes to the agent, on ``escalation_model``
+  when the message looks complex (long, several questions, a complaint)
+  and on ``default_model`` otherwise.
+
+Fast paths return the frames to send; the caller records the decision.
+"""
+import re
+
+GREETING_RE = re.compile(r"^(hi|hello|hey|hiya|howdy|good (morning|afternoon|evening)|yo)( there| team| all)?$")
+THANKS_RE = re.compile(r"^(thanks|thank you|thx|ty|cheers|many thanks)( so much| very much| a lot| again)?$")
+CANNED = {
+    "greeting": "Hi! How can I help you today?",
+    "thanks": "You're welcome! Is there anything else I can help you with?",
+}
+
+ORDER_RE = re.compile(r"\bord[-\s]?(\d{1,6})\b", re.IGNORECASE)
+# an order number plus any of these needs the agent, not just a status lookup
+ORDER_ACTION_RE = re.compile(
+    r"\b(return|refund|cancel|change|exchange|damaged|broken|wrong|missing|faulty|complain\w*|address|"
+    r"late|delay\w*|never|why|ticket|help me|charged?)\b", re.IGNORECASE)
+# a personal problem ("my order hasn't arrived") needs the agent even when the KB has a matching section
+PROBLEM_RE = re.compile(
+    r"\b(hasn't|haven't|hadn't|didn't|doesn't|isn't|wasn't|won't|can't|cannot|not|never|still|"
+    r"my (order|package|parcel|delivery|item|refund|card|account))\b", re.IGNORECASE)
+COMPLEX_RE = re.compile(
+    r"\b(complain\w*|unacceptable|furious|angry|lawyer|legal|chargeback|manager|escalate|disappointed|"
+    r"not happy|worst|compare|explain why|step by step)\b", re.IGNORECASE)
+WORD_RE = re.compile(r"[\w'£$%-]+")
+
+
+def normalize(text: str) -> str:
+    return " ".join(WORD_RE.findall(text.casefold()))
+
+
+def order_numbers(text: str) -> list:
+    """``"ord 2 and ORD-0003"`` -> ``["ORD-002", "ORD-003"]`` (order ids are zero-padded to 3 digits)."""
+    return list(dict.fromkeys(f"ORD-{int(n):03d}" for n in ORDER_RE.findall(text)))
+
+
+def smalltalk_kind(text: str):
+    words = normalize(text)
+    for kind, pattern in (("greeting", GREETING_RE), ("thanks", THANKS_RE)):
+        if pattern.match(words):
+            return kind
+    return None
+
+
+def kb_title(stem: str) -> str:
+    return stem.replace("_", " ").replace("-", " ").title()
+
+
+class Router:
+    def __init__(self, default_model="haiku", escalation_model=None, order_lookup=None, kb_search=None,
+                 smalltalk=False, kb_min_score=5.0, kb_margin=2.0, max_direct_words=12, complex_words=60):
+        self.default_model = default_model
+        self.escalation_model = escalation_model or default_model
+        self.order_lookup = order_lookup    # async (order_number) -> tool result text, or None
+        self.kb_search = kb_search          # async (query) -> [(doc_stem, text, score), ...] best first, or None
+        self.smalltalk = smalltalk          # answer greetings and thanks with CANNED replies
+        self.kb_min_score = kb_min_score
+        self.kb_margin = kb_margin          # best score / best score from any other document
+        self.max_direct_words = max_direct_words
+        self.complex_words = complex_words
+
+    async def route(self, text: str, last_reply: str = "") -> dict:
+        """``{"route", "model", "frames"}``: ``frames`` is the complete answer for a fast path
+        (``model`` None), else None and ``model`` is the model for the agent turn.
+        ``last_reply`` is the agent's previous answer in this conversation."""
+        words = normalize(text).split()
+        kind = self.smalltalk and not last_reply.rstrip().endswith("?") and smalltalk_kind(text)
+        if kind:
+            return {"route": "smalltalk", "model": None, "frames": [{"type": "assistant", "text": CANNED[kind]}]}
+
+        orders = order_numbers(text)
+        direct = len(words) <= self.max_direct_words and not COMPLEX_RE.search(text)
+        if self.order_lookup and orders and direct and len(orders) <= 3 and not ORDER_ACTION_RE.search(text):
+            frames = [{"type": "tool", "text": "Using: check_order"}]
+            answers = [await self.order_lookup(order) for order in orders]
+            frames.append({"type": "assistant", "text": format_orders(answers)})
+            return {"route": "order", "model": None, "frames": frames}
+
+        if self.kb_search and direct and not orders and words and not PROBLEM_RE.search(text):
+            hits = await self.kb_search(text)
+            if hits and self._confident(hits):
+                stem, section, _ = hits[0]
+                answer = f"From our {kb_title(stem)} guide:\n\n{section}\n\nIs there anything else I can help you with?"
+                return {"route": "kb", "model": None,
+                        "frames": [{"type": "tool", "text": "Using: search_knowledge_base"}, {"type": "assistant", "text": answer}]}
+
+        model = self.escalation_model if self.is_complex(text, words) else self.default_model
+        return {"route": "model", "model": model, "frames": None}
+
+    def _confident(self, hits) -> bool:
+        stem, _, best = hits[0]
+        runner_up = max((score for other, _, score in hits[1:] if other != stem), default=0.0)
+        return best >= self.kb_min_score and best >= self.kb_margin * runner_up
+
+    def is_complex(self, text: str, words: list) -> bool:
+        return len(words) > self.complex_words or text.count("?") >= 2 or bool(COMPLEX_RE.search(text))
+
+
+def format_orders(answers: list) -> str:
+    """Order lookup results (``"Order: ...\\nStatus: ..."`` or ``"Order X not found."``) as a reply."""
+    parts = []
+    for answer in answers:
+        if answer.startswith("Order:"):
+            lines = answer.splitlines()
+            parts.append(f"Here's the latest on **{lines[0].split(':', 1)[1].strip()}**:\n" + "\n".join(f"- {line}" for line in lines[1:]))
+        else:
+            parts.append(f"{answer} Please double-check the number (order numbers look like ORD-001).")
+    return "\n\n".join(parts) + "\n\nIs there anything else I can help you with?"
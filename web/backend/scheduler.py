@@ -0,0 +1,205 @@
+"""Shared admission control for model requests.
+
+Every turn asks ``SCHEDULER.admit(model, priority)`` before querying the SDK
+client. Each model has a token bucket (sustained requests/second plus a
+burst) and a priority queue: when tokens run out, callers wait in order of
+agent priority (lower number first) and arrival, and are told their
+position so the UI can show it.
+
+Rate-limit signals feed back into the same queue. ``rate_limited(model)``
+pauses admissions for that model with jittered exponential backoff
+(``base * 2**strikes``, scaled by a random factor in [0.5, 1.5]), so
+concurrent sessions spread their retries instead of hammering the API in
+lockstep. A turn that completes cleanly calls ``succeeded(model)``, which
+resets the strike count.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+
+class RateLimited(Exception):
+    """A turn ended in a rate-limit error; retry after the scheduler's backoff."""
+
+
+def is_rate_limit(error) -> bool:
+    text = str(error).lower()
+    return any(s in text for s in ("rate_limit", "rate limit", "429", "overloaded"))
+
+
+MAX_RESUMES = 5    # rate_limit_event notices tolerated within one response
+
+
+async def receive_resumable(client, on_rate_limit=None):
+    """``client.receive_response()``, resumed after ``rate_limit_event`` notices.
+
+    The SDK raises when it meets a rate_limit_event message it can't parse, but
+    the response keeps streaming behind it, so report the notice and carry on
+    reading instead of abandoning the turn.
+    """
+    for resume in range(MAX_RESUMES + 1):
+        try:
+            async for msg in client.receive_response():
+                yield msg
+            return
+        except Exception as e:
+            if "rate_limit_event" not in str(e) or resume == MAX_RESUMES:
+                raise
+            if on_rate_limit:
+                on_rate_limit()
+
+
+def print_rate_limit_notice():
+    """``on_rate_limit`` for the terminal agents."""
+    print("  ⏳ Rate limit notice from the API — still waiting for the response...")
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now) -> float:
+        """Seconds until a token is available."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class _Waiter:
+    __slots__ = ("key", "future", "changed")
+
+    def __init__(self, key, future):
+        self.key = key
+        self.future = future
+        self.changed = asyncio.Event()
+
+
+class _ModelQueue:
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.heap = []                  # (priority, seq, _Waiter)
+        self.blocked_until = 0.0
+        self.strikes = 0
+        self.dispatcher = None
+        self.stats = {"admitted": 0, "queued": 0, "max_queue": 0, "rate_limits": 0}
+
+    def position(self, waiter) -> int:
+        return 1 + sum(1 for p, seq, w in self.heap if (p, seq) < waiter.key and not w.future.done())
+
+
+class RequestScheduler:
+    def __init__(self, rates: dict, default_rate=(2.0, 10), base_backoff=1.0, max_backoff=60.0):
+        self.rates = rates                  # model -> (requests per second, burst)
+        self.default_rate = default_rate
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._queues = {}
+        self._seq = itertools.count()
+
+    def _queue(self, model) -> _ModelQueue:
+        queue = self._queues.get(model)
+        if queue is None:
+            queue = self._queues[model] = _ModelQueue(TokenBucket(*self.rates.get(model, self.default_rate)))
+        return queue
+
+    async def admit(self, model: str, priority=1, on_position=None) -> float:
+        """Wait for a request slot. ``on_position(n)`` is awaited whenever the queue position changes.
+
+        Returns the seconds spent waiting.
+        """
+        queue = self._queue(model)
+        now = time.monotonic()
+        if not queue.heap and now >= queue.blocked_until and queue.bucket.delay(now) == 0:
+            queue.bucket.take()
+            queue.stats["admitted"] += 1
+            return 0.0
+
+        waiter = _Waiter((priority, next(self._seq)), asyncio.get_running_loop().create_future())
+        heapq.heappush(queue.heap, (*waiter.key, waiter))
+        queue.stats["queued"] += 1
+        queue.stats["max_queue"] = max(queue.stats["max_queue"], len(queue.heap))
+        self._wake(queue)
+        try:
+            last = None
+            while not waiter.future.done():
+                position = queue.position(waiter)
+                if on_position and position != last:
+                    await on_position(position)
+                    last = position
+                waiter.changed.clear()
+                changed = asyncio.ensure_future(waiter.changed.wait())
+                await asyncio.wait((waiter.future, changed), return_when=asyncio.FIRST_COMPLETED)
+                changed.cancel()
+        except BaseException:
+            if not waiter.future.done():
+                waiter.future.cancel()          # the dispatcher skips it
+                self._notify(queue)
+            elif not waiter.future.cancelled():
+                queue.bucket.tokens += 1        # admitted but not used
+            raise
+        return time.monotonic() - now
+
+    def _wake(self, queue):
+        if queue.dispatcher is None or queue.dispatcher.done():
+            queue.dispatcher = asyncio.ensure_future(self._dispatch(queue))
+
+    def _notify(self, queue):
+        for _, _, waiter in queue.heap:
+            waiter.changed.set()
+
+    async def _dispatch(self, queue):
+        while queue.heap:
+            now = time.monotonic()
+            wait = max(queue.blocked_until - now, queue.bucket.delay(now))
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            _, _, waiter = heapq.heappop(queue.heap)
+            if waiter.future.done():
+                continue
+            queue.bucket.take()
+            queue.stats["admitted"] += 1
+            waiter.future.set_result(None)
+            self._notify(queue)
+
+    def rate_limited(self, model: str, retry_after=None) -> float:
+        """Record a rate-limit signal; returns the pause applied to new admissions."""
+        queue = self._queue(model)
+        queue.stats["rate_limits"] += 1
+        if retry_after is None:
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** queue.strikes)
+            retry_after = backoff * random.uniform(0.5, 1.5)
+        queue.strikes += 1
+        queue.blocked_until = max(queue.blocked_until, time.monotonic() + retry_after)
+        queue.bucket.tokens = min(queue.bucket.tokens, 0.0)   # no burst straight after the pause
+        if queue.heap:
+            self._wake(queue)
+        return queue.blocked_until - time.monotonic()
+
+    def succeeded(self, model: str):
+        self._queue(model).strikes = 0
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        out = {}
+        for model, queue in self._queues.items():
+            queue.bucket.delay(now)     # refill before reporting
+            out[model] = {
+                **queue.stats,
+                "waiting": sum(1 for *_, w in queue.heap if not w.future.done()),
+                "tokens": round(queue.bucket.tokens, 2),
+                "strikes": queue.strikes,
+                "paused_for": round(max(0.0, queue.blocked_until - now), 2),
+            }
+        return out
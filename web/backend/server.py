@@ -1,105 +1,40 @@
 import asyncio
 import json
-from datetime import datetime
+import os
+import sys
+import time
+import uuid
 from pathlib import Path
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from claude_agent_sdk import (
     ClaudeSDKClient,
     ClaudeAgentOptions,
     AssistantMessage,
     ResultMessage,
-    tool,
-    create_sdk_mcp_server,
+    StreamEvent,
+    UserMessage,
 )
 
-# ─── Paths ───
-BASE_DIR = Path(__file__).parent.parent.parent
-KB_DIR = BASE_DIR / "use_cases" / "customer_support" / "knowledge_base"
-TICKETS_DIR = BASE_DIR / "use_cases" / "customer_support" / "support_data" / "tickets"
-TICKETS_DIR.mkdir(parents=True, exist_ok=True)
-BRIEFINGS_DIR = BASE_DIR / "use_cases" / "meeting_prep" / "briefings"
-BRIEFINGS_DIR.mkdir(parents=True, exist_ok=True)
-DATA_DIR = BASE_DIR / "use_cases" / "retail_analyzer" / "sample_data"
-
-
-# ════════════════════════════════════════
-#  CUSTOMER SUPPORT TOOLS
-# ════════════════════════════════════════
-
-@tool("search_knowledge_base", "Search the company knowledge base", {"query": str})
-async def search_knowledge_base(args: dict) -> dict:
-    query_words = args["query"].lower().split()
-    results = []
-    for doc in KB_DIR.glob("*.md"):
-        content = doc.read_text()
-        if any(word in content.lower() for word in query_words):
-            lines = content.split("\n")
-            relevant = []
-            for i, line in enumerate(lines):
-                if any(word in line.lower() for word in query_words):
-                    start = max(0, i - 5)
-                    end = min(len(lines), i + 10)
-                    relevant = lines[start:end]
-                    break
-            if not relevant:
-                relevant = lines[:20]
-            results.append(f"**{doc.stem}**\n" + "\n".join(relevant))
-    if not results:
-        return {"content": [{"type": "text", "text": "No relevant information found. May need escalation."}]}
-    return {"content": [{"type": "text", "text": "\n\n---\n\n".join(results)}]}
-
-
-@tool("create_ticket", "Create a support ticket", {
-    "customer_name": str, "issue_summary": str, "priority": str, "category": str,
-})
-async def create_ticket(args: dict) -> dict:
-    ticket_id = f"TKT-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-    ticket = {
-        "ticket_id": ticket_id,
-        "customer_name": args["customer_name"],
-        "issue_summary": args["issue_summary"],
-        "priority": args.get("priority", "medium"),
-        "category": args.get("category", "general"),
-        "status": "open",
-        "created_at": datetime.now().isoformat(),
-    }
-    (TICKETS_DIR / f"{ticket_id}.json").write_text(json.dumps(ticket, indent=2))
-    return {"content": [{"type": "text", "text": f"Ticket {ticket_id} created. A human agent will follow up within 24 hours."}]}
-
-
-@tool("check_order", "Look up an order by order number", {"order_number": str})
-async def check_order(args: dict) -> dict:
-    orders = {
-        "ORD-001": {"status": "Delivered", "date": "2026-02-20", "items": "Blue Jacket (M)", "tracking": "RM12345678GB"},
-        "ORD-002": {"status": "In Transit", "date": "2026-02-22", "items": "Running Shoes (42)", "tracking": "RM87654321GB"},
-        "ORD-003": {"status": "Processing", "date": "2026-02-23", "items": "Wool Scarf, Gloves Set", "tracking": "Not yet assigned"},
-    }
-    order = orders.get(args["order_number"].upper())
-    if not order:
-        return {"content": [{"type": "text", "text": f"Order {args['order_number']} not found."}]}
-    return {"content": [{"type": "text", "text": f"Order: {args['order_number'].upper()}\nStatus: {order['status']}\nItems: {order['items']}\nTracking: {order['tracking']}"}]}
-
-
-support_tools = create_sdk_mcp_server("support", "1.0.0", [search_knowledge_base, create_ticket, check_order])
-
-
-# ════════════════════════════════════════
-#  MEETING PREP TOOLS
-# ════════════════════════════════════════
-
-@tool("save_briefing", "Save a meeting briefing document", {"company_name": str, "content": str, "meeting_date": str})
-async def save_briefing(args: dict) -> dict:
-    safe_name = args["company_name"].replace(" ", "_").lower()[:50]
-    date_str = args.get("meeting_date", datetime.now().strftime("%Y-%m-%d"))
-    filepath = BRIEFINGS_DIR / f"{date_str}_{safe_name}_briefing.md"
-    filepath.write_text(args["content"])
-    return {"content": [{"type": "text", "text": f"Briefing saved: {filepath.name}"}]}
-
+from agent_tools import handlers, mcp_servers, resources
+from agent_tools.resources import BACKEND_DIR, BASE_DIR, DATA_DIR, KB_SNIPPET_CHARS, KB_TOP_K, TOOL_CACHE
+from async_io import run_io
+from compaction import ContextLedger
+from metrics import (
+    COMPACTIONS, CONTEXT_TOKENS, QUERY_SECONDS, RATE_LIMITS, REGISTRY, RESPONSE_HANDLE_SECONDS, RESPONSE_WAIT_SECONDS,
+    RETRY_SECONDS, ROUTE_SECONDS, ROUTES, SCHEDULER_WAIT_SECONDS, TURN_SECONDS, TimedWebSocket, span,
+)
+from response_cache import AnswerCache
+from router import Router
+from scheduler import RateLimited, RequestScheduler, is_rate_limit, receive_resumable
+from session_pool import ClientPool, PoolTimeout
+from session_store import SessionStore, recap, valid_session_id
 
-prep_tools = create_sdk_mcp_server("prep", "1.0.0", [save_briefing])
+# Tools, the stores behind them and their paths live in agent_tools/, built on first use.
+ANSWER_CACHE = AnswerCache(max_entries=256, ttl=3600)
 
 
 # ════════════════════════════════════════
@@ -109,13 +44,15 @@ prep_tools = create_sdk_mcp_server("prep", "1.0.0", [save_briefing])
 AGENTS = {
     "customer_support": {
         "model": "haiku",
+        "escalation_model": "sonnet",   # router: complaints, long or multi-part messages
+        "priority": 0,          # request scheduler: lower is admitted first
         "system_prompt": """You are a friendly customer support agent for an online retail store.
 ALWAYS search the knowledge base with short keywords before answering questions.
 Never say "I don't have that information" without searching first.
 Give specific answers based on the knowledge base. Never guess policies.
 Be empathetic. Offer additional help before ending conversations.
-SAMPLE ORDERS: ORD-001, ORD-002, ORD-003""",
-        "mcp_servers": {"support": support_tools},
+Look orders up with check_order (pass every order or tracking number in one call).""",
+        "mcp_servers": ["support"],
         "allowed_tools": [
             "Read", "Glob", "Grep",
             "mcp__support__search_knowledge_base",
@@ -125,42 +62,63 @@ SAMPLE ORDERS: ORD-001, ORD-002, ORD-003""",
     },
     "meeting_prep": {
         "model": "haiku",
+        "priority": 2,
         "system_prompt": """You are a meeting preparation assistant.
 When asked to prepare a briefing:
-1. Do only 1 web search with short keywords
-2. Combine search results with your existing knowledge
-3. Generate a briefing with: Company Overview, Key People, Recent News, Products, Competitors, Talking Points
-4. Save the briefing using save_briefing
+0. First call find_briefing with the company name. If a recent briefing exists, reply with it (mention its date)
+   and only refresh it if the user asks for an update — then research the news and say what changed
+1. Call research_company once with the company name — it runs the overview, news and leadership searches in parallel and returns merged notes with numbered sources
+2. If research_company fails, do only 1 web search with short keywords instead
+3. Combine the research with your existing knowledge
+4. Generate a briefing with: Company Overview, Key People, Recent News, Products, Competitors, Talking Points, and a Sources list
+5. Save the briefing using save_briefing
 Be concise — briefings should be a 2-minute read.""",
-        "mcp_servers": {"prep": prep_tools},
+        "mcp_servers": ["prep"],
         "allowed_tools": [
             "Read", "Glob", "Grep", "Write",
             "WebSearch", "WebFetch",
+            "mcp__prep__find_briefing",
+            "mcp__prep__search_briefings",
+            "mcp__prep__research_company",
             "mcp__prep__save_briefing",
         ],
     },
     "retail_analyzer": {
         "model": "haiku",
+        "priority": 1,
         "system_prompt": f"""You are a retail business data analyst.
 
-DATA FILES (use these exact paths with Bash + Python):
+ANALYTICS TOOLS (preloaded in memory — answer from these first, they are instant):
+- sales_summary — total revenue, transactions, units, average transaction
+- revenue_by(dimension) — revenue/units/share by product, category, customer_type, payment_method, date or month
+- top_customers(n, by) — ranked by total_spent, orders_count or loyalty_points
+- low_stock — products where in_stock < reorder_level, with shortfall and supplier
+- margin_by_product — unit margin, margin % and realised gross profit
+
+DATA FILES (for questions the tools don't cover, use Bash + Python with these exact paths):
 - {DATA_DIR}/sales_2026.csv — Sales transactions (date, product, category, quantity, unit_price, total, customer_type, payment_method)
 - {DATA_DIR}/inventory.csv — Stock levels (product, category, in_stock, reorder_level, cost_price, retail_price, supplier)
 - {DATA_DIR}/customers.csv — Customer data (name, type, total_spent, orders_count, loyalty_points, city)
 
 HOW TO ANALYZE:
-- ALWAYS use Bash to run Python pandas commands to read and analyze data
-- Do everything in a single python3 -c command, for example:
-  python3 -c "import pandas as pd; df = pd.read_csv('{DATA_DIR}/sales_2026.csv'); print('Total Revenue: £' + str(round(df['total'].sum(), 2)))"
-- NEVER just read the file — always calculate with pandas
+- Use the analytics tools whenever they answer the question; combine several if needed
+- Only fall back to pandas for ad-hoc questions, in a single python3 -c command. Load data with read_pandas
+  (memory-mapped columnar cache, much faster than read_csv) instead of pd.read_csv, for example:
+  python3 -c "import sys; sys.path.insert(0, '{BACKEND_DIR}'); from columnar_cache import read_pandas; df = read_pandas('{DATA_DIR}/sales_2026.csv'); print(df.groupby('product', observed=True)['quantity'].mean())"
+- NEVER just read the file — always calculate
 - Give specific numbers, percentages, and rankings
 - Flag problems (low stock items where in_stock < reorder_level)
 - Compare metrics when possible
 - Suggest actionable business decisions
 - Keep responses concise and focused on insights""",
-        "mcp_servers": {},
+        "mcp_servers": ["analytics"],
         "allowed_tools": [
             "Read", "Bash", "Glob", "Grep", "Write",
+            "mcp__analytics__sales_summary",
+            "mcp__analytics__revenue_by",
+            "mcp__analytics__top_customers",
+            "mcp__analytics__low_stock",
+            "mcp__analytics__margin_by_product",
         ],
     },
 }
@@ -185,78 +143,513 @@ async def health():
     return {"status": "ok"}
 
 
-async def process_response(client, websocket):
-    """Process SDK response messages. Returns True if a text response was sent."""
+STREAM_DELTAS = True          # forward partial text as {"type": "delta"} frames
+DELTA_FLUSH_INTERVAL = 0.05   # seconds; deltas arriving within this window share a frame
+DELTA_MAX_CHARS = 512         # flush early once this much text is buffered
+
+
+class DeltaBuffer:
+    """Coalesces streamed text deltas so the socket gets one frame per interval, not per token.
+
+    The first delta of each text block is sent immediately so the first
+    character shows up as soon as the model produces it. Later ones wait at
+    most ``DELTA_FLUSH_INTERVAL`` on a timer, so a pause in the stream doesn't
+    leave text sitting in the buffer.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.parts = []
+        self.size = 0
+        self.last_flush = None
+        self.timer = None
+        self.pending = None
+        self.sending = asyncio.Lock()   # keeps timer and inline flushes in order
+
+    async def add(self, text: str):
+        self.parts.append(text)
+        self.size += len(text)
+        now = time.monotonic()
+        if self.last_flush is None or now - self.last_flush >= DELTA_FLUSH_INTERVAL or self.size >= DELTA_MAX_CHARS:
+            await self.flush(now)
+        elif self.timer is None:
+            delay = self.last_flush + DELTA_FLUSH_INTERVAL - now
+            self.timer = asyncio.get_running_loop().call_later(delay, self._flush_due)
+
+    def _flush_due(self):
+        self.timer = None
+        self.pending = asyncio.ensure_future(self._flush_quietly())
+
+    async def _flush_quietly(self):
+        try:
+            await self.flush()
+        except Exception:
+            pass    # the socket is gone; the turn's next send reports it
+
+    async def flush(self, now=None):
+        self.cancel()
+        async with self.sending:
+            if self.parts:
+                text = "".join(self.parts)
+                self.parts.clear()
+                self.size = 0
+                self.last_flush = now or time.monotonic()
+                await self.websocket.send_json({"type": "delta", "text": text})
+
+    async def end_block(self):
+        await self.flush()
+        self.last_flush = None
+
+    def cancel(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
+async def process_response(client, websocket, transcript=None, agent_id="unknown", on_rate_limit=None, messages=None):
+    """Process SDK response messages. Returns True if a text response was sent.
+
+    Complete assistant/tool/error frames are also appended to ``transcript`` when given,
+    and the turn's top-level SDK messages (assistant, tool results, message_start events,
+    result) to ``messages``.
+    Raises ``RateLimited`` when the turn ends in a rate-limit error.
+    """
     got_text = False
-    async for msg in client.receive_response():
-        if isinstance(msg, AssistantMessage):
-            for block in msg.content:
-                if hasattr(block, "text") and block.text.strip():
-                    await websocket.send_json({"type": "assistant", "text": block.text})
+    deltas = DeltaBuffer(websocket)
+
+    async def send(frame):
+        await websocket.send_json(frame)
+        if transcript is not None:
+            transcript.append(frame)
+
+    waited_from = time.perf_counter()
+    try:
+        async for msg in receive_resumable(client, on_rate_limit):
+            received = time.perf_counter()
+            kind = type(msg).__name__
+            RESPONSE_WAIT_SECONDS.labels(agent_id, kind).observe(received - waited_from)
+            if isinstance(msg, StreamEvent) and not msg.parent_tool_use_id:
+                event = msg.event
+                if event.get("type") == "message_start" and messages is not None:
+                    messages.append(msg)
+                elif event.get("type") == "content_block_delta" and event["delta"].get("type") == "text_delta":
+                    await deltas.add(event["delta"]["text"])
                     got_text = True
-                elif hasattr(block, "name"):
-                    await websocket.send_json({"type": "tool", "text": f"Using: {block.name}"})
-        elif isinstance(msg, ResultMessage):
-            if msg.subtype == "error":
-                await websocket.send_json({"type": "error", "text": str(msg.error)})
+                elif event.get("type") == "content_block_stop":
+                    await deltas.end_block()
+            elif isinstance(msg, AssistantMessage):
+                if messages is not None:
+                    messages.append(msg)
+                await deltas.end_block()
+                for block in msg.content:
+                    if hasattr(block, "text") and block.text.strip():
+                        await send({"type": "assistant", "text": block.text})
+                        got_text = True
+                    elif hasattr(block, "name"):
+                        await send({"type": "tool", "text": f"Using: {block.name}"})
+            elif isinstance(msg, UserMessage):
+                if messages is not None and not msg.parent_tool_use_id:
+                    messages.append(msg)
+            elif isinstance(msg, ResultMessage):
+                if messages is not None:
+                    messages.append(msg)
+                await deltas.end_block()
+                if msg.is_error:
+                    error = msg.result or msg.subtype
+                    if is_rate_limit(error):
+                        raise RateLimited(error)
+                    await send({"type": "error", "text": error})
+            waited_from = time.perf_counter()
+            RESPONSE_HANDLE_SECONDS.labels(agent_id, kind).observe(waited_from - received)
+    finally:
+        deltas.cancel()
     return got_text
 
 
+def build_options(config: dict, resume=None) -> ClaudeAgentOptions:
+    return ClaudeAgentOptions(
+        system_prompt=config["system_prompt"],
+        model=config.get("model", "haiku"),
+        mcp_servers=mcp_servers(config.get("mcp_servers", ())),
+        allowed_tools=config["allowed_tools"],
+        permission_mode="acceptEdits",
+        include_partial_messages=STREAM_DELTAS,
+        resume=resume,
+    )
+
+
+POOL_MIN_SIZE = 1           # clients kept connected per agent, even when idle
+POOL_MAX_SIZE = int(os.environ.get("POOL_MAX_SIZE", 8))   # upper bound on live clients per agent (per worker)
+POOL_IDLE_TIMEOUT = 300     # seconds before an idle client above min size is closed
+POOL_HEALTH_INTERVAL = 30   # seconds between idle eviction / health check sweeps
+POOL_ACQUIRE_TIMEOUT = 60   # seconds a connection waits when the pool is exhausted
+POOL_MAX_PARKED = POOL_MAX_SIZE // 2   # clients held for disconnected sessions, per agent
+POOL_PARK_TTL = 600         # seconds a disconnected session keeps its live client
+
+AGENT_CLIENT = os.environ.get("AGENT_CLIENT", "sdk")   # "stub" / "replay" swap in fake_sdk clients for load tests
+
+# Admission per model for this worker: (sustained requests/second, burst). The
+# fake_sdk clients have no upstream limit, so load tests get an effectively open bucket.
+MODEL_RATES = {"haiku": (4.0, 20), "sonnet": (2.0, 10), "opus": (1.0, 5)}
+RATE_LIMIT_RETRIES = 3      # rate-limited turns are retried after the scheduler's backoff
+SCHEDULER = (
+    RequestScheduler(MODEL_RATES) if AGENT_CLIENT == "sdk"
+    else RequestScheduler({}, default_rate=(10_000.0, 10_000))
+)
+
+
+def make_client(agent_id: str, config: dict, resume=None):
+    if AGENT_CLIENT == "stub":
+        from fake_sdk import StubClient
+        return StubClient(options=build_options(config, resume))
+    if AGENT_CLIENT == "replay":
+        from fake_sdk import ReplayClient
+        tools = handlers(config.get("mcp_servers", ()))
+        return ReplayClient(options=build_options(config, resume), agent_id=agent_id, tools=tools)
+    return ClaudeSDKClient(options=build_options(config, resume))
+
+
+POOLS = {
+    agent_id: ClientPool(
+        agent_id,
+        lambda agent_id=agent_id, config=config: make_client(agent_id, config),
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        idle_timeout=POOL_IDLE_TIMEOUT,
+        health_interval=POOL_HEALTH_INTERVAL,
+        max_parked=POOL_MAX_PARKED,
+        park_ttl=POOL_PARK_TTL,
+    )
+    for agent_id, config in AGENTS.items()
+}
+
+# Conversation history per ?session= id (session_store.py). A reconnect gets its
+# parked client back, else a client resuming the SDK session, else a recap prompt.
+SESSIONS = SessionStore(Path(os.environ.get("SESSIONS_DIR") or BASE_DIR / "sessions"), max_sessions=1000, max_chars=64_000)
+SESSION_RESUME = True       # reconnect with resume=<sdk session id> when no parked client is left
+CONTEXT_BUDGET_TOKENS = int(os.environ.get("CONTEXT_BUDGET_TOKENS", 24_000))   # compact past this prompt size
+CONTEXT_KEEP_TURNS = 2      # newest turns kept verbatim when older ones are summarized
+
+
+async def checkout_client(agent_id: str, session) -> tuple:
+    """``(client, has_context)`` for a connecting session: its parked client, a new
+    client resuming its SDK session, or a fresh pooled one."""
+    pool = POOLS[agent_id]
+    client = pool.unpark(session.session_id)
+    if client is not None:
+        return client, True
+    if SESSION_RESUME and session.sdk_session_id:
+        config = AGENTS[agent_id]
+        try:
+            client = await pool.acquire(
+                timeout=POOL_ACQUIRE_TIMEOUT,
+                factory=lambda: make_client(agent_id, config, resume=session.sdk_session_id),
+            )
+            return client, True
+        except PoolTimeout:
+            raise
+        except Exception:
+            pass        # the CLI no longer has the session; fall back to a recap
+    return await pool.acquire(timeout=POOL_ACQUIRE_TIMEOUT), False
+
+
+@app.on_event("startup")
+async def start_pools():
+    if resources.RESEARCH_SEARCH_URL is None:
+        print("RESEARCH_SEARCH_URL not set: meeting_prep research_company is off (falls back to WebSearch)", file=sys.stderr)
+    for pool in POOLS.values():
+        await pool.start()
+
+
+@app.on_event("shutdown")
+async def close_pools():
+    for pool in POOLS.values():
+        await pool.close()
+    resources.close()
+
+
+@app.get("/api/pools")
+async def pool_stats():
+    return {agent_id: pool.snapshot() for agent_id, pool in POOLS.items()}
+
+
+@app.get("/api/sessions")
+async def session_stats():
+    return SESSIONS.snapshot()
+
+
+@app.get("/api/scheduler")
+async def scheduler_stats():
+    return SCHEDULER.snapshot()
+
+
+# Agents whose answers to a conversation's first message may be reused, mapped
+# to the data version those answers depend on
+ANSWER_CACHE_AGENTS = {
+    "customer_support": resources.kb_generation,
+}
+# The only tools a cached answer may have used. The version above tracks the knowledge
+# base alone, and other tools act (create_ticket) or read one customer's orders.
+ANSWER_CACHE_TOOLS = {"mcp__support__search_knowledge_base"}
+
+
+def answer_cacheable(transcript: list) -> bool:
+    return not any(
+        f["type"] == "error" or (f["type"] == "tool" and f["text"].removeprefix("Using: ") not in ANSWER_CACHE_TOOLS)
+        for f in transcript
+    )
+
+
+async def record_briefing_usage(messages: list):
+    """Attach a turn's token usage and cost to the briefings it saved."""
+    saved = [
+        block.input for msg in messages if isinstance(msg, AssistantMessage)
+        for block in msg.content if getattr(block, "name", "") == "mcp__prep__save_briefing"
+    ]
+    result = next((msg for msg in reversed(messages) if isinstance(msg, ResultMessage)), None)
+    if not saved or result is None:
+        return
+    usage = result.usage or {}
+    for args in saved:
+        await run_io(resources.briefings().record_usage, args.get("company_name", ""), args.get("content", ""),
+                     usage.get("input_tokens"), usage.get("output_tokens"), result.total_cost_usd)
+
+
+# Agents with a hook called after each model turn with the turn's SDK messages
+TURN_HOOKS = {
+    "meeting_prep": record_briefing_usage,
+}
+
+
+async def lookup_order(order_number: str) -> str:
+    result = await handlers(["support"])["mcp__support__check_order"]({"order_number": order_number})
+    return result["content"][0]["text"]
+
+
+async def kb_direct_search(query: str) -> list:
+    await resources.kb_generation()     # refreshes the index first when due
+    return await run_io(resources.kb_index().search_ranked, query, top_k=KB_TOP_K, max_chars=KB_SNIPPET_CHARS)
+
+
+# Per-message routing in front of client.query (router.py): canned greetings and thanks and
+# direct answers for the fast paths listed here, and a model choice for everything else.
+ROUTE_FAST_PATHS = {
+    "customer_support": {"order_lookup": lookup_order, "kb_search": kb_direct_search, "smalltalk": True},
+}
+ROUTERS = {
+    agent_id: Router(config.get("model", "haiku"), config.get("escalation_model"), **ROUTE_FAST_PATHS.get(agent_id, {}))
+    for agent_id, config in AGENTS.items()
+}
+
+
+@app.get("/api/briefings")
+async def list_briefings(company: str = None, q: str = None, limit: int = 20):
+    if q:
+        return await run_io(resources.briefings().search, q, limit=min(limit, 100))
+    return await run_io(resources.briefings().recent, company, limit=min(limit, 100))
+
+
+@app.get("/api/cache")
+async def cache_stats():
+    return {"tools": TOOL_CACHE.snapshot(), "answers": ANSWER_CACHE.snapshot()}
+
+
+def cached_context(prompt: str, frames: list, source="the FAQ cache") -> str:
+    """Recap of an exchange answered without the model, prepended to the next query so the model knows about it."""
+    answer = "\n\n".join(f["text"] for f in frames if f["type"] == "assistant")
+    return (
+        f"[Earlier in this conversation the customer asked the following and was answered from {source}.]\n"
+        f"Customer: {prompt}\nYou: {answer}\n\n[New message]\n"
+    )
+
+
+@app.get("/api/metrics")
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.websocket("/ws/{agent_id}")
 async def websocket_endpoint(websocket: WebSocket, agent_id: str):
     await websocket.accept()
+    websocket = TimedWebSocket(websocket, agent_id if agent_id in AGENTS else "unknown")
 
     if agent_id not in AGENTS:
         await websocket.send_json({"type": "error", "text": f"Unknown agent: {agent_id}"})
         await websocket.close()
         return
 
-    config = AGENTS[agent_id]
+    pool = POOLS[agent_id]
+    session_id = websocket.query_params.get("session")
+    if not valid_session_id(session_id):
+        session_id = uuid.uuid4().hex
+    session = await run_io(SESSIONS.open, agent_id, session_id)
+    try:
+        client, has_context = await checkout_client(agent_id, session)
+    except PoolTimeout as e:
+        await websocket.send_json({"type": "error", "text": str(e)})
+        await websocket.close()
+        return
 
-    options = ClaudeAgentOptions(
-        system_prompt=config["system_prompt"],
-        model=config.get("model", "haiku"),
-        mcp_servers=config.get("mcp_servers", {}),
-        allowed_tools=config["allowed_tools"],
-        permission_mode="acceptEdits",
-    )
+    used = has_context      # a client holding this conversation must be reset before reuse
+    in_turn = False
+    turns = session.user_turns
+    carry_over = "" if has_context else recap(session.history)
+    ledger = ContextLedger(CONTEXT_BUDGET_TOKENS, keep_turns=CONTEXT_KEEP_TURNS)
+    ledger.seed(session.history)
+    answer_version = ANSWER_CACHE_AGENTS.get(agent_id)
+    router = ROUTERS[agent_id]
+    base_model = model = client_model = AGENTS[agent_id].get("model", "haiku")
+    priority = AGENTS[agent_id].get("priority", 1)
+
+    async def queue_position(position):
+        await websocket.send_json({"type": "queue", "position": position})
+
+    def rate_limit_notice():
+        # Informational: the response streams on, so don't pause the model for everyone
+        RATE_LIMITS.labels(agent_id, "notice").inc()
+
+    turn_hook = TURN_HOOKS.get(agent_id)
+
+    async def run_query(prompt, transcript=None, messages=None) -> bool:
+        """Wait for admission, send ``prompt`` and stream the response. Raises RateLimited."""
+        waited = await SCHEDULER.admit(model, priority, on_position=queue_position)
+        SCHEDULER_WAIT_SECONDS.labels(agent_id).observe(waited)
+        if waited:
+            await websocket.send_json({"type": "status", "text": "Thinking..."})
+        with span(QUERY_SECONDS.labels(agent_id)):
+            await client.query(prompt)
+        return await process_response(client, websocket, transcript, agent_id, on_rate_limit=rate_limit_notice, messages=messages)
 
     try:
-        async with ClaudeSDKClient(options=options) as client:
-            await websocket.send_json({"type": "status", "text": "Connected"})
-
-            while True:
-                data = await websocket.receive_text()
-                message = json.loads(data)
-                user_text = message.get("text", "")
-                if not user_text:
+        await websocket.send_json({"type": "status", "text": "Connected", "session": session_id})
+        if session.history:
+            await websocket.send_json({"type": "history", "messages": list(session.history)})
+
+        while True:
+            data = await websocket.receive_text()
+            message = json.loads(data)
+            user_text = message.get("text", "")
+            if not user_text:
+                continue
+
+            turns += 1
+            turn_started = time.perf_counter()
+            last_reply = next((f["text"] for f in reversed(session.history) if f["type"] == "assistant"), "")
+            decision = await router.route(user_text, last_reply)
+            routed = time.perf_counter()
+            ROUTE_SECONDS.labels(agent_id, decision["route"]).observe(routed - turn_started)
+            ROUTES.labels(agent_id, decision["route"], decision["model"] or "none").inc()
+            if decision["frames"] is not None:
+                for frame in decision["frames"]:
+                    await websocket.send_json(frame)
+                await websocket.send_json({"type": "done"})
+                TURN_SECONDS.labels(agent_id, "route").observe(time.perf_counter() - turn_started)
+                if decision["route"] == "smalltalk":
+                    turns -= 1      # a greeting first doesn't stop the next message using the answer cache
+                else:
+                    carry_over += cached_context(user_text, decision["frames"], source=f"a direct {decision['route']} lookup")
+                await run_io(SESSIONS.append, session, [{"type": "user", "text": user_text}, *decision["frames"]])
+                continue
+
+            model = decision["model"]
+            cacheable = answer_version is not None and turns == 1
+            if cacheable:
+                version = await answer_version()
+                frames = ANSWER_CACHE.get(agent_id, user_text, version)
+                if frames is not None:
+                    for frame in frames:
+                        await websocket.send_json(frame)
+                    await websocket.send_json({"type": "done"})
+                    TURN_SECONDS.labels(agent_id, "cache").observe(time.perf_counter() - turn_started)
+                    carry_over = cached_context(user_text, frames)
+                    await run_io(SESSIONS.append, session, [{"type": "user", "text": user_text}, *frames])
                     continue
 
-                await websocket.send_json({"type": "status", "text": "Thinking..."})
-                await client.query(user_text)
-
-                got_text = False
+            used = in_turn = True
+            await websocket.send_json({"type": "status", "text": "Thinking..."})
+            if model != client_model:
+                await client.set_model(model)
+                client_model = model
+            prompt = carry_over + user_text
+            carry_over = ""
+
+            got_text = False
+            transcript = []
+            messages = []
+            limited_at = None
+            try:
+                for retry in range(RATE_LIMIT_RETRIES + 1):
+                    try:
+                        got_text = await run_query(prompt, transcript, messages) or got_text
+                        SCHEDULER.succeeded(model)
+                        break
+                    except RateLimited:
+                        RATE_LIMITS.labels(agent_id, "error").inc()
+                        limited_at = limited_at or time.perf_counter()
+                        if retry == RATE_LIMIT_RETRIES:
+                            raise
+                        delay = SCHEDULER.rate_limited(model)
+                        await websocket.send_json({"type": "status", "text": f"Rate limited — retrying in {delay:.0f}s"})
+                        prompt = "continue"
+            except RateLimited:
+                await websocket.send_json({"type": "error", "text": "The model is still rate limited. Please try again in a minute."})
+            except Exception as e:
+                await websocket.send_json({"type": "error", "text": str(e)})
+            if limited_at:
+                RETRY_SECONDS.labels(agent_id).observe(time.perf_counter() - limited_at)
+            if turn_hook and messages:
                 try:
-                    got_text = await process_response(client, websocket)
+                    await turn_hook(messages)
                 except Exception as e:
-                    if "rate_limit_event" not in str(e):
-                        await websocket.send_json({"type": "error", "text": str(e)})
-
-                # Rate limit killed the loop before text arrived — retry
-                if not got_text:
-                    await asyncio.sleep(2)
-                    try:
-                        await client.query("continue")
-                        await process_response(client, websocket)
-                    except Exception:
-                        pass
-
-                await websocket.send_json({"type": "done"})
+                    print(f"turn hook for {agent_id} failed: {e}", file=sys.stderr)
+
+            if cacheable and got_text and not limited_at and answer_cacheable(transcript):
+                ANSWER_CACHE.put(agent_id, user_text, transcript, version)
+            result = next((m for m in reversed(messages) if isinstance(m, ResultMessage)), None)
+            await run_io(SESSIONS.append, session, [{"type": "user", "text": user_text}, *transcript],
+                         sdk_session_id=getattr(result, "session_id", None))
+
+            in_turn = False
+            await websocket.send_json({"type": "done"})
+            TURN_SECONDS.labels(agent_id, "model").observe(time.perf_counter() - turn_started)
+
+            ledger.record_turn(user_text, messages)
+            CONTEXT_TOKENS.labels(agent_id).observe(ledger.context_tokens)
+            if ledger.over_budget():
+                # Between turns, so the user isn't kept waiting on the next answer for the reset.
+                in_turn = True
+                if await pool.reset(client):
+                    carry_over = ledger.compact()
+                    COMPACTIONS.labels(agent_id).inc()
+                in_turn = False
 
     except WebSocketDisconnect:
         pass
+    finally:
+        if client_model != base_model and not in_turn:
+            try:        # pooled clients must come back on the agent's own model
+                await client.set_model(base_model)
+            except Exception:
+                in_turn = True
+        # Between turns the conversation may continue on reconnect, so hold the client for
+        # the session. One dropped mid-turn still has a response streaming; don't reuse it.
+        if not (used and not in_turn and pool.park(session_id, client)):
+            await pool.release(client, used=used, broken=in_turn)
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AI agent dashboard backend")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="server processes behind a sticky load balancer on --port (see multiworker.py)")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        import multiworker
+        multiworker.serve(Path(__file__).resolve(), args.workers, host=args.host, port=args.port)
+    else:
+        import uvicorn
+        uvicorn.run(app, host=args.host, port=args.port)
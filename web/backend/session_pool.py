@@ -0,0 +1,269 @@
+"""Pool of pre-warmed ClaudeSDKClient connections, one pool per agent.
+
+Spawning the CLI subprocess and running the MCP handshake dominates the time
+to "Connected", so each agent keeps ``min_size`` clients connected ahead of
+time. A WebSocket checks a client out, and on release the client is reset
+with ``/clear`` and put back, or discarded if the reset or health check fails.
+
+A client whose conversation may continue (its WebSocket closed between
+turns) can be parked under a session key instead of reset, so a reconnect
+within ``park_ttl`` gets its context back. Parked clients count towards
+``max_size``; the oldest is reset into the idle list when more than
+``max_parked`` are parked, when it expires, or when ``acquire`` would
+otherwise have to wait.
+
+The SDK client must be connected and disconnected from the same task (its
+reader runs in an anyio task group), so every pooled client is owned by a
+small keeper task that lives for as long as the client does.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class _Pooled:
+    def __init__(self, client, stop, task):
+        self.client = client
+        self.stop = stop
+        self.task = task
+        self.last_used = time.monotonic()
+
+
+class ClientPool:
+    def __init__(self, name, factory, min_size=1, max_size=4, idle_timeout=300.0,
+                 health_interval=30.0, reset_prompt="/clear", reset_timeout=15.0, max_parked=None, park_ttl=600.0):
+        self.name = name
+        self.factory = factory            # () -> unconnected ClaudeSDKClient
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.reset_prompt = reset_prompt
+        self.reset_timeout = reset_timeout
+        self.max_parked = max_size // 2 if max_parked is None else max_parked
+        self.park_ttl = park_ttl
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "waited": 0, "parked": 0, "unparked": 0, "park_evicted": 0}
+        self._idle = []                   # most recently released last
+        self._busy = {}                   # id(client) -> _Pooled
+        self._parked = OrderedDict()      # session key -> _Pooled, least recently parked first
+        self._evicting = 0                # parked clients being reset back into the idle list
+        self._size = 0                    # idle + busy + connecting
+        self._cond = asyncio.Condition()
+        self._maintainer = None
+        self._closed = False
+
+    # ─── Lifecycle ───
+
+    async def start(self):
+        """Begin warming ``min_size`` clients in the background."""
+        if self._maintainer is None:
+            self._maintainer = asyncio.create_task(self._maintain())
+
+    async def close(self):
+        self._closed = True
+        if self._maintainer:
+            self._maintainer.cancel()
+        async with self._cond:
+            idle, self._idle = self._idle, []
+            busy, self._busy = list(self._busy.values()), {}
+            parked, self._parked = list(self._parked.values()), OrderedDict()
+        for pooled in idle + busy + parked:
+            await self._shutdown(pooled)
+
+    # ─── Checkout ───
+
+    async def acquire(self, timeout=None, factory=None):
+        """Check out a client. With ``factory``, always connect a new client from it
+        (e.g. one resuming an earlier SDK session) instead of reusing an idle one."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        async with self._cond:
+            while True:
+                while self._idle and factory is None:
+                    pooled = self._idle.pop()
+                    if self._healthy(pooled):
+                        self._busy[id(pooled.client)] = pooled
+                        self.stats["reused"] += 1
+                        return pooled.client
+                    self._size -= 1
+                    asyncio.create_task(self._shutdown(pooled))
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                if factory is not None and self._idle:
+                    pooled = self._idle.pop(0)      # make room for the new client
+                    self._size -= 1
+                    asyncio.create_task(self._shutdown(pooled))
+                    continue
+                if self._parked and not self._evicting:
+                    self._evict_parked()            # frees a slot once its reset finishes
+                self.stats["waited"] += 1
+                try:
+                    remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                    await asyncio.wait_for(self._cond.wait(), remaining)
+                except asyncio.TimeoutError:
+                    raise PoolTimeout(f"No {self.name} client available") from None
+        try:
+            pooled = await self._spawn(factory)
+        except BaseException:
+            async with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        self._busy[id(pooled.client)] = pooled
+        return pooled.client
+
+    async def release(self, client, used=True, broken=False):
+        """Return a client. Used clients are reset first; broken ones are discarded."""
+        pooled = self._busy.pop(id(client), None)
+        if pooled is None:
+            return
+        keep = not broken and not self._closed and self._healthy(pooled)
+        if keep and used:
+            keep = await self.reset(client)
+        async with self._cond:
+            if keep:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+            else:
+                self._size -= 1
+            self._cond.notify()
+        if not keep:
+            await self._shutdown(pooled)
+
+    def park(self, key, client) -> bool:
+        """Hold a checked-out client for ``key`` instead of resetting it. False if it can't be parked."""
+        pooled = self._busy.get(id(client))
+        if pooled is None or self._closed or self.max_parked <= 0 or not self._healthy(pooled):
+            return False
+        del self._busy[id(client)]
+        previous = self._parked.pop(key, None)
+        if previous is not None:
+            self._evict(previous)
+        pooled.last_used = time.monotonic()
+        self._parked[key] = pooled
+        self.stats["parked"] += 1
+        while len(self._parked) > self.max_parked:
+            self._evict_parked()
+        return True
+
+    def unpark(self, key):
+        """Check out the client parked for ``key``, or None."""
+        pooled = self._parked.pop(key, None)
+        if pooled is None:
+            return None
+        if not self._healthy(pooled):
+            self._evict(pooled)
+            return None
+        self._busy[id(pooled.client)] = pooled
+        self.stats["unparked"] += 1
+        return pooled.client
+
+    def _evict_parked(self):
+        _, pooled = self._parked.popitem(last=False)
+        self.stats["park_evicted"] += 1
+        self._evict(pooled)
+
+    def _evict(self, pooled):
+        self._busy[id(pooled.client)] = pooled
+        self._evicting += 1
+        asyncio.create_task(self._release_evicted(pooled.client))
+
+    async def _release_evicted(self, client):
+        try:
+            await self.release(client, used=True)
+        finally:
+            self._evicting -= 1
+
+    def snapshot(self) -> dict:
+        return {"size": self._size, "idle": len(self._idle), "busy": len(self._busy), "parked_now": len(self._parked), **self.stats}
+
+    # ─── Internals ───
+
+    async def _spawn(self, factory=None):
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        task = asyncio.create_task(self._keeper(ready, stop, factory or self.factory))
+        try:
+            client = await asyncio.shield(ready)
+        except asyncio.CancelledError:
+            stop.set()
+            ready.cancel()
+            raise
+        self.stats["created"] += 1
+        return _Pooled(client, stop, task)
+
+    async def _keeper(self, ready, stop, factory):
+        client = factory()
+        try:
+            await client.connect()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            return
+        if not ready.done():
+            ready.set_result(client)
+            await stop.wait()
+        try:
+            await client.disconnect()
+        except Exception:
+            pass
+
+    async def _shutdown(self, pooled):
+        self.stats["discarded"] += 1
+        pooled.stop.set()
+        try:
+            await asyncio.wait_for(pooled.task, 10)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pooled.task.cancel()
+
+    async def reset(self, client) -> bool:
+        """Clear a client's conversation with ``reset_prompt``; False if that failed or timed out."""
+        async def clear():
+            await client.query(self.reset_prompt)
+            async for _ in client.receive_response():
+                pass
+        try:
+            await asyncio.wait_for(clear(), self.reset_timeout)
+            return True
+        except Exception:
+            return False
+
+    def _healthy(self, pooled) -> bool:
+        if pooled.task.done():
+            return False
+        transport = getattr(pooled.client, "_transport", None)
+        is_ready = getattr(transport, "is_ready", None)
+        return is_ready() if is_ready else True
+
+    async def _maintain(self):
+        while not self._closed:
+            async with self._cond:
+                now = time.monotonic()
+                expired = [p for p in self._idle
+                           if not self._healthy(p) or now - p.last_used > self.idle_timeout]
+                # keep min_size warm even if idle for long, unless unhealthy
+                for pooled in expired:
+                    if self._healthy(pooled) and self._size <= self.min_size:
+                        continue
+                    self._idle.remove(pooled)
+                    self._size -= 1
+                    asyncio.create_task(self._shutdown(pooled))
+                while self._parked and now - next(iter(self._parked.values())).last_used > self.park_ttl:
+                    self._evict_parked()
+                missing = max(0, self.min_size - self._size)
+                self._size += missing
+            for _ in range(missing):
+                try:
+                    pooled = await self._spawn()
+                except Exception:
+                    async with self._cond:
+                        self._size -= 1
+                    continue
+                async with self._cond:
+                    self._idle.insert(0, pooled)
+                    self._cond.notify()
+            await asyncio.sleep(self.health_interval)
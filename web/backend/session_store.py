@@ -0,0 +1,148 @@
+"""Server-side conversation history, keyed by agent and session id.
+
+Each session is one JSON Lines file, ``<directory>/<agent>/<session>.jsonl``.
+A turn appends its complete frames (``{"type": "user"|"assistant"|"tool"|"error",
+"text"}``, never deltas) in one write, plus ``{"sdk_session": id}`` when the
+SDK session id changes, so a reconnect can resume the SDK conversation.
+
+Memory is bounded twice: a loaded session keeps only its newest frames up
+to ``max_chars`` of text, and at most ``max_sessions`` sessions stay loaded,
+least recently used evicted first. Eviction only drops the in-memory copy:
+everything is already on disk. Files that grow past ``max_file_bytes`` are
+rewritten with the in-memory tail.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+
+SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+def valid_session_id(value) -> bool:
+    return bool(value) and bool(SESSION_ID_RE.match(value))
+
+
+class Session:
+    __slots__ = ("agent_id", "session_id", "path", "history", "chars", "sdk_session_id", "last_active", "user_turns")
+
+    def __init__(self, agent_id, session_id, path):
+        self.agent_id = agent_id
+        self.session_id = session_id
+        self.path = path
+        self.history = deque()
+        self.chars = 0
+        self.sdk_session_id = None
+        self.last_active = time.time()
+        self.user_turns = 0
+
+    def add(self, frame: dict, max_chars: int):
+        self.history.append(frame)
+        self.chars += len(frame.get("text", ""))
+        if frame.get("type") == "user":
+            self.user_turns += 1
+        while self.chars > max_chars and len(self.history) > 1:
+            self.chars -= len(self.history.popleft().get("text", ""))
+
+
+class SessionStore:
+    """Blocking API; call through ``run_io`` from the event loop."""
+
+    def __init__(self, directory, max_sessions=1000, max_chars=64_000, max_file_bytes=256 * 1024):
+        self.directory = Path(directory)
+        self.max_sessions = max_sessions
+        self.max_chars = max_chars
+        self.max_file_bytes = max_file_bytes
+        self._sessions = OrderedDict()      # (agent_id, session_id) -> Session, least recently used first
+        self._lock = threading.Lock()
+        self.stats = {"loaded": 0, "hits": 0, "evicted": 0, "compacted": 0}
+
+    def open(self, agent_id: str, session_id: str) -> Session:
+        key = (agent_id, session_id)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                self.stats["hits"] += 1
+                return session
+        session = self._load(agent_id, session_id)
+        with self._lock:
+            session = self._sessions.setdefault(key, session)
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.stats["evicted"] += 1
+        return session
+
+    def _load(self, agent_id, session_id) -> Session:
+        session = Session(agent_id, session_id, self.directory / agent_id / f"{session_id}.jsonl")
+        self.stats["loaded"] += 1
+        try:
+            with open(session.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue            # torn final line from a crash mid-write
+                    if "sdk_session" in entry:
+                        session.sdk_session_id = entry["sdk_session"]
+                    else:
+                        session.add(entry, self.max_chars)
+            session.last_active = session.path.stat().st_mtime
+        except FileNotFoundError:
+            pass
+        return session
+
+    def append(self, session: Session, frames: list, sdk_session_id=None):
+        """Record one turn's frames (and the SDK session id, if it changed)."""
+        lines = []
+        for frame in frames:
+            session.add(frame, self.max_chars)
+            lines.append(json.dumps(frame, ensure_ascii=False))
+        if sdk_session_id and sdk_session_id != session.sdk_session_id:
+            session.sdk_session_id = sdk_session_id
+            lines.append(json.dumps({"sdk_session": sdk_session_id}))
+        session.last_active = time.time()
+        if not lines:
+            return
+        session.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(session.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, ("\n".join(lines) + "\n").encode("utf-8"))
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > self.max_file_bytes:
+            self._compact(session)
+
+    def _compact(self, session: Session):
+        lines = [json.dumps(frame, ensure_ascii=False) for frame in session.history]
+        if session.sdk_session_id:
+            lines.append(json.dumps({"sdk_session": session.sdk_session_id}))
+        tmp = session.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, session.path)
+        self.stats["compacted"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"in_memory": len(self._sessions), "chars": sum(s.chars for s in self._sessions.values()), **self.stats}
+
+
+def recap(history, max_chars=4000) -> str:
+    """The newest exchanges as a prompt prefix, for a client that lost the conversation."""
+    lines, used = [], 0
+    for frame in reversed(history):
+        if frame["type"] not in ("user", "assistant"):
+            continue
+        line = f"{'User' if frame['type'] == 'user' else 'You'}: {frame['text']}"
+        if used + len(line) > max_chars and lines:
+            break
+        lines.append(line[-max_chars:])
+        used += len(line)
+    if not lines:
+        return ""
+    return "[Earlier in this conversation (restored after a reconnect):]\n" + "\n".join(reversed(lines)) + "\n\n[New message]\n"
@@ -0,0 +1,218 @@
+"""SQLite-backed support ticket store.
+
+Tickets get monotonic ULID-based ids (``TKT-<26 chars>``), so two tickets
+created in the same second no longer collide, and they sort by creation
+time. The database runs in WAL mode with indexes on status, priority,
+category and created_at. Inserts are handed to a single writer thread that
+commits them in batches, so ``create`` never blocks the event loop on disk.
+
+Tickets from the old one-JSON-file-per-ticket directory are imported once.
+"""
+import asyncio
+import concurrent.futures
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from async_io import run_io
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    ticket_id     TEXT PRIMARY KEY,
+    customer_name TEXT NOT NULL,
+    issue_summary TEXT NOT NULL,
+    priority      TEXT NOT NULL,
+    category      TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    created_at    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_status     ON tickets (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_tickets_priority   ON tickets (priority, created_at);
+CREATE INDEX IF NOT EXISTS idx_tickets_category   ON tickets (category, created_at);
+CREATE INDEX IF NOT EXISTS idx_tickets_created_at ON tickets (created_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+COLUMNS = ("ticket_id", "customer_name", "issue_summary", "priority", "category", "status", "created_at")
+
+
+class UlidGenerator:
+    """Monotonic ULIDs: 48-bit millisecond timestamp + 80 random bits, incremented within a millisecond."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_rand = 0
+
+    def __call__(self) -> str:
+        with self._lock:
+            ms = time.time_ns() // 1_000_000
+            if ms <= self._last_ms:
+                ms = self._last_ms
+                self._last_rand += 1
+            else:
+                self._last_rand = int.from_bytes(os.urandom(10), "big") >> 1   # leave headroom to increment
+            self._last_ms = ms
+            value = (ms << 80) | self._last_rand
+        return "".join(_CROCKFORD[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+
+new_ulid = UlidGenerator()
+
+
+def connect(db_path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class TicketStore:
+    def __init__(self, db_path, legacy_dir=None, batch_size=64, batch_wait=0.005):
+        self.db_path = Path(db_path)
+        self.legacy_dir = Path(legacy_dir) if legacy_dir else None
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait       # seconds to wait for more inserts to join a batch
+        self._queue = queue.Queue()
+        self._writer = None
+        self._start_lock = threading.Lock()
+        self._local = threading.local()
+
+    # ─── Writes ───
+
+    async def create(self, customer_name, issue_summary, priority="medium", category="general") -> dict:
+        ticket = {
+            "ticket_id": f"TKT-{new_ulid()}",
+            "customer_name": customer_name,
+            "issue_summary": issue_summary,
+            "priority": priority,
+            "category": category,
+            "status": "open",
+            "created_at": datetime.now().isoformat(),
+        }
+        if self._writer is None:
+            await run_io(self._ensure_writer)   # first use creates the schema and imports legacy tickets
+        await asyncio.wrap_future(self.submit(ticket))
+        return ticket
+
+    def submit(self, ticket: dict) -> concurrent.futures.Future:
+        """Queue a ticket for insertion; the future resolves once its batch is committed."""
+        self._ensure_writer()
+        future = concurrent.futures.Future()
+        self._queue.put((ticket, future))
+        return future
+
+    def close(self):
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def _ensure_writer(self):
+        with self._start_lock:
+            if self._writer is None:
+                ready = concurrent.futures.Future()
+                self._writer = threading.Thread(target=self._write_loop, args=(ready,), name="ticket-writer", daemon=True)
+                self._writer.start()
+                ready.result()
+
+    def _write_loop(self, ready):
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = connect(self.db_path)
+            conn.executescript(SCHEMA)
+            self._import_legacy(conn)
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        ready.set_result(None)
+        sql = f"INSERT INTO tickets ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                with conn:
+                    conn.executemany(sql, [tuple(t[c] for c in COLUMNS) for t, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for _, future in batch:
+                    future.set_result(None)
+        conn.close()
+
+    def _import_legacy(self, conn):
+        if not self.legacy_dir or not self.legacy_dir.is_dir():
+            return
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_import'").fetchone():
+            return
+        rows = []
+        for path in self.legacy_dir.glob("TKT-*.json"):
+            try:
+                ticket = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            rows.append((
+                ticket.get("ticket_id", path.stem), ticket.get("customer_name", ""),
+                ticket.get("issue_summary", ""), ticket.get("priority", "medium"),
+                ticket.get("category", "general"), ticket.get("status", "open"),
+                ticket.get("created_at", ""),
+            ))
+        with conn:
+            conn.executemany(f"INSERT OR IGNORE INTO tickets ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('legacy_import', ?)", (str(len(rows)),))
+
+    # ─── Reads ───
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self._ensure_writer()      # creates the schema and imports legacy tickets
+            conn = self._local.conn = connect(self.db_path)
+        return conn
+
+    def get(self, ticket_id: str):
+        row = self._reader().execute("SELECT * FROM tickets WHERE ticket_id = ?", (ticket_id,)).fetchone()
+        return dict(row) if row else None
+
+    def query(self, status=None, priority=None, category=None, since=None, limit=50) -> list:
+        """Newest-first tickets matching every given filter."""
+        where, params = [], []
+        for column, value in (("status", status), ("priority", priority), ("category", category)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            where.append("created_at >= ?")
+            params.append(since)
+        sql = "SELECT * FROM tickets"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self._reader().execute(sql, params)]
+
+    def counts(self, column="status") -> dict:
+        if column not in ("status", "priority", "category"):
+            raise ValueError(f"Cannot group tickets by {column}")
+        return dict(self._reader().execute(f"SELECT {column}, COUNT(*) FROM tickets GROUP BY {column}").fetchall())
@@ -0,0 +1,167 @@
+"""SQLite-backed to-do list for the personal assistant (step3_tools.py, step4_subagents.py).
+
+Each operation is one statement in WAL mode: ``add`` inserts a row and
+``complete`` updates one, so nothing rewrites the whole list and two
+sessions can't overwrite each other's changes. Items keep a stable id for
+life (completing or adding others never renumbers them), and ``list``
+reads one page of open, done or recent items through an index instead of
+rendering everything ever created.
+
+``assistant_data/todos.json`` from before the store is imported once, in
+order, so the item numbers it showed (1, 2, 3...) stay valid as ids.
+"""
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    task         TEXT NOT NULL,
+    done         INTEGER NOT NULL DEFAULT 0,
+    created_at   TEXT NOT NULL,
+    completed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_todos_done ON todos (done, id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+COLUMNS = ("id", "task", "done", "created_at", "completed_at")
+STATUSES = ("open", "done", "all")
+PAGE_SIZE = 20
+
+ID_RE = re.compile(r"^#?(\d+)$")
+NUMBER_RE = re.compile(r"\d+")
+
+
+def connect(db_path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def parse_todo_id(text: str):
+    match = ID_RE.match((text or "").strip())
+    return int(match.group(1)) if match else None
+
+
+def parse_list_filter(text: str) -> dict:
+    """``manage_todos`` list filters from its free-text ``item``: ``"open"`` (default), ``"done"``,
+    ``"all"``, ``"recent 10"`` (newest first), ``"page 2"``, or combinations like ``"done page 3"``."""
+    words = (text or "").casefold().replace(",", " ").split()
+    options = {"status": None, "newest_first": False, "limit": PAGE_SIZE, "page": 1}
+    for i, word in enumerate(words):
+        following = words[i + 1] if i + 1 < len(words) and NUMBER_RE.fullmatch(words[i + 1]) else None
+        if word in STATUSES:
+            options["status"] = word
+        elif word in ("completed", "finished"):
+            options["status"] = "done"
+        elif word in ("recent", "latest", "newest", "last"):
+            options["newest_first"] = True
+            if following:
+                options["limit"] = int(following)
+        elif word == "page" and following:
+            options["page"] = int(following)
+    # "recent 5" means the five newest items whatever their state; plain "list" means what's still open
+    options["status"] = options["status"] or ("all" if options["newest_first"] else "open")
+    options["limit"] = max(1, min(options["limit"], 100))
+    options["page"] = max(1, options["page"])
+    return options
+
+
+class TodoStore:
+    """Blocking API; call through ``run_io`` from the event loop."""
+
+    def __init__(self, db_path, legacy_file=None):
+        self.db_path = Path(db_path)
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        self._local = threading.local()
+        self._ready = False
+        self._init_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = self._local.conn = connect(self.db_path)
+            if not self._ready:
+                with self._init_lock:
+                    if not self._ready:
+                        conn.executescript(SCHEMA)
+                        self._import_legacy(conn)
+                        self._ready = True
+        return conn
+
+    def _import_legacy(self, conn):
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_import'").fetchone():
+            return
+        rows = []
+        if self.legacy_file and self.legacy_file.exists():
+            for i, todo in enumerate(json.loads(self.legacy_file.read_text(encoding="utf-8")), 1):
+                rows.append((i, todo["task"], int(bool(todo.get("done"))),
+                             todo.get("created") or datetime.now().isoformat(timespec="seconds"), None))
+        with conn:
+            # Claim the import first: a process starting at the same time waits on this write
+            # and then sees the marker already there, so the rows go in exactly once.
+            claimed = conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('legacy_import', ?)", (str(len(rows)),))
+            if claimed.rowcount > 0:
+                conn.executemany(f"INSERT OR IGNORE INTO todos ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?)", rows)
+
+    # ─── Writes ───
+
+    def add(self, task: str) -> dict:
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute("INSERT INTO todos (task, created_at) VALUES (?, ?)",
+                                  (task, datetime.now().isoformat(timespec="seconds")))
+        return self.get(cursor.lastrowid)
+
+    def complete(self, todo_id: int):
+        """Mark an item done. Returns it with ``changed`` False if it already was, or None if no such id."""
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute("UPDATE todos SET done = 1, completed_at = ? WHERE id = ? AND done = 0",
+                                  (datetime.now().isoformat(timespec="seconds"), todo_id))
+        todo = self.get(todo_id)
+        if todo is not None:
+            todo["changed"] = cursor.rowcount > 0
+        return todo
+
+    # ─── Reads ───
+
+    def get(self, todo_id: int):
+        row = self._conn().execute("SELECT * FROM todos WHERE id = ?", (todo_id,)).fetchone()
+        return {c: row[c] for c in COLUMNS} if row else None
+
+    def list(self, status="open", newest_first=False, limit=PAGE_SIZE, page=1) -> dict:
+        """One page of items plus the total matching ``status`` (open / done / all)."""
+        where, params = "", []
+        if status != "all":
+            where, params = "WHERE done = ?", [int(status == "done")]
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM todos {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT * FROM todos {where} ORDER BY id {'DESC' if newest_first else 'ASC'} LIMIT ? OFFSET ?",
+            params + [limit, (page - 1) * limit],
+        ).fetchall()
+        return {"items": [{c: row[c] for c in COLUMNS} for row in rows], "total": total,
+                "status": status, "page": page, "limit": limit}
+
+
+def format_todos(result: dict) -> str:
+    if not result["items"]:
+        if result["total"]:
+            return f"No items on page {result['page']} ({result['total']} {result['status']})."
+        return "No to-do items yet!" if result["status"] == "all" else f"No {result['status']} to-do items."
+    lines = [f"  {'✅' if t['done'] else '⬜'} #{t['id']} {t['task']}" for t in result["items"]]
+    first = (result["page"] - 1) * result["limit"] + 1
+    last = first + len(result["items"]) - 1
+    if last < result["total"]:
+        lines.append(f"  ({first}-{last} of {result['total']} {result['status']}; add 'page {result['page'] + 1}' for more)")
+    elif first > 1:
+        lines.append(f"  ({first}-{last} of {result['total']} {result['status']})")
+    return "\n".join(lines)
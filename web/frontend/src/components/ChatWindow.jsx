@@ -52,8 +52,18 @@ function loadHistory(agentId) {
   } catch { return []; }
 }
 
+// The server keeps the conversation under this id and replays it on reconnect
+function loadSessionId(agentId) {
+  let id = localStorage.getItem(`session_${agentId}`);
+  if (!id) {
+    id = crypto.randomUUID();
+    localStorage.setItem(`session_${agentId}`, id);
+  }
+  return id;
+}
+
 function saveHistory(agentId, messages) {
-  const toSave = messages.filter(m => m.role !== "error").map(({ loading, ...rest }) => rest);
+  const toSave = messages.filter(m => m.role !== "error").map(({ loading, streaming, ...rest }) => rest);
   if (toSave.length > 0) {
     localStorage.setItem(`chat_${agentId}`, JSON.stringify(toSave));
   }
@@ -64,14 +74,17 @@ export default function ChatWindow({ agent }) {
   const [input, setInput] = useState("");
   const [status, setStatus] = useState("Connecting...");
   const [isLoading, setIsLoading] = useState(false);
+  const [notice, setNotice] = useState("");
+  const [sessionEpoch, setSessionEpoch] = useState(0);   // bumped to reconnect under a new session
   const wsRef = useRef(null);
   const messagesEndRef = useRef(null);
 
   useEffect(() => {
     setMessages(loadHistory(agent.id));
     setStatus("Connecting...");
+    setNotice("");
 
-    const ws = new WebSocket(`ws://localhost:8000/ws/${agent.id}`);
+    const ws = new WebSocket(`ws://localhost:8000/ws/${agent.id}?session=${loadSessionId(agent.id)}`);
     wsRef.current = ws;
 
     ws.onopen = () => setStatus("Connected");
@@ -81,19 +94,54 @@ export default function ChatWindow({ agent }) {
     ws.onmessage = (event) => {
       const data = JSON.parse(event.data);
       switch (data.type) {
+        case "delta":
+          // Partial text: grow the message being streamed, or start a new one
+          setMessages((prev) => {
+            const last = prev[prev.length - 1];
+            if (last?.role === "assistant" && last.streaming) {
+              return [...prev.slice(0, -1), { ...last, text: last.text + data.text }];
+            }
+            return [
+              ...prev.map(m => m.loading ? { ...m, loading: false } : m),
+              { role: "assistant", text: data.text, streaming: true },
+            ];
+          });
+          setIsLoading(false);
+          setNotice("");
+          break;
         case "assistant":
-          setMessages((prev) => [
-            ...prev.map(m => m.loading ? { ...m, loading: false } : m),
-            { role: "assistant", text: data.text },
-          ]);
+          // Final text for a block replaces its streamed version, if any
+          setMessages((prev) => {
+            const done = prev.map(m => m.loading ? { ...m, loading: false } : m);
+            const last = done[done.length - 1];
+            if (last?.role === "assistant" && last.streaming) done.pop();
+            return [...done, { role: "assistant", text: data.text }];
+          });
           setIsLoading(false);
+          setNotice("");
           break;
         case "tool":
           setMessages((prev) => [...prev, { role: "tool", text: data.text, loading: true }]);
+          setNotice("");
+          break;
+        case "queue":
+          // Waiting for the request scheduler to admit this turn
+          setNotice(`Queued — position ${data.position}`);
+          setIsLoading(true);
+          break;
+        case "history":
+          // Server-side transcript of this session; it wins over the local copy
+          setMessages(data.messages.map(m => ({ role: m.type, text: m.text })));
           break;
         case "status":
-          if (data.text === "Thinking...") setIsLoading(true);
-          if (data.text === "Connected") setStatus("Connected");
+          if (data.text === "Thinking...") {
+            setIsLoading(true);
+            setNotice("");
+          } else if (data.text === "Connected") {
+            setStatus("Connected");
+          } else {
+            setNotice(data.text);
+          }
           break;
         case "error":
           setMessages((prev) => [
@@ -101,16 +149,18 @@ export default function ChatWindow({ agent }) {
             { role: "error", text: data.text },
           ]);
           setIsLoading(false);
+          setNotice("");
           break;
         case "done":
-          setMessages((prev) => prev.map(m => m.loading ? { ...m, loading: false } : m));
+          setMessages((prev) => prev.map(m => (m.loading || m.streaming) ? { ...m, loading: false, streaming: false } : m));
           setIsLoading(false);
+          setNotice("");
           break;
       }
     };
 
     return () => ws.close();
-  }, [agent.id]);
+  }, [agent.id, sessionEpoch]);
 
   // Save messages to localStorage whenever they change
   useEffect(() => {
@@ -137,6 +187,9 @@ export default function ChatWindow({ agent }) {
   const clearChat = () => {
     setMessages([]);
     localStorage.removeItem(`chat_${agent.id}`);
+    // A new session id starts a fresh conversation on the server too
+    localStorage.removeItem(`session_${agent.id}`);
+    setSessionEpoch((n) => n + 1);
   };
 
   const exportChat = () => {
@@ -216,6 +269,7 @@ export default function ChatWindow({ agent }) {
             <span className="msg-label">{agent.name}</span>
             <div className="msg-text typing">
               <span></span><span></span><span></span>
+              {notice && <em className="typing-notice">{notice}</em>}
             </div>
           </div>
         )}